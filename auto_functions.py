@@ -1,24 +1,25 @@
 import logging
 from telegram.ext import ContextTypes
 from datetime import datetime, timedelta, timezone
-from fiturBot.attendance_bot import AttendanceBot
+from fiturBot.class_registry import get_class_registry, resolve_class
 from fiturBot.handlers.topic_utils import send_to_announcement_topic, send_to_assignment_topic
-from config import GROUP_CHAT_ID, GOOGLE_MEET_LINK
-from config import ANNOUNCEMENT_TOPIC_ID, TOPIC_NAMES, ASSIGNMENT_TOPIC_ID, ATTENDANCE_TOPIC_ID
+from config import TOPIC_NAMES
 
 
 logger = logging.getLogger(__name__)
 
 WIB = timezone(timedelta(hours=7))
 
-async def auto_check_attendance(context: ContextTypes.DEFAULT_TYPE):
+async def auto_check_attendance(context: ContextTypes.DEFAULT_TYPE, class_config=None):
     """Fungsi otomatis untuk mengecek dan mengeluarkan murid"""
     try:
-        # Validasi GROUP_CHAT_ID
-        if not GROUP_CHAT_ID or not isinstance(GROUP_CHAT_ID, int):
-            logger.error("❌ GROUP_CHAT_ID tidak valid untuk auto_check_attendance")
-        bot = AttendanceBot()
-        students_to_kick, students_to_warn = bot.check_auto_kick_conditions()
+        registry = get_class_registry(context)
+        class_config = class_config or registry.resolve(context)
+        # Validasi chat ID grup kelas
+        if not class_config.chat_id or not isinstance(class_config.chat_id, int):
+            logger.error(f"❌ Chat ID grup kelas '{class_config.name}' tidak valid untuk auto_check_attendance")
+        bot = registry.async_bot(class_config)
+        students_to_kick, students_to_warn = await bot.check_auto_kick_conditions()
         
         # Kirim peringatan ke grup
         if students_to_warn and len(students_to_warn) > 0:
@@ -30,7 +31,7 @@ async def auto_check_attendance(context: ContextTypes.DEFAULT_TYPE):
             warning_message += "\n⚠️ Hadiri pertemuan selanjutnya!"
             
             await context.bot.send_message(
-                chat_id=GROUP_CHAT_ID,
+                chat_id=class_config.chat_id,
                 text=warning_message
             )
         
@@ -38,7 +39,7 @@ async def auto_check_attendance(context: ContextTypes.DEFAULT_TYPE):
         for student in students_to_kick:
             try:
                 await context.bot.ban_chat_member(
-                    chat_id=GROUP_CHAT_ID,
+                    chat_id=class_config.chat_id,
                     user_id=int(student['telegram_id'])
                 )
                 logger.info(f"Murid {student['nama']} dikeluarkan: {student['alasan']}")
@@ -52,17 +53,27 @@ async def periodic_check(context: ContextTypes.DEFAULT_TYPE):
     """Pengecekan periodik"""
     await auto_check_attendance(context)
 
-async def send_classroom_reminder(context: ContextTypes.DEFAULT_TYPE):
+async def sync_roster(context: ContextTypes.DEFAULT_TYPE):
+    """Sinkronisasi store lokal dengan Google Sheets (dua arah)"""
+    try:
+        registry = get_class_registry(context)
+        await registry.async_bot(registry.resolve(context)).sync_with_sheet()
+    except Exception as e:
+        logger.error(f"Error in sync_roster: {e}")
+
+async def send_classroom_reminder(context: ContextTypes.DEFAULT_TYPE, class_config=None):
     """Mengirim reminder untuk tugas yang belum dikumpulkan"""
     try:
-        bot = AttendanceBot()
+        registry = get_class_registry(context)
+        class_config = class_config or registry.resolve(context)
+        bot = registry.async_bot(class_config)
         
-        if bot.classroom_manager is None:
+        unsubmitted_assignments = await bot.get_unsubmitted_assignments()
+        
+        if unsubmitted_assignments is None:
             logger.warning("Google Classroom tidak tersedia, skip reminder")
             return
         
-        unsubmitted_assignments = bot.classroom_manager.get_unsubmitted_assignments()
-        
         if not unsubmitted_assignments:
             message = "✅ **SEMUA TUGAS TELAH DIKUMPULKAN!**\n\nSelamat! Semua siswa telah mengumpulkan tugas mereka. 🎉"
         else:
@@ -77,19 +88,21 @@ async def send_classroom_reminder(context: ContextTypes.DEFAULT_TYPE):
             
             message += "📌 **Segera kumpulkan sebelum deadline!**"
 
-        logger.info(f"🔔 Sending class reminder to topic: {ASSIGNMENT_TOPIC_ID} ({TOPIC_NAMES.get(ASSIGNMENT_TOPIC_ID, 'Unknown')})")
+        topic_id = class_config.assignment_topic_id
+        logger.info(f"🔔 Sending class reminder to topic: {topic_id} ({TOPIC_NAMES.get(topic_id, 'Unknown')})")
 
         # Kirim ke topik TUGAS
-        await send_to_assignment_topic(context, message)
+        await send_to_assignment_topic(context, message, class_config=class_config)
         logger.info("✅ Classroom reminder sent successfully")
         
     except Exception as e:
         logger.error(f"Error sending classroom reminder: {e}")
 
 
-async def send_class_reminder(context: ContextTypes.DEFAULT_TYPE):
+async def send_class_reminder(context: ContextTypes.DEFAULT_TYPE, class_config=None):
     """Mengirim reminder kelas hari Senin ke topik PENGUMUMAN & INFO"""
     try:
+        class_config = class_config or resolve_class(context)
         # Dapatkan tanggal Senin ini dan Senin depan
         today = datetime.now(WIB)
 
@@ -121,7 +134,7 @@ Jangan lupa hari ini ada Kelas!  🥰
 
 📅 Senin, {formatted_date}
 🕖 Pukul 19.00 WIB (zona waktu lain menyesuaikan)
-📍 Google Meet : {GOOGLE_MEET_LINK}
+📍 Google Meet : {class_config.meet_link}
 
 G-Meet akan dibuka 15 menit sebelum kelas dimulai
 
@@ -139,7 +152,7 @@ Jangan lupa Besok ada Kelas!  🥰
 
 📅 Senin, {formatted_date}
 🕖 Pukul 19.00 WIB (zona waktu lain menyesuaikan)
-📍 Google Meet : {GOOGLE_MEET_LINK}
+📍 Google Meet : {class_config.meet_link}
 
 \033G-Meet akan dibuka 15 menit sebelum kelas dimulai\033 
 
@@ -149,11 +162,12 @@ Siap kan buku catatan, semangat belajar, dan pastikan koneksi yang stabil!
 Have a nice day & спасибо! 🌟"""
         
         # DEBUG: Log topic yang digunakan
-        logger.info(f"🔔 Sending class reminder to topic: {ANNOUNCEMENT_TOPIC_ID} ({TOPIC_NAMES.get(ANNOUNCEMENT_TOPIC_ID, 'Unknown')})")
+        topic_id = class_config.announcement_topic_id
+        logger.info(f"🔔 Sending class reminder to topic: {topic_id} ({TOPIC_NAMES.get(topic_id, 'Unknown')})")
 
         # Kirim ke topik PENGUMUMAN & INFO
-        await send_to_announcement_topic(context, message)
-        logger.info(f"✅ Class reminder sent to PENGUMUMAN & INFO topic (ID: {ANNOUNCEMENT_TOPIC_ID})")
+        await send_to_announcement_topic(context, message, class_config=class_config)
+        logger.info(f"✅ Class reminder sent to PENGUMUMAN & INFO topic (ID: {topic_id})")
         
     except Exception as e:
         logger.error(f"Error sending class reminder: {e}")
@@ -0,0 +1,87 @@
+# benchmark_attendance_rules.py
+"""Bandingkan evaluasi aturan kick/peringatan lama (DataFrame + iterrows) dengan
+versi baru di atas Roster (comprehension per Student).
+
+Jalankan: python benchmark_attendance_rules.py [jumlah_baris ...]
+"""
+import sys
+import time
+import numpy as np
+import pandas as pd
+from fiturBot.attendance_rules import AttendanceRules
+from fiturBot.roster import Roster, Student
+
+
+def make_roster(rows, seed=42):
+    """Roster sintetis dengan kolom yang sama seperti worksheet absensi"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Nama': [f"Murid {i}" for i in range(rows)],
+        'Telegram ID': rng.integers(10**8, 10**10, size=rows),
+        'Email': [f"murid{i}@example.com" for i in range(rows)],
+        'Username': [f"@murid{i}" for i in range(rows)],
+        'Total Hadir': rng.integers(0, 12, size=rows),
+        'Total Alpha': rng.integers(0, 5, size=rows),
+        'Total Izin': rng.integers(0, 6, size=rows),
+        'Status Terakhir': 'Belum Absen',
+    })
+
+
+def to_roster(df):
+    """Roster dari DataFrame sintetis (baris data pertama = baris 2)"""
+    return Roster(
+        [Student.from_record(position + 2, record) for position, record in enumerate(df.to_dict('records'))],
+        columns=list(df.columns)
+    )
+
+
+def legacy_split(df, rules):
+    """Implementasi lama check_auto_kick_conditions (loop iterrows)"""
+    students_to_kick, students_to_warn = [], []
+    for _, student in df.iterrows():
+        total_alpha = int(student['Total Alpha']) if pd.notna(student['Total Alpha']) else 0
+        total_izin = int(student['Total Izin']) if pd.notna(student['Total Izin']) else 0
+        if total_alpha >= rules.kick_alpha or total_izin >= rules.kick_izin:
+            students_to_kick.append({
+                'telegram_id': student['Telegram ID'],
+                'nama': student['Nama'],
+                'alasan': f"Alpha {total_alpha}x atau Izin {total_izin}x"
+            })
+        if total_izin >= rules.warn_izin or total_alpha >= rules.warn_alpha:
+            students_to_warn.append({
+                'telegram_id': student['Telegram ID'],
+                'nama': student['Nama'],
+                'total_izin': total_izin,
+                'total_alpha': total_alpha
+            })
+    return students_to_kick, students_to_warn
+
+
+def best_of(func, repeat=5):
+    """Waktu tercepat (detik) dari beberapa kali percobaan"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main(sizes):
+    rules = AttendanceRules()
+    print(f"Aturan: kick alpha>={rules.kick_alpha} / izin>={rules.kick_izin}, "
+          f"peringatan alpha>={rules.warn_alpha} / izin>={rules.warn_izin}\n")
+    print(f"{'baris':>8} {'iterrows (ms)':>15} {'roster (ms)':>13} {'speedup':>9}")
+    for rows in sizes:
+        df = make_roster(rows)
+        roster = to_roster(df)
+        legacy_time, legacy = best_of(lambda: legacy_split(df, rules), repeat=3)
+        vector_time, vector = best_of(lambda: rules.split(roster))
+        assert [s['nama'] for s in legacy[0]] == [s['nama'] for s in vector[0]]
+        assert [s['nama'] for s in legacy[1]] == [s['nama'] for s in vector[1]]
+        print(f"{rows:>8} {legacy_time * 1000:>15.1f} {vector_time * 1000:>13.1f} "
+              f"{legacy_time / vector_time:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1_000, 10_000])
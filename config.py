@@ -118,6 +118,101 @@ TOPIC_NAMES = {
     4: "Perihal Absensi Kelas"
 }
 
+# ==================== ATTENDANCE RULES CONFIG ====================
+# Murid dikeluarkan / diberi peringatan jika salah satu batas (alpha atau izin) tercapai
+KICK_ALPHA_THRESHOLD = safe_int_convert(os.getenv('KICK_ALPHA_THRESHOLD', '3'), default=3)
+KICK_IZIN_THRESHOLD = safe_int_convert(os.getenv('KICK_IZIN_THRESHOLD', '4'), default=4)
+WARN_ALPHA_THRESHOLD = safe_int_convert(os.getenv('WARN_ALPHA_THRESHOLD', '2'), default=2)
+WARN_IZIN_THRESHOLD = safe_int_convert(os.getenv('WARN_IZIN_THRESHOLD', '3'), default=3)
+
+# ==================== CACHE CONFIG ====================
+# Lama data roster (dalam detik) disimpan di memori sebelum dibaca ulang dari Sheets
+ROSTER_CACHE_TTL = safe_int_convert(os.getenv('ROSTER_CACHE_TTL', '120'), default=120)
+
+# Write-behind: absen dicatat di memori dulu lalu dikirim ke Sheets secara berkala
+ENABLE_WRITE_BEHIND = os.getenv('ENABLE_WRITE_BEHIND', 'false').lower() == 'true'
+WRITE_BEHIND_FLUSH_INTERVAL = safe_int_convert(os.getenv('WRITE_BEHIND_FLUSH_INTERVAL', '10'), default=10)
+WRITE_BEHIND_MAX_PENDING = safe_int_convert(os.getenv('WRITE_BEHIND_MAX_PENDING', '50'), default=50)
+
+# Store SQLite lokal: handler baca/tulis ke sini, sheet disinkronkan berkala
+ENABLE_LOCAL_STORE = os.getenv('ENABLE_LOCAL_STORE', 'true').lower() == 'true'
+ROSTER_DB_PATH = os.getenv('ROSTER_DB_PATH', 'data/roster.db')
+ROSTER_SYNC_INTERVAL = safe_int_convert(os.getenv('ROSTER_SYNC_INTERVAL', '60'), default=60)
+
+# Snapshot roster di disk (tanpa store lokal): dimuat saat start dan dipakai saat Sheets lambat/down.
+# Roster lama tetap dipakai (diperbarui di background) selama umurnya di bawah ROSTER_STALE_MAX_AGE detik.
+ENABLE_ROSTER_SNAPSHOT = os.getenv('ENABLE_ROSTER_SNAPSHOT', 'true').lower() == 'true'
+ROSTER_SNAPSHOT_PATH = os.getenv('ROSTER_SNAPSHOT_PATH', 'data/roster_snapshot.json')
+ROSTER_STALE_MAX_AGE = safe_int_convert(os.getenv('ROSTER_STALE_MAX_AGE', '3600'), default=3600)
+# Balasan bot menandai data sebagai "mungkin belum terbaru" jika umurnya melewati batas ini (detik)
+ROSTER_STALE_NOTICE_AFTER = safe_int_convert(os.getenv('ROSTER_STALE_NOTICE_AFTER', '300'), default=300)
+
+# Cek versi file (Drive API) sebelum membaca ulang seluruh sheet; lewati jika tidak berubah
+ENABLE_SHEET_CHANGE_PROBE = os.getenv('ENABLE_SHEET_CHANGE_PROBE', 'true').lower() == 'true'
+
+# Log absen append-only: setiap absen dicatat sebagai event dan dikirim ke worksheet riwayat
+ENABLE_ATTENDANCE_LOG = os.getenv('ENABLE_ATTENDANCE_LOG', 'true').lower() == 'true'
+HISTORY_WORKSHEET_NAME = os.getenv('HISTORY_WORKSHEET_NAME', 'Riwayat Absensi')
+HISTORY_FLUSH_BATCH = safe_int_convert(os.getenv('HISTORY_FLUSH_BATCH', '500'), default=500)
+
+# Export data: file disusun di memori sampai batas ini (byte), lebih besar dari itu pindah ke file sementara
+EXPORT_SPOOL_MAX_BYTES = safe_int_convert(os.getenv('EXPORT_SPOOL_MAX_BYTES', str(5 * 1024 * 1024)), default=5 * 1024 * 1024)
+
+# ==================== CLASS REGISTRY CONFIG ====================
+# Beberapa kelas dalam satu proses bot: JSON list, satu objek per grup, misal
+# [{"key": "batch1", "name": "Batch 1", "chat_id": -1001234567890, "worksheet": "Batch 1",
+#   "course_id": "NzgxOTM4ODI5NTEz", "announcement_topic_id": 3}]
+# Kunci lain (opsional): spreadsheet_url, meet_link, assignment_topic_id,
+# attendance_topic_id, history_worksheet, db_path, snapshot_path. Jika kosong, dipakai satu kelas
+# dari GROUP_CHAT_ID / WORKSHEET_NAME / CLASSROOM_COURSE_ID.
+CLASSES_CONFIG = []
+classes_config_str = os.getenv('CLASSES_CONFIG', '').strip()
+if classes_config_str:
+    try:
+        CLASSES_CONFIG = json.loads(classes_config_str)
+        if not isinstance(CLASSES_CONFIG, list):
+            raise ValueError("CLASSES_CONFIG harus berupa JSON list")
+        print(f"✅ CLASSES_CONFIG berhasil dibaca: {len(CLASSES_CONFIG)} kelas")
+    except (ValueError, TypeError) as e:
+        print(f"❌ Error parsing CLASSES_CONFIG: {e}")
+        CLASSES_CONFIG = []
+
+# ==================== CONCURRENCY CONFIG ====================
+# Jumlah panggilan Google API (blocking) yang boleh berjalan bersamaan per backend
+SHEETS_MAX_CONCURRENCY = safe_int_convert(os.getenv('SHEETS_MAX_CONCURRENCY', '4'), default=4)
+CLASSROOM_MAX_CONCURRENCY = safe_int_convert(os.getenv('CLASSROOM_MAX_CONCURRENCY', '4'), default=4)
+# Jumlah pengecekan tugas Classroom yang berjalan paralel dalam satu sweep reminder
+REMINDER_MAX_CONCURRENCY = safe_int_convert(os.getenv('REMINDER_MAX_CONCURRENCY', '2'), default=2)
+# Jeda minimal antar pesan bot ke chat yang sama (detik); batas Telegram untuk grup sekitar 20 pesan/menit
+TELEGRAM_CHAT_SEND_INTERVAL = safe_int_convert(os.getenv('TELEGRAM_CHAT_SEND_INTERVAL', '3'), default=3)
+
+# Percobaan ulang compare-and-set counter absen saat nilai di sheet berubah
+COUNTER_CAS_MAX_RETRIES = safe_int_convert(os.getenv('COUNTER_CAS_MAX_RETRIES', '3'), default=3)
+
+# ==================== QUOTA CONFIG ====================
+# Batas request per menit per API (kuota Sheets: 60 baca & 60 tulis per user per menit)
+SHEETS_READ_PER_MINUTE = safe_int_convert(os.getenv('SHEETS_READ_PER_MINUTE', '55'), default=55)
+SHEETS_WRITE_PER_MINUTE = safe_int_convert(os.getenv('SHEETS_WRITE_PER_MINUTE', '55'), default=55)
+CLASSROOM_REQUESTS_PER_MINUTE = safe_int_convert(os.getenv('CLASSROOM_REQUESTS_PER_MINUTE', '120'), default=120)
+DRIVE_REQUESTS_PER_MINUTE = safe_int_convert(os.getenv('DRIVE_REQUESTS_PER_MINUTE', '120'), default=120)
+# Token yang disisakan untuk command pengguna (job terjadwal tidak boleh memakainya)
+QUOTA_INTERACTIVE_RESERVE = safe_int_convert(os.getenv('QUOTA_INTERACTIVE_RESERVE', '10'), default=10)
+# Retry dengan exponential backoff + jitter untuk 429 / 5xx (dalam detik)
+QUOTA_MAX_RETRIES = safe_int_convert(os.getenv('QUOTA_MAX_RETRIES', '5'), default=5)
+QUOTA_BACKOFF_BASE = safe_int_convert(os.getenv('QUOTA_BACKOFF_BASE', '1'), default=1)
+QUOTA_BACKOFF_MAX = safe_int_convert(os.getenv('QUOTA_BACKOFF_MAX', '32'), default=32)
+# Jumlah item per halaman untuk list() Classroom (courseWork, submissions, students, courses)
+CLASSROOM_PAGE_SIZE = safe_int_convert(os.getenv('CLASSROOM_PAGE_SIZE', '100'), default=100)
+# Jumlah request per batch HTTP Classroom (batas Classroom API: 50)
+CLASSROOM_BATCH_SIZE = min(safe_int_convert(os.getenv('CLASSROOM_BATCH_SIZE', '50'), default=50), 50)
+
+# Cache profil Classroom (userId -> email/nama) di SQLite, tetap ada setelah restart
+ENABLE_PROFILE_CACHE = os.getenv('ENABLE_PROFILE_CACHE', 'true').lower() == 'true'
+PROFILE_CACHE_PATH = os.getenv('PROFILE_CACHE_PATH', 'data/user_profiles.db')
+# Umur maksimal profil di cache (detik, default 7 hari) dan untuk profil yang gagal diambil (default 1 jam)
+PROFILE_CACHE_TTL = safe_int_convert(os.getenv('PROFILE_CACHE_TTL', str(7 * 24 * 3600)), default=7 * 24 * 3600)
+PROFILE_NEGATIVE_TTL = safe_int_convert(os.getenv('PROFILE_NEGATIVE_TTL', '3600'), default=3600)
+
 def setup_admin_commands(application, admin_ids):
     """Setup commands khusus untuk admin"""
     
@@ -1,5 +1,11 @@
 # Package initialization
-from .attendance_bot import AttendanceBot
+from .attendance_bot import AttendanceBot, get_attendance_bot
+from .async_facade import AsyncAttendanceBot, get_async_bot
 from .classroom_manager import ClassroomManager
+from .class_registry import ClassConfig, ClassRegistry, get_class_registry
+from .google_clients import GoogleClients, get_google_clients
 
-__all__ = ['AttendanceBot', 'ClassroomManager']
\ No newline at end of file
+__all__ = [
+    'AttendanceBot', 'AsyncAttendanceBot', 'ClassroomManager', 'GoogleClients', 'ClassConfig', 'ClassRegistry',
+    'get_attendance_bot', 'get_async_bot', 'get_google_clients', 'get_class_registry',
+]
\ No newline at end of file
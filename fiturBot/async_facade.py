@@ -0,0 +1,112 @@
+import asyncio
+import logging
+from .executors import run_blocking
+from .classroom_pages import iter_items
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAttendanceBot:
+    """Facade async untuk AttendanceBot.
+
+    Semua panggilan gspread / googleapiclient dijalankan di thread pool
+    terbatas per backend, sehingga event loop (dan semua chat lain, termasuk
+    game quiz) tidak ikut membeku saat menunggu Google.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        # Lock async per murid: absen beruntun dari murid yang sama menunggu di
+        # event loop, tidak menghabiskan slot thread pool Sheets
+        self._student_locks = {}
+    
+    def _student_lock(self, telegram_id):
+        key = str(telegram_id).strip()
+        lock = self._student_locks.get(key)
+        if lock is None:
+            lock = self._student_locks[key] = asyncio.Lock()
+        return lock
+
+    async def run_sheets(self, func, *args, **kwargs):
+        return await run_blocking('sheets', func, *args, **kwargs)
+
+    async def run_classroom(self, func, *args, **kwargs):
+        return await run_blocking('classroom', func, *args, **kwargs)
+
+    # ==================== GOOGLE SHEETS ====================
+    async def get_student_data(self, force_refresh=False):
+        return await self.run_sheets(self.bot.get_student_data, force_refresh)
+
+    async def get_student(self, telegram_id=None, email=None, username=None):
+        return await self.run_sheets(self.bot.get_student, telegram_id, email, username)
+
+    async def update_student_record(self, telegram_id, status, source='absen'):
+        async with self._student_lock(telegram_id):
+            return await self.run_sheets(self.bot.update_student_record, telegram_id, status, source)
+
+    async def update_student_status(self, telegram_id, status):
+        return await self.run_sheets(self.bot.update_student_status, telegram_id, status)
+
+    async def register_student(self, nama, telegram_id, email, username):
+        return await self.run_sheets(self.bot.register_student, nama, telegram_id, email, username)
+
+    async def register_students(self, rows):
+        return await self.run_sheets(self.bot.register_students, rows)
+
+    async def reset_daily_attendance(self):
+        return await self.run_sheets(self.bot.reset_daily_attendance)
+
+    async def check_auto_kick_conditions(self):
+        return await self.run_sheets(self.bot.check_auto_kick_conditions)
+
+    async def refresh_student_data(self):
+        return await self.run_sheets(self.bot.reload_from_sheet)
+
+    async def sync_with_sheet(self):
+        return await self.run_sheets(self.bot.sync_with_sheet)
+
+    async def meeting_attendance(self, meeting_date):
+        return await self.run_sheets(self.bot.meeting_attendance, meeting_date)
+
+    # ==================== GOOGLE CLASSROOM ====================
+    async def get_classroom_manager(self):
+        return await self.run_classroom(lambda: self.bot.classroom_manager)
+
+    async def get_unsubmitted_assignments(self):
+        manager = await self.get_classroom_manager()
+        if manager is None:
+            return None
+        return await self.run_classroom(manager.get_unsubmitted_assignments)
+
+    async def execute_classroom(self, request_factory):
+        """Bangun & eksekusi request Classroom di thread pool.
+
+        `request_factory` menerima service Classroom milik thread pekerja dan
+        mengembalikan request yang belum di-execute.
+        """
+        def call():
+            service = self.bot.initialize_classroom_service()
+            if service is None:
+                raise RuntimeError("Gagal menginisialisasi Google Classroom service")
+            return request_factory(service).execute()
+        return await self.run_classroom(call)
+
+    async def list_classroom(self, collection_factory, items_key, **params):
+        """Ambil semua item list() Classroom (semua halaman) di thread pool.
+
+        `collection_factory` menerima service Classroom dan mengembalikan
+        resource-nya, misal `lambda service: service.courses()`.
+        """
+        def call():
+            service = self.bot.initialize_classroom_service()
+            if service is None:
+                raise RuntimeError("Gagal menginisialisasi Google Classroom service")
+            return list(iter_items(collection_factory(service), items_key, **params))
+        return await self.run_classroom(call)
+
+
+def get_async_bot(context=None, update=None):
+    """Ambil facade async milik kelas dari chat/job ini (lihat ClassRegistry.resolve)"""
+    from .class_registry import get_class_registry
+    registry = get_class_registry(context)
+    return registry.async_bot(registry.resolve(context, update))
@@ -1,41 +1,150 @@
 import gspread
-import pandas as pd
-import os
 import logging
-from google.oauth2.service_account import Credentials
-from config import SCOPES, CREDENTIALS_FILE, SPREADSHEET_URL, WORKSHEET_NAME, CLASSROOM_COURSE_ID
+from gspread.utils import a1_to_rowcol, rowcol_to_a1
+import threading
+from config import (
+    SPREADSHEET_URL, WORKSHEET_NAME, CLASSROOM_COURSE_ID, ROSTER_CACHE_TTL,
+    ENABLE_WRITE_BEHIND, WRITE_BEHIND_FLUSH_INTERVAL, WRITE_BEHIND_MAX_PENDING,
+    ENABLE_LOCAL_STORE, ROSTER_DB_PATH, ENABLE_SHEET_CHANGE_PROBE, COUNTER_CAS_MAX_RETRIES,
+    ENABLE_ATTENDANCE_LOG, HISTORY_WORKSHEET_NAME, HISTORY_FLUSH_BATCH,
+    ENABLE_ROSTER_SNAPSHOT, ROSTER_SNAPSHOT_PATH, ROSTER_STALE_MAX_AGE,
+    CLASSROOM_BATCH_SIZE, REMINDER_MAX_CONCURRENCY
+)
 from .classroom_manager import ClassroomManager
+from .classroom_pages import iter_items
+from .classroom_batch import list_submissions, get_user_emails
+from .google_clients import get_google_clients
+from .sheet_writes import SheetWriteBatch, WriteBehindBuffer, AppendBehindBuffer
+from .executors import run_blocking, get_executor
+from .roster_store import RosterStore, EVENT_COLUMNS
+from .metrics import metrics
+from .quota import background_job, request_priority, BACKGROUND
+from .attendance_rules import attendance_rules
+from .roster import Roster, Student
+from .roster_parser import map_header, parse_roster, parse_int
+from .roster_snapshot import RosterSnapshot
+from .single_flight import SingleFlight
+from .outbound import send_message
 import time
-from datetime import datetime
-from threading import Thread
-from googleapiclient.discovery import build
+import asyncio
+from datetime import date, datetime, timedelta, timezone, time as dt_time
 
 logger = logging.getLogger(__name__)
 
+WIB = timezone(timedelta(hours=7))
+
 class AttendanceBot:
-    def __init__(self):
-        self.gc = None
-        self.worksheet = None
-        self.classroom_manager = None
-        self.classroom_service = None  # Tambahkan ini
-        self.setup_sheets()
-        self.setup_classroom()
+    # Status absen -> kolom counter yang bertambah
+    STATUS_COUNTERS = {
+        'Hadir': 'Total Hadir',
+        'Alpha': 'Total Alpha',
+        'Izin': 'Total Izin',
+    }
+    # Header worksheet riwayat absen (urutan sama dengan EVENT_COLUMNS)
+    HISTORY_HEADER = ['Waktu', 'Tanggal Pertemuan', 'Telegram ID', 'Nama', 'Status', 'Sumber']
+    
+    def __init__(self, clients=None, worksheet_name=WORKSHEET_NAME, spreadsheet_url=SPREADSHEET_URL,
+                 course_id=CLASSROOM_COURSE_ID, db_path=ROSTER_DB_PATH,
+                 history_worksheet_name=HISTORY_WORKSHEET_NAME, snapshot_path=ROSTER_SNAPSHOT_PATH):
+        # Koneksi Google diambil dari registry bersama, dibangun saat pertama dipakai
+        self.clients = clients or get_google_clients()
+        self.worksheet_name = worksheet_name
+        self.spreadsheet_url = spreadsheet_url
+        self.course_id = course_id
+        self._classroom_manager = None
+        self._classroom_checked = False
+        
+        # Cache roster di memori (write-through untuk perubahan dari bot)
+        self.roster_cache_ttl = ROSTER_CACHE_TTL
+        self._roster = None
+        self._roster_loaded_at = 0.0
+        self._roster_lock = threading.RLock()
+        
+        # Roster lama boleh dipakai (sambil diperbarui di background) sampai umur ini
+        self.stale_max_age = ROSTER_STALE_MAX_AGE
+        self._refresh_pending = False
+        # Pembacaan roster bersamaan digabung menjadi satu request ke Sheets
+        self._roster_loads = SingleFlight()
+        
+        # Versi spreadsheet saat roster terakhir dibaca (untuk probe perubahan)
+        self.change_probe_enabled = ENABLE_SHEET_CHANGE_PROBE
+        self._sheet_revision = None
+        
+        # Posisi kolom (1-based) hasil pemetaan header sheet, diperbarui tiap baca penuh
+        self._column_positions = None
+        
+        # Lock per murid agar update counter dari proses ini berjalan berurutan
+        self._student_locks = {}
+        self._student_locks_lock = threading.Lock()
+        
+        # Log absen append-only, dikirim ke worksheet riwayat
+        self.attendance_log_enabled = ENABLE_ATTENDANCE_LOG
+        self.history_worksheet_name = history_worksheet_name
+        self._history_lock = threading.Lock()
+        
+        # Index Telegram ID / email / username -> nomor baris di sheet
+        self._row_index = {'telegram_id': {}, 'email': {}, 'username': {}}
+        # Pendaftaran diserialkan agar cek duplikat dan nomor baris baru tidak balapan
+        self._register_lock = threading.Lock()
+        
+        # Store SQLite lokal sebagai penyimpanan utama (disinkronkan ke sheet berkala)
+        self.store = None
+        self._sync_lock = threading.Lock()
+        if ENABLE_LOCAL_STORE:
+            self.store = RosterStore(db_path)
+        
+        # Snapshot roster di disk (store lokal sudah persisten, jadi hanya tanpa store)
+        self.snapshot = None
+        self._snapshot_checked = False
+        if ENABLE_ROSTER_SNAPSHOT and self.store is None:
+            self.snapshot = RosterSnapshot(snapshot_path)
+        
+        # Mode write-behind (opsional): absen diantrekan lalu di-flush berkala.
+        # Tidak dipakai jika store lokal aktif karena store sudah menunda penulisan.
+        self.write_buffer = None
+        if ENABLE_WRITE_BEHIND and self.store is None:
+            self.write_buffer = WriteBehindBuffer(
+                self._commit_changes,
+                flush_interval=WRITE_BEHIND_FLUSH_INTERVAL,
+                max_pending=WRITE_BEHIND_MAX_PENDING
+            )
+            self.write_buffer.start()
+        
+        # Tanpa store lokal, event riwayat diantrekan di memori lalu di-append per batch
+        self.history_buffer = None
+        if self.attendance_log_enabled and self.store is None:
+            self.history_buffer = AppendBehindBuffer(
+                self._append_history_rows,
+                flush_interval=WRITE_BEHIND_FLUSH_INTERVAL,
+                max_pending=HISTORY_FLUSH_BATCH
+            )
+            self.history_buffer.start()
+    
+    @property
+    def gc(self):
+        return self.clients.gc
+    
+    @property
+    def worksheet(self):
+        return self.clients.worksheet(self.worksheet_name, self.spreadsheet_url)
+    
+    @property
+    def classroom_service(self):
+        return self.clients.classroom_service
+    
+    @property
+    def classroom_manager(self):
+        if not self._classroom_checked:
+            self.setup_classroom()
+        return self._classroom_manager
     
     def setup_sheets(self):
         """Setup koneksi ke Google Sheets"""
         try:
             logger.info("Memulai koneksi ke Google Sheets...")
-            
-            # Validasi file credentials
-            if not os.path.exists(CREDENTIALS_FILE):
-                raise FileNotFoundError(f"File {CREDENTIALS_FILE} tidak ditemukan!")
-            
-            # Setup credentials dan koneksi
-            creds = Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=SCOPES)
-            self.gc = gspread.authorize(creds)
-            self.worksheet = self.gc.open_by_url(SPREADSHEET_URL).worksheet(WORKSHEET_NAME)
-            
+            worksheet = self.worksheet
             logger.info("✅ Berhasil terhubung ke Google Sheets!")
+            return worksheet
             
         except Exception as e:
             logger.error(f"❌ Error connecting to Google Sheets: {e}")
@@ -43,529 +152,757 @@ class AttendanceBot:
     
     def setup_classroom(self):
         """Setup koneksi ke Google Classroom"""
+        self._classroom_checked = True
         try:
-            self.classroom_manager = ClassroomManager()
+            self._classroom_manager = ClassroomManager(self.clients, self.course_id)
         except Exception as e:
             logger.warning(f"Google Classroom tidak tersedia: {e}")
-            self.classroom_manager = None
+            self._classroom_manager = None
     
     def get_credentials(self):
         """Mendapatkan credentials untuk Google API"""
         try:
-            return Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=SCOPES)
+            return self.clients.credentials
         except Exception as e:
             logger.error(f"Error getting credentials: {e}")
             return None
     
-    def get_student_data(self):
-        """Mengambil data murid dari spreadsheet dan konversi tipe data"""
-        try:
-            data = self.worksheet.get_all_records()
-            df = pd.DataFrame(data)
-
-            # Konversi kolom numerik dari string ke integer
-            numeric_columns = ['Total Hadir', 'Total Alpha', 'Total Izin', 'Telegram ID']
-
-            for col in numeric_columns:
-                if col in df.columns:
-                    try:
-                        # Coba konversi langsung ke numeric
-                        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-                    except:
-                        # Jika gagal, bersihkan string terlebih dahulu
-                        df[col] = pd.to_numeric(
-                            df[col].astype(str).str.replace('[^0-9.-]', '', regex=True), 
-                            errors='coerce'
-                        ).fillna(0).astype(int)
-
-            logger.info(f"📊 Berhasil membaca {len(df)} records")
-            logger.info(f"📈 Sample data - Alpha: {df['Total Alpha'].iloc[0] if len(df) > 0 else 'N/A'}, Izin: {df['Total Izin'].iloc[0] if len(df) > 0 else 'N/A'}")
-            return df
+    def get_student_data(self, force_refresh=False):
+        """Mengambil data murid (dari cache jika masih berlaku).
+
+        Tanpa store lokal, roster yang TTL-nya habis tetap langsung dikembalikan
+        selama umurnya di bawah `stale_max_age`, sementara pembaruan dari Sheets
+        berjalan di background. Lewat batas itu (atau `force_refresh`) request
+        menunggu Sheets; jika Sheets gagal, roster lama tetap dipakai.
+        Umur data bisa dilihat lewat `roster.age()`.
+
+        Pemanggil bersamaan yang sama-sama harus membaca Sheets menunggu satu
+        pembacaan yang sedang berjalan (metrics roster_load.hit / coalesced / miss).
+        """
+        requested_at = time.monotonic()
+        with self._roster_lock:
+            if self._roster is None and not force_refresh:
+                self._restore_snapshot()
+            if not force_refresh and self._is_roster_fresh():
+                metrics.increment('roster_load.hit')
+                return self._roster
+            cached = self._roster
+        
+        if cached is not None and not force_refresh and self.store is None and cached.age() < self.stale_max_age:
+            metrics.increment('roster_load.hit')
+            metrics.increment('roster.stale_served')
+            self._schedule_refresh()
+            return cached
         
+        try:
+            return self._load_roster_coalesced(cached is not None and not force_refresh, requested_at)
         except Exception as e:
             logger.error(f"Error getting student data: {e}")
-            return pd.DataFrame()
-
-    def update_student_record(self, telegram_id, status):
-        """Update record kehadiran murid"""
+            if cached is None:
+                return Roster()
+            metrics.increment('roster.stale_served')
+            logger.warning(f"⚠️ Sheets tidak bisa dibaca, memakai roster lama (umur {cached.age():.0f} detik)")
+            return cached
+    
+    def _load_roster_coalesced(self, has_cached, requested_at):
+        """Baca ulang roster lewat single-flight (satu pembacaan untuk semua pemanggil bersamaan)"""
+        def load():
+            with self._roster_lock:
+                # Sudah diperbarui pemanggil lain setelah permintaan ini dibuat
+                if has_cached and self._roster is not None and self._roster_loaded_at >= requested_at:
+                    return self._roster, True
+            return self._refresh_roster(has_cached), False
+        
+        (roster, reused), shared = self._roster_loads.do('probe' if has_cached else 'full', load)
+        metrics.increment('roster_load.coalesced' if shared or reused else 'roster_load.miss')
+        return roster
+    
+    def _refresh_roster(self, has_cached):
+        """Baca ulang roster (probe dulu jika ada cache) lalu perbarui cache & snapshot"""
+        # Tanpa store lokal: sheet tidak berubah -> pakai cache lagi
+        revision = None
+        if has_cached and self.store is None:
+            revision = self._probe_sheet_revision()
+            if self._sheet_unchanged(revision):
+                with self._roster_lock:
+                    if self._roster is not None:
+                        self._roster.fetched_at = time.time()
+                        self._roster_loaded_at = time.monotonic()
+                        self._save_snapshot(self._roster)
+                        return self._roster
+        
+        roster = self._load_student_data(revision)
+        
+        with self._roster_lock:
+            self._roster = roster
+            self._roster_loaded_at = time.monotonic()
+            self._rebuild_row_index(roster)
+            # Perubahan yang belum ter-flush tetap berlaku di atas data baru
+            if self.write_buffer is not None:
+                for row_number, values in self.write_buffer.snapshot().items():
+                    self._update_cached_cells(row_number, values)
+            self._save_snapshot(roster)
+        return roster
+    
+    def _schedule_refresh(self):
+        """Perbarui roster di background (sekali jalan, prioritas kuota rendah)"""
+        with self._roster_lock:
+            if self._refresh_pending:
+                return
+            self._refresh_pending = True
+        get_executor('sheets').submit(self._background_refresh)
+    
+    def _background_refresh(self):
         try:
-            df = self.get_student_data()
-            if df.empty:
-                return False
-
-            for idx, row in df.iterrows():
-                if str(row['Telegram ID']) == str(telegram_id):
-                    # Update status terakhir
-                    self.worksheet.update_cell(idx + 2, 8, status)
-                    current_hadir = int(row['Total Hadir']) if pd.notna(row['Total Hadir']) else 0
-                    current_alpha = int(row['Total Alpha']) if pd.notna(row['Total Alpha']) else 0
-                    current_izin = int(row['Total Izin']) if pd.notna(row['Total Izin']) else 0
-
-                    if status == 'Hadir':
-                        new_hadir = current_hadir + 1
-                        self.worksheet.update_cell(idx + 2, 5, new_hadir)
-                        self.worksheet.update_cell(idx + 2, 8, 'Hadir')
-                        logger.info(f"✅ Updated Hadir for {row['Nama']}: {current_hadir} → {new_hadir}")
-                    elif status == 'Alpha':
-                        new_alpha = current_alpha + 1
-                        self.worksheet.update_cell(idx + 2, 6, new_alpha)
-                        self.worksheet.update_cell(idx + 2, 8, 'Alpha')
-                        logger.info(f"✅ Updated Alpha for {row['Nama']}: {current_alpha} → {new_alpha}")
-                    elif status == 'Izin':
-                        new_izin = current_izin + 1
-                        self.worksheet.update_cell(idx + 2, 7, new_izin)
-                        self.worksheet.update_cell(idx + 2, 8, 'Izin')
-                        logger.info(f"✅ Updated Izin for {row['Nama']}: {current_izin} → {new_izin}")
-
-                    logger.info(f"✅ Updated record for {row['Nama']}: {status}")
-                    return True
-            
-            logger.warning(f"❌ Telegram ID {telegram_id} tidak ditemukan")
-            return False
-            
+            with request_priority(BACKGROUND):
+                self._load_roster_coalesced(True, time.monotonic())
         except Exception as e:
-            logger.error(f"Error updating student record: {e}")
-            return False
+            logger.warning(f"⚠️ Pembaruan roster di background gagal, tetap memakai data lama: {e}")
+        finally:
+            with self._roster_lock:
+                self._refresh_pending = False
     
-    def check_auto_kick_conditions(self):
-        """Memeriksa kondisi untuk mengeluarkan murid secara otomatis"""
+    def _restore_snapshot(self):
+        """Muat snapshot dari disk saat start (sekali), dianggap kedaluwarsa agar segera diperbarui"""
+        if self.snapshot is None or self._snapshot_checked:
+            return
+        self._snapshot_checked = True
+        loaded = self.snapshot.load()
+        if loaded is None:
+            return
+        roster, positions, revision = loaded
+        self._roster = roster
+        self._roster_loaded_at = 0.0
+        self._column_positions = positions
+        self._sheet_revision = revision
+        self._rebuild_row_index(roster)
+        logger.info(f"💾 Roster dimuat dari snapshot: {len(roster)} murid (umur {roster.age():.0f} detik)")
+    
+    def _save_snapshot(self, roster):
+        if self.snapshot is None:
+            return
         try:
-            df = self.get_student_data()
-            students_to_kick = []
-            students_to_warn = []
-            
-            for _, student in df.iterrows():
-                telegram_id = student['Telegram ID']
-                total_alpha = int(student['Total Alpha']) if pd.notna(student['Total Alpha']) else 0
-                total_izin = int(student['Total Izin']) if pd.notna(student['Total Izin']) else 0
-                nama = student['Nama']
-                
-                # Kick: Alpha atau Izin 4 kali
-                if total_alpha >= 3 or total_izin >=4:
-                    students_to_kick.append({
-                        'telegram_id': telegram_id,
-                        'nama': nama,
-                        'alasan': f"Alpha {total_alpha}x atau Izin {total_izin}x"
-                    })
-                
-                # Peringatan: Izin 3 kali dan Alpha 2 kali
-                if total_izin >= 3 or total_alpha >= 2:
-                    students_to_warn.append({
-                        'telegram_id': telegram_id,
-                        'nama': nama,
-                        'total_izin': total_izin,
-                        'total_alpha': total_alpha
-                    })
-
-            logger.info(f"🔍 Auto-kick check: {len(students_to_kick)} akan dikick, {len(students_to_warn)} peringatan")
-            return students_to_kick, students_to_warn
-        
+            self.snapshot.save(roster, self._column_positions, self._sheet_revision)
         except Exception as e:
-            logger.error(f"Error checking auto-kick conditions: {e}")
-            return [], []
-
-    def reset_daily_attendance(self):
-        """Reset status kehadiran harian"""
+            logger.warning(f"⚠️ Gagal menyimpan snapshot roster: {e}")
+    
+    def _is_roster_fresh(self):
+        """Cek apakah roster di cache masih dalam batas TTL"""
+        return (
+            self._roster is not None
+            and time.monotonic() - self._roster_loaded_at < self.roster_cache_ttl
+        )
+    
+    def invalidate_roster_cache(self):
+        """Buang roster di cache agar pembacaan berikutnya mengambil dari Sheets"""
+        with self._roster_lock:
+            self._roster = None
+            self._roster_loaded_at = 0.0
+            self._row_index = {'telegram_id': {}, 'email': {}, 'username': {}}
+            self._sheet_revision = None
+        logger.info("🧹 Cache roster dikosongkan")
+    
+    def _probe_sheet_revision(self):
+        """Ambil versi spreadsheet dari Drive API, None jika probe mati/gagal"""
+        if not self.change_probe_enabled:
+            return None
         try:
-            df = self.get_student_data()
-            for idx, row in df.iterrows():
-                self.worksheet.update_cell(idx + 2, 8, 'Belum Absen')  # Reset status terakhir
-            logger.info("Status kehadiran harian direset")
+            return self.clients.file_revision(self.spreadsheet_url)
         except Exception as e:
-            logger.error(f"Error resetting attendance: {e}")
+            metrics.increment('sheet_probe.error')
+            logger.warning(f"⚠️ Probe perubahan sheet gagal, baca ulang penuh: {e}")
+            return None
+    
+    def _sheet_unchanged(self, revision):
+        """True jika versi sheet sama dengan saat roster terakhir dibaca"""
+        if revision is None:
+            return False
+        if revision == self._sheet_revision:
+            metrics.increment('sheet_probe.hit')
+            return True
+        metrics.increment('sheet_probe.miss')
+        return False
+    
+    @staticmethod
+    def _index_key(field, value):
+        """Normalisasi nilai kunci index (Telegram ID, email, username)"""
+        if value is None:
+            return None
+        value = str(value).strip()
+        if field == 'telegram_id':
+            return value or None
+        value = value.lower()
+        if field == 'username':
+            value = value.lstrip('@')
+            if value == '-':
+                return None
+        return value or None
+    
+    def _rebuild_row_index(self, roster):
+        """Bangun ulang index baris dari roster yang baru dimuat"""
+        index = {'telegram_id': {}, 'email': {}, 'username': {}}
+        for student in roster:
+            for field in index:
+                key = self._index_key(field, getattr(student, field))
+                if key is not None:
+                    index[field].setdefault(key, student.row_number)
+        self._row_index = index
+    
+    def _index_row(self, row_number, telegram_id=None, email=None, username=None):
+        """Tambahkan satu baris ke index (dipakai saat register)"""
+        for field, value in (('telegram_id', telegram_id), ('email', email), ('username', username)):
+            key = self._index_key(field, value)
+            if key is not None:
+                self._row_index[field].setdefault(key, row_number)
+    
+    def find_student_row(self, telegram_id=None, email=None, username=None):
+        """Cari nomor baris sheet murid lewat index (O(1))"""
+        if self.get_student_data().empty:
+            return None
+        with self._roster_lock:
+            for field, value in (('telegram_id', telegram_id), ('email', email), ('username', username)):
+                key = self._index_key(field, value)
+                if key is not None and key in self._row_index[field]:
+                    return self._row_index[field][key]
+        return None
+    
+    def knows_student(self, telegram_id):
+        """Cek Telegram ID di index roster yang sudah dimuat (tanpa membaca Sheets)"""
+        key = self._index_key('telegram_id', telegram_id)
+        with self._roster_lock:
+            return key is not None and key in self._row_index['telegram_id']
+    
+    def get_student(self, telegram_id=None, email=None, username=None):
+        """Ambil salinan data satu murid (Student) lewat index, None jika tidak ada"""
+        row_number = self.find_student_row(telegram_id, email, username)
+        if row_number is None:
+            return None
+        with self._roster_lock:
+            student = self._roster.at_row(row_number) if self._roster is not None else None
+            return student.copy() if student is not None else None
+    
+    def _load_student_data(self, revision=None):
+        """Mengambil data murid dari store lokal (jika aktif) atau dari spreadsheet"""
+        if self.store is None:
+            return self._load_sheet_data(revision)
+        if self.store.is_empty():
+            # Start pertama: isi store dari sheet
+            self.store.merge_from_sheet(self._load_sheet_data())
+        return self.store.load_roster()
+    
+    def _load_sheet_data(self, revision=None):
+        """Mengambil data murid dari spreadsheet dan konversi tipe data.
 
-    def get_student_emails(self):
-        """Ambil daftar email siswa dari spreadsheet"""
-        df = self.get_student_data()
-        # Filter hanya siswa yang memiliki email
-        students_with_email = df[df['Email'].notna() & (df['Email'] != '')]
-        return students_with_email['Email'].tolist()
+        `revision` adalah hasil probe yang diambil sebelum membaca; jika tidak
+        diberikan, probe dijalankan di sini. Probe selalu sebelum pembacaan agar
+        edit yang terjadi selama membaca tetap terdeteksi pada probe berikutnya.
+        """
+        if revision is None:
+            revision = self._probe_sheet_revision()
+        # Satu request untuk nilai mentah, header dipetakan sekali oleh parser
+        values = self.worksheet.get_values()
+        metrics.increment('sheet_reload.full')
+        roster, self._column_positions = parse_roster(values)
+        roster.fetched_at = time.time()
+        self._sheet_revision = revision
 
-    def initialize_classroom_service(self):
-        """Inisialisasi Google Classroom service"""
-        try:
-            if not hasattr(self, 'classroom_service') or self.classroom_service is None:
-                creds = self.get_credentials()
-                if creds:
-                    self.classroom_service = build('classroom', 'v1', credentials=creds)
-            return self.classroom_service
-        except Exception as e:
-            logger.error(f"Error initializing Classroom service: {e}")
-            return None
+        logger.info(f"📊 Berhasil membaca {len(roster)} records")
+        return roster
+    
+    def column_positions(self):
+        """Posisi kolom (1-based) dari header sheet, dibaca sekali lalu di-cache"""
+        if self._column_positions is None:
+            self._column_positions = map_header(self.worksheet.row_values(1))
+        return self._column_positions
+    
+    def _sheet_row(self, record):
+        """Susun satu baris sheet dari {kolom: nilai} sesuai urutan header"""
+        positions = self.column_positions()
+        row = [''] * max(positions.values())
+        for column, value in record.items():
+            if column in positions:
+                row[positions[column] - 1] = value
+        return row
+    
+    def _update_cached_cells(self, row_number, values):
+        """Terapkan perubahan sel ke roster di cache (write-through)"""
+        with self._roster_lock:
+            if self._roster is None or self._roster.at_row(row_number) is None:
+                return
+            student = self._roster.at_row(row_number)
+            for column, value in values.items():
+                student.set(column, value)
 
-    def get_students_without_submission(self, course_id, coursework_id):
-        """Dapatkan siswa yang belum mengumpulkan tugas berdasarkan email di spreadsheet"""
-        try:
-            # Dapatkan email siswa yang terdaftar
-            student_emails = self.get_student_emails()
-        
-            if not student_emails:
-                return [], "Tidak ada email siswa yang terdaftar di spreadsheet"
-        
-            # Inisialisasi classroom service
-            classroom_service = self.initialize_classroom_service()
-            if not classroom_service:
-                return [], "Gagal menginisialisasi Classroom service"
-        
-            # Dapatkan submission dari Classroom
-            submissions = classroom_service.courses().courseWork().studentSubmissions().list(
-                courseId=course_id,
-                courseWorkId=coursework_id
-            ).execute()
-        
-            submitted_emails = []
-            if submissions.get('studentSubmissions'):
-                for submission in submissions['studentSubmissions']:
-                    # Dapatkan email student dari submission
-                    student_profile = classroom_service.userProfiles().get(
-                        userId=submission['userId']
-                    ).execute()
-                    student_email = student_profile.get('emailAddress', '')
-                    if student_email:
-                        submitted_emails.append(student_email.lower())
-        
-            # Cari siswa yang terdaftar tapi belum submit
-            students_without_submission = []
-            for email in student_emails:
-                if email.lower() not in submitted_emails:
-                    students_without_submission.append(email)
+    def _commit_changes(self, changes_by_row):
+        """Kirim perubahan {nomor_baris: {kolom: nilai}} ke Sheets dalam satu batch_update"""
+        positions = self.column_positions()
+        batch = SheetWriteBatch(self.worksheet)
+        for row_number, values in changes_by_row.items():
+            for column, value in values.items():
+                batch.set(row_number, positions[column], value)
+        batch.commit()
+    
+    def write_changes(self, changes_by_row, defer=False):
+        """Terapkan perubahan ke cache lalu tulis ke Sheets.
+
+        Dengan store lokal aktif, perubahan disimpan di SQLite dan dikirim ke
+        sheet oleh sync_with_sheet. Dengan write-behind aktif, perubahan selalu
+        lewat antrian agar urutannya terjaga; `defer=True` berarti cukup
+        diantrekan dan di-flush nanti, selain itu antrian langsung di-flush
+        (dan dicoba lagi jika gagal).
+        """
+        if self.store is not None:
+            self.store.save_changes(changes_by_row)
+            for row_number, values in changes_by_row.items():
+                self._update_cached_cells(row_number, values)
+            return
         
-            return students_without_submission, f"Berhasil memeriksa {len(student_emails)} siswa terdaftar"
+        if self.write_buffer is not None:
+            self.write_buffer.add(changes_by_row)
+            for row_number, values in changes_by_row.items():
+                self._update_cached_cells(row_number, values)
+            if not defer:
+                self.write_buffer.flush()
+            return
         
-        except Exception as e:
-            logger.error(f"Error checking submissions: {e}")
-            return [], f"Error: {str(e)}"
+        self._commit_changes(changes_by_row)
+        for row_number, values in changes_by_row.items():
+            self._update_cached_cells(row_number, values)
+    
+    def flush_pending_writes(self):
+        """Kirim semua absen yang masih tertunda (dipanggil saat shutdown)"""
+        if self.write_buffer is not None:
+            self.write_buffer.stop()
+        if self.history_buffer is not None:
+            self.history_buffer.stop()
+        if self.store is not None:
+            # Tunggu sync_roster yang sedang jalan agar delta tidak dikirim (dan dikurangi) dua kali
+            with self._sync_lock:
+                self.push_local_changes()
+                self.flush_attendance_log()
+    
+    def push_local_changes(self):
+        """Kirim kolom dirty dari store lokal ke sheet, kembalikan jumlah baris.
 
+        Harus dipanggil dengan `_sync_lock`.
+        """
+        changes, pushed = self.store.dirty_changes()
+        if not changes:
+            return 0
+        self._commit_changes(changes)
+        self.store.mark_clean(pushed)
+        return len(changes)
+    
+    def sync_with_sheet(self, force=False):
+        """Sinkronisasi dua arah store lokal <-> worksheet.
 
-class ClassroomAutoReminder:
-    def __init__(self, bot_instance):
-        self.bot = bot_instance
-        self.running = False
-        self.reminder_thread = None
+        Tarik data sheet dulu (edit admin masuk ke store, baris dicocokkan lewat
+        Telegram ID), lalu kirim kolom yang diubah bot dengan nomor baris terbaru.
+        Penarikan dilewati jika probe menunjukkan sheet belum berubah, kecuali
+        `force=True`.
+        """
+        if self.store is None:
+            return False
+        with self._sync_lock:
+            try:
+                revision = self._probe_sheet_revision()
+                if force or not self._sheet_unchanged(revision):
+                    self.store.merge_from_sheet(self._load_sheet_data(revision))
+                else:
+                    self.store.mark_pulled()
+                # Push mengubah versi sheet, jadi sync berikutnya akan menarik ulang sekali
+                pushed = self.push_local_changes()
+                self.flush_attendance_log()
+            except Exception as e:
+                logger.error(f"❌ Error syncing local store with sheet: {e}")
+                return False
+            
+            with self._roster_lock:
+                roster = self.store.load_roster()
+                self._roster = roster
+                self._roster_loaded_at = time.monotonic()
+                self._rebuild_row_index(roster)
+        logger.info(f"🔄 Sync roster selesai: {len(roster)} murid, {pushed} baris dikirim ke sheet")
+        return True
     
-    def get_all_coursework(self, course_id):
-        """Ambil semua tugas dari course tertentu"""
-        try:
-            classroom_service = self.bot.initialize_classroom_service()
-            if not classroom_service:
-                return []
-                
-            coursework = classroom_service.courses().courseWork().list(
-                courseId=course_id
-            ).execute()
+    def reload_from_sheet(self):
+        """Muat ulang roster dari spreadsheet (misal setelah admin edit manual)"""
+        if self.store is not None:
+            self.sync_with_sheet(force=True)
+        else:
+            self.invalidate_roster_cache()
+        return self.get_student_data()
+
+    def _student_lock(self, telegram_id):
+        """Lock milik satu murid (dibuat saat pertama dipakai)"""
+        key = self._index_key('telegram_id', telegram_id)
+        with self._student_locks_lock:
+            lock = self._student_locks.get(key)
+            if lock is None:
+                lock = self._student_locks[key] = threading.Lock()
+            return lock
+    
+    def _read_sheet_row(self, row_number):
+        """Baca satu baris sheet (1 request kecil) sebagai {kolom: nilai}"""
+        values = self.worksheet.row_values(row_number)
+        return {
+            column: values[position - 1] if position <= len(values) else ''
+            for column, position in self.column_positions().items()
+        }
+    
+    def _increment_on_sheet(self, telegram_id, deltas, values):
+        """Compare-and-set counter satu murid langsung di sheet.
+
+        Hanya baris murid yang dibaca ulang. Jika baris sudah bergeser (Telegram
+        ID berbeda) index dimuat ulang; jika counter di sheet tidak sama dengan
+        nilai yang diharapkan (misal diedit admin), nilai di cache diperbarui
+        lalu dicoba lagi. Kembalikan (nomor_baris, record lengkap setelah update)
+        dari baris yang benar-benar dibaca dan ditulis, atau None jika murid
+        tidak ditemukan.
+        """
+        expected_id = self._index_key('telegram_id', telegram_id)
+        for attempt in range(1, COUNTER_CAS_MAX_RETRIES + 1):
+            row_number = self.find_student_row(telegram_id=telegram_id)
+            if row_number is None:
+                return None
+            student = self.get_student(telegram_id=telegram_id)
+            expected = {column: student.get(column) for column in deltas}
             
-            active_assignments = []
-            if coursework.get('courseWork'):
-                for assignment in coursework['courseWork']:
-                    # Cek apakah tugas masih aktif (belum lewat due date)
-                    if assignment.get('dueDate'):
-                        due_date = datetime(
-                            assignment['dueDate']['year'],
-                            assignment['dueDate']['month'], 
-                            assignment['dueDate']['day']
-                        )
-                        # Jika due date masih di masa depan atau hari ini
-                        if due_date >= datetime.now().replace(hour=0, minute=0, second=0, microsecond=0):
-                            active_assignments.append(assignment)
+            fresh = self._read_sheet_row(row_number)
+            if self._index_key('telegram_id', parse_int(fresh['Telegram ID'])) != expected_id:
+                metrics.increment('counter_cas.row_moved')
+                logger.warning(f"⚠️ Baris {row_number} sudah bergeser, memuat ulang index (percobaan {attempt})")
+                self.get_student_data(force_refresh=True)
+                continue
             
-            return active_assignments
-        except Exception as e:
-            logger.error(f"Error getting coursework: {e}")
-            return []
+            current = {column: parse_int(fresh[column]) for column in deltas}
+            if current != expected:
+                metrics.increment('counter_cas.conflict')
+                logger.warning(f"⚠️ Counter baris {row_number} berubah di sheet {expected} → {current}, coba lagi")
+                self._update_cached_cells(row_number, current)
+                continue
+            
+            # Counter lain di baris ini juga diambil dari sheet (misal baru diedit admin)
+            counters = {column: parse_int(fresh[column]) for column in self.STATUS_COUNTERS.values()}
+            self._update_cached_cells(row_number, counters)
+            changes = {column: expected[column] + amount for column, amount in deltas.items()}
+            changes.update(values)
+            self.write_changes({row_number: changes})
+            metrics.increment('counter_cas.success')
+            return row_number, {**fresh, 'Telegram ID': parse_int(fresh['Telegram ID']), **counters, **changes}
+        
+        metrics.increment('counter_cas.failed')
+        raise RuntimeError(f"Counter Telegram ID {telegram_id} terus berubah setelah {COUNTER_CAS_MAX_RETRIES} percobaan")
     
-    def get_students_without_submission_for_coursework(self, course_id, coursework_id):
-        """Dapatkan siswa yang belum mengumpulkan tugas tertentu"""
+    def _increment_buffered(self, telegram_id, deltas, values):
+        """Increment counter di mode write-behind tanpa membaca sheet.
+
+        Nilai baru = nilai di cache ditambah delta; nilai sel yang masih antre
+        di buffer dipakai lebih dulu karena lebih baru dari isi sheet. Hasilnya
+        diantrekan (defer) dan dikirim oleh flusher write-behind. Kembalikan
+        (nomor_baris, record lengkap setelah update) atau None.
+        """
+        row_number = self.find_student_row(telegram_id=telegram_id)
+        if row_number is None:
+            return None
+        with self._roster_lock:
+            student = self._roster.at_row(row_number) if self._roster is not None else None
+            if student is None:
+                return None
+            pending = self.write_buffer.snapshot().get(row_number, {})
+            changes = {
+                column: parse_int(pending.get(column, student.get(column))) + amount
+                for column, amount in deltas.items()
+            }
+            changes.update(values)
+            self.write_changes({row_number: changes}, defer=True)
+            record = {**student.to_record(), **pending, **changes}
+        metrics.increment('write_behind.queued')
+        return row_number, record
+
+    
+    def update_student_record(self, telegram_id, status, source='absen'):
+        """Update record kehadiran murid.
+
+        Counter ditambah sebagai delta, bukan menulis ulang nilai dari roster
+        yang mungkin basi: lewat store lokal (delta ikut disinkronkan), antrian
+        write-behind (jika aktif), atau compare-and-set per baris di sheet. Update untuk murid yang sama dari
+        proses ini diserialkan dengan lock per murid. Setiap absen juga dicatat
+        sebagai event di log riwayat (`source` = asal absen).
+
+        Kembalikan Student dengan counter dan status hasil update, dibangun dari
+        baris yang benar-benar ditulis (tanpa membaca ulang sheet), None jika gagal.
+        """
+        counter = self.STATUS_COUNTERS.get(status)
+        deltas = {counter: 1} if counter else {}
         try:
-            student_emails = self.bot.get_student_emails()
-            
-            if not student_emails:
-                return [], "Tidak ada email siswa terdaftar"
-            
-            # Dapatkan submission
-            classroom_service = self.bot.initialize_classroom_service()
-            if not classroom_service:
-                return [], "Gagal menginisialisasi Classroom service"
+            with self._student_lock(telegram_id):
+                student = self.get_student(telegram_id=telegram_id)
+                if student is None:
+                    logger.warning(f"❌ Telegram ID {telegram_id} tidak ditemukan")
+                    return None
+                event = self._attendance_event(student, status, source) if self.attendance_log_enabled else None
                 
-            submissions = classroom_service.courses().courseWork().studentSubmissions().list(
-                courseId=course_id,
-                courseWorkId=coursework_id
-            ).execute()
+                if self.store is not None:
+                    # Event dan counter ditulis dalam satu transaksi SQLite
+                    updated = self.store.increment(student.row_number, deltas, {'Status Terakhir': status}, event)
+                    result = None
+                    if updated is not None:
+                        self._update_cached_cells(student.row_number, updated)
+                        result = student.row_number, {**student.to_record(), **updated}
+                else:
+                    if self.write_buffer is not None:
+                        result = self._increment_buffered(telegram_id, deltas, {'Status Terakhir': status})
+                    else:
+                        result = self._increment_on_sheet(telegram_id, deltas, {'Status Terakhir': status})
+                    if result is not None and event is not None:
+                        # Dikirim ke worksheet riwayat oleh flusher (per batch)
+                        self.history_buffer.add([event])
             
-            submitted_emails = []
-            if submissions.get('studentSubmissions'):
-                for submission in submissions['studentSubmissions']:
-                    if submission['state'] == 'TURNED_IN' or submission['state'] == 'RETURNED':
-                        student_profile = classroom_service.userProfiles().get(
-                            userId=submission['userId']
-                        ).execute()
-                        student_email = student_profile.get('emailAddress', '')
-                        if student_email:
-                            submitted_emails.append(student_email.lower())
-            
-            # Siswa yang belum submit
-            students_without_submission = []
-            for email in student_emails:
-                if email.lower() not in submitted_emails:
-                    students_without_submission.append(email)
+            if result is None:
+                logger.warning(f"❌ Telegram ID {telegram_id} tidak ditemukan")
+                return None
             
-            return students_without_submission, "Berhasil memeriksa"
+            row_number, record = result
+            if counter:
+                logger.info(f"✅ Updated {status} for {telegram_id}: {counter} → {record[counter]}")
+            logger.info(f"✅ Updated record for {telegram_id}: {status}")
+            return Student.from_record(row_number, record)
             
         except Exception as e:
-            logger.error(f"Error checking submissions: {e}")
-            return [], f"Error: {str(e)}"
-    
-    def format_reminder_message(self, assignment, late_students, course_id):
-        """Format pesan reminder yang akan dikirim ke grup"""
-        due_date = f"{assignment['dueDate']['day']}/{assignment['dueDate']['month']}/{assignment['dueDate']['year']}"
-        
-        # Dapatkan data siswa yang terlambat
-        df = self.bot.get_student_data()
-        late_students_data = df[df['Email'].isin(late_students)]
-        
-        student_list = []
-        for _, student in late_students_data.iterrows():
-            student_info = f"• {student['Nama']}"
-            if student.get('Username') and student['Username'] != '-':
-                student_info += f" (@{student['Username'].replace('@', '')})"
-            student_list.append(student_info)
-        
-        message = (
-            f"📢 **REMINDER TUGAS CLASSROOM**\n\n"
-            f"📚 **Tugas:** {assignment['title']}\n"
-            f"⏰ **Deadline:** {due_date}\n"
-            f"❌ **Belum mengumpulkan:** {len(late_students)} siswa\n\n"
-        )
-        
-        if late_students:
-            message += f"**Siswa yang belum mengumpulkan:**\n{chr(10).join(student_list)}\n\n"
-        
-        days_left = (datetime(
-            assignment['dueDate']['year'],
-            assignment['dueDate']['month'],
-            assignment['dueDate']['day']
-        ) - datetime.now()).days
-        
-        if days_left == 0:
-            message += "🚨 **HARI INI BATAS AKHIR PENGUMPULAN!**\n"
-        elif days_left == 1:
-            message += "⚠️ **BESOK BATAS AKHIR PENGUMPULAN!**\n"
-        elif days_left > 1:
-            message += f"📅 **Sisa waktu: {days_left} hari**\n"
-        else:
-            message += "❌ **TUGAS SUDAH MELEWATI BATAS WAKTU**\n"
-        
-        message += f"\n🔗 **Link Tugas:** https://classroom.google.com/c/{course_id}/a/{assignment['id']}/details"
-        
-        return message
+            logger.error(f"Error updating student record: {e}")
+            return None
     
-    def send_reminder_to_group(self, context, chat_id, message):
-        """Kirim reminder ke grup"""
-        try:
-            context.bot.send_message(
-                chat_id=chat_id,
-                text=message,
-                parse_mode='Markdown'
-            )
-            logger.info(f"Reminder sent to group {chat_id}")
-        except Exception as e:
-            logger.error(f"Error sending reminder: {e}")
+    # ==================== LOG ABSEN ====================
+    @staticmethod
+    def _attendance_event(student, status, source):
+        """Event absen satu murid untuk pertemuan hari ini (WIB)"""
+        now = datetime.now(WIB)
+        return {
+            'created_at': now.strftime('%Y-%m-%d %H:%M:%S'),
+            'meeting_date': now.date().isoformat(),
+            'telegram_id': str(student.telegram_id),
+            'nama': student.nama,
+            'status': status,
+            'source': source,
+        }
     
-    def check_and_send_reminders(self, context, course_id, group_chat_id):
-        """Cek semua tugas aktif dan kirim reminder"""
-        try:
-            assignments = self.get_all_coursework(course_id)
-            
-            if not assignments:
-                logger.info("No active assignments found")
-                return
-            
-            for assignment in assignments:
-                late_students, status_msg = self.get_students_without_submission_for_coursework(
-                    course_id, assignment['id']
+    def _history_worksheet(self):
+        """Worksheet riwayat absen (dibuat beserta header jika belum ada)"""
+        with self._history_lock:
+            try:
+                return self.clients.worksheet(self.history_worksheet_name, self.spreadsheet_url)
+            except gspread.exceptions.WorksheetNotFound:
+                worksheet = self.clients.spreadsheet(self.spreadsheet_url).add_worksheet(
+                    title=self.history_worksheet_name, rows=1000, cols=len(self.HISTORY_HEADER)
                 )
+                worksheet.append_row(self.HISTORY_HEADER)
+                logger.info(f"✅ Worksheet riwayat '{self.history_worksheet_name}' dibuat")
+                return self.clients.worksheet(self.history_worksheet_name, self.spreadsheet_url)
+    
+    def _append_history_rows(self, events):
+        """Tambahkan event ke worksheet riwayat dalam satu request"""
+        rows = [[event[column] for column in EVENT_COLUMNS] for event in events]
+        self._history_worksheet().append_rows(rows, value_input_option='RAW')
+    
+    def flush_attendance_log(self):
+        """Kirim event absen yang belum tersinkron ke worksheet riwayat.
 
-            if late_students:
-                reminder_message = self.format_reminder_message(
-                    assignment, late_students, course_id
-                )
-                self.send_reminder_to_group(context, group_chat_id, reminder_message)
-                    # Tunggu 2 detik antara setiap pengiriman pesan
-                time.sleep(2)
-                    
-        except Exception as e:
-            logger.error(f"Error in auto reminder: {e}")
+        Event dikirim per batch (satu append_rows per batch) lalu ditandai
+        tersinkron. Kembalikan jumlah event yang dikirim.
+        """
+        if self.history_buffer is not None:
+            return self.history_buffer.flush()
+        if self.store is None or not self.attendance_log_enabled:
+            return 0
+        sent = 0
+        while True:
+            pending = self.store.pending_events(HISTORY_FLUSH_BATCH)
+            if not pending:
+                break
+            self._append_history_rows([event for _, event in pending])
+            self.store.mark_events_synced([event_id for event_id, _ in pending])
+            sent += len(pending)
+        if sent:
+            logger.info(f"📝 {sent} event absen dikirim ke worksheet '{self.history_worksheet_name}'")
+        return sent
     
-    def should_send_reminder(self):
-        """Cek apakah sekarang jam 08:00 atau 18:00"""
-        now = datetime.now()
-        current_hour = now.hour
-        current_minute = now.minute
+    def meeting_attendance(self, meeting_date):
+        """Status terakhir tiap murid pada satu pertemuan: {telegram_id: event}.
+
+        `meeting_date` berupa date atau string YYYY-MM-DD. Dibaca dari store
+        lokal jika aktif, selain itu dari worksheet riwayat.
+        """
+        if isinstance(meeting_date, date):
+            meeting_date = meeting_date.isoformat()
+        if self.store is not None:
+            return self.store.meeting_attendance(meeting_date)
         
-        # Kirim hanya jam 08:00 atau 18:00 (dalam rentang 1 menit)
-        return (current_hour == 8 and current_minute == 0) or (current_hour == 18 and current_minute == 0)
+        attendance = {}
+        for event in self._sheet_history_events():
+            if event.get('meeting_date') == meeting_date:
+                # Baris di bawah lebih baru, jadi menimpa event sebelumnya
+                attendance[event['telegram_id']] = event
+        return attendance
     
-    def start_daily_reminders(self, context, course_id, group_chat_id):
-        """Mulai reminder harian otomatis"""
-        if self.running:
-            return "Reminder sudah berjalan"
-        
-        self.running = True
-        
-        def reminder_job():
-            last_reminder_date = None
-            
-            while self.running:
-                try:
-                    now = datetime.now()
-                    
-                    # Cek apakah sudah waktunya kirim reminder (08:00 atau 18:00)
-                    if self.should_send_reminder():
-                        # Cek apakah sudah kirim reminder hari ini di jam ini
-                        today = now.date()
-                        current_hour = now.hour
-                        
-                        if last_reminder_date != (today, current_hour):
-                            self.check_and_send_reminders(context, course_id, group_chat_id)
-                            last_reminder_date = (today, current_hour)
-                            logger.info(f"Auto reminder sent at {now}")
-                    
-                    # Tunggu 55 detik sebelum cek lagi
-                    time.sleep(55)
-                        
-                except Exception as e:
-                    logger.error(f"Error in reminder job: {e}")
-                    time.sleep(300)  # Tunggu 5 menit jika error
-        
-        self.reminder_thread = Thread(target=reminder_job)
-        self.reminder_thread.daemon = True
-        self.reminder_thread.start()
+    def iter_attendance_events(self, start=None, end=None):
+        """Iterasi event absen dengan tanggal pertemuan start..end (date / YYYY-MM-DD, opsional).
+
+        Dari store lokal jika aktif, selain itu dari worksheet riwayat.
+        """
+        start = start.isoformat() if isinstance(start, date) else start
+        end = end.isoformat() if isinstance(end, date) else end
+        if self.store is not None:
+            yield from self.store.iter_events(start, end)
+            return
         
-        return "✅ Reminder harian otomatis telah diaktifkan!\nBot akan mengecek setiap hari jam 08:00 dan 18:00"
+        for event in self._sheet_history_events():
+            meeting_date = event.get('meeting_date', '')
+            if (start and meeting_date < start) or (end and meeting_date > end):
+                continue
+            yield event
     
-    def stop_reminders(self):
-        """Hentikan reminder otomatis"""
-        self.running = False
-        try:
-            if self.reminder_thread:
-                self.reminder_thread.join(timeout=5)
-                return "❌ Reminder otomatis dihentikan"            
-                logger.info("✅ Berhasil terhubung ke Google Sheets!")
-            
-        except Exception as e:
-            logger.error(f"❌ Error connecting to Google Sheets: {e}")
-            raise
+    def _sheet_history_events(self, chunk_size=1000):
+        """Event di worksheet riwayat, diikuti event yang masih di antrian.
+
+        Worksheet dibaca per range `chunk_size` baris sehingga riwayat panjang
+        tidak dimuat ke memori sekaligus.
+        """
+        pending = self.history_buffer.snapshot() if self.history_buffer is not None else []
+        worksheet = self._history_worksheet()
+        last_column = len(self.HISTORY_HEADER)
+        start = 2
+        while start <= worksheet.row_count:
+            end = start + chunk_size - 1
+            rows = worksheet.get_values(f"{rowcol_to_a1(start, 1)}:{rowcol_to_a1(end, last_column)}")
+            for row in rows:
+                if any(row):
+                    yield dict(zip(EVENT_COLUMNS, row))
+            if len(rows) < chunk_size:
+                break
+            start = end + 1
+        yield from pending
     
-    def setup_classroom(self):
-        """Setup koneksi ke Google Classroom"""
+    def update_student_status(self, telegram_id, status):
+        """Update kolom Status Terakhir satu murid"""
         try:
-            self.classroom_manager = ClassroomManager()
+            row_number = self.find_student_row(telegram_id=telegram_id)
+            if row_number is None:
+                return False
+            self.write_changes({row_number: {'Status Terakhir': status}})
+            return True
         except Exception as e:
-            logger.warning(f"Google Classroom tidak tersedia: {e}")
-            self.classroom_manager = None
+            logger.error(f"Error updating student status: {e}")
+            return False
     
-    def get_student_data(self):
-        """Mengambil data murid dari spreadsheet dan konversi tipe data"""
-        try:
-            data = self.worksheet.get_all_records()
-            df = pd.DataFrame(data)
-
-            # Konversi kolom numerik dari string ke integer
-            numeric_columns = ['Total Alpha', 'Total Izin', 'Telegram ID']
-
-            for col in numeric_columns:
-                if col in df.columns:
-                    try:
-                    # Coba konversi langsung ke numeric
-                        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-                    except:
-                    # Jika gagal, bersihkan string terlebih dahulu
-                        df[col] = pd.to_numeric(
-                        df[col].astype(str).str.replace('[^0-9.-]', '', regex=True), 
-                        errors='coerce'
-                    ).fillna(0).astype(int)
-
-            logger.info(f"📊 Berhasil membaca {len(df)} records")
-            logger.info(f"📈 Sample data - Alpha: {df['Total Alpha'].iloc[0] if len(df) > 0 else 'N/A'}, Izin: {df['Total Izin'].iloc[0] if len(df) > 0 else 'N/A'}")
-            return df
+    def register_student(self, nama, telegram_id, email, username):
+        """Tambahkan murid baru ke spreadsheet dan ke roster di cache"""
+        with self._register_lock:
+            new_row, = self._append_students([{
+                'Nama': nama, 'Telegram ID': telegram_id, 'Email': email, 'Username': username,
+            }], note="Auto-registered")
+        logger.info(f"✅ Murid baru terdaftar: {nama} ({telegram_id})")
+        return new_row
+    
+    def register_students(self, rows):
+        """Pendaftaran massal: rows = [(nomor_baris_csv, record)] hasil parse_registration_csv.
+
+        Duplikat dicek lewat index Telegram ID / email (termasuk duplikat di
+        dalam file), lalu semua murid baru ditulis dengan satu append_rows.
+        Kembalikan [(nomor_baris_csv, berhasil, keterangan)].
+        """
+        results = []
+        with self._register_lock:
+            self.get_student_data()
+            seen = {'telegram_id': {}, 'email': {}}
+            accepted = []
+            with self._roster_lock:
+                for line, record in rows:
+                    duplicate = None
+                    for field, column in (('telegram_id', 'Telegram ID'), ('email', 'Email')):
+                        key = self._index_key(field, record.get(column))
+                        if key is None:
+                            continue
+                        if key in self._row_index[field]:
+                            duplicate = f"{column} sudah terdaftar (baris sheet {self._row_index[field][key]})"
+                        elif key in seen[field]:
+                            duplicate = f"{column} duplikat dengan baris {seen[field][key]} di file"
+                        if duplicate:
+                            break
+                    if duplicate:
+                        results.append((line, False, duplicate))
+                        continue
+                    for field, column in (('telegram_id', 'Telegram ID'), ('email', 'Email')):
+                        key = self._index_key(field, record.get(column))
+                        if key is not None:
+                            seen[field][key] = line
+                    accepted.append((line, record))
+            
+            if accepted:
+                self._append_students([record for _, record in accepted], note="Bulk import")
+                results.extend((line, True, record['Nama']) for line, record in accepted)
         
-        except Exception as e:
-            logger.error(f"Error getting student data: {e}")
-            return pd.DataFrame()
+        logger.info(f"✅ Import murid: {len(accepted)} ditambahkan, {len(results) - len(accepted)} dilewati")
+        return sorted(results)
     
-    def update_student_record(self, telegram_id, status):
-        """Update record kehadiran murid (simpan data angka)"""
+    @staticmethod
+    def _appended_first_row(response):
+        """Nomor baris pertama hasil append_rows (dari updates.updatedRange), None jika tidak terbaca"""
         try:
-            df = self.get_student_data()
-            if df.empty:
-                return False
-            
-            # Cari baris berdasarkan Telegram ID
-            for idx, row in df.iterrows():
-                if str(row['Telegram ID']) == str(telegram_id):
-                    # Konversi nilai saat ini ke integer (pastikan angka)
-                    current_alpha = int(row['Total Alpha']) if pd.notna(row['Total Alpha']) else 0
-                    current_izin = int(row['Total Izin']) if pd.notna(row['Total Izin']) else 0
-
-                    # Update total alpha atau izin berdasarkan status
-                    if status == 'Alpha':
-                        # Update Total Alpha (angka) dan Status Terakhir (teks)
-                        new_alpha = current_alpha + 1
-                        self.worksheet.update_cell(idx + 2, 5, new_alpha)  # Kolom D: Total Alpha (angka)
-                        self.worksheet.update_cell(idx + 2, 7, 'Alpha')     # Kolom F: Status Terakhir (teks)
-                        logger.info(f"✅ Updated Alpha for {row['Nama']}: {current_alpha} → {new_alpha}")
-
-                    elif status == 'Izin':
-                        # Update Total Izin (angka) dan Status Terakhir (teks)
-                        new_izin = current_izin + 1
-                        self.worksheet.update_cell(idx + 2, 6, new_izin)   # Kolom E: Total Izin (angka)
-                        self.worksheet.update_cell(idx + 2, 7, 'Izin')     # Kolom F: Status Terakhir (teks)
-                        logger.info(f"✅ Updated Izin for {row['Nama']}: {current_izin} → {new_izin}")
-
-                    # Untuk status 'Hadir', hanya update status terakhir saja
-                    elif status == 'Hadir':
-                        # Hanya update Status Terakhir (teks), angka tetap
-                        self.worksheet.update_cell(idx + 2, 7, 'Hadir')    # Kolom F: Status Terakhir (teks)
-                        logger.info(f"✅ Updated status for {row['Nama']}: Hadir")
-                    
-                    logger.info(f"✅ Updated record for {row['Nama']}: {status}")
-                    return True
-            
-            logger.warning(f"❌ Telegram ID {telegram_id} tidak ditemukan")
-            return False
-            
-        except Exception as e:
-            logger.error(f"Error updating student record: {e}")
-            return False
+            updated_range = response['updates']['updatedRange']
+            return a1_to_rowcol(updated_range.rsplit('!', 1)[-1].split(':')[0])[0]
+        except Exception:
+            return None
+    
+    def _append_students(self, records, note):
+        """Tulis murid baru ke sheet dengan satu append_rows lalu ke store dan cache.
 
+        Nomor baris diambil dari range yang dilaporkan Sheets (baris kosong atau
+        baris yang ditambah admin membuat posisinya tidak bisa ditebak). Harus
+        dipanggil dengan `_register_lock`.
+        """
+        records = [{
+            **record, 'Total Hadir': 0, 'Total Alpha': 0, 'Total Izin': 0, 'Status Terakhir': "Belum Absen",
+        } for record in records]
+        new_rows = [self._sheet_row({**record, 'Keterangan': note}) for record in records]
+        response = self.worksheet.append_rows(new_rows)
+        
+        first_row = self._appended_first_row(response)
+        if first_row is None:
+            # Posisi tidak diketahui: muat ulang dari sheet daripada menebak nomor baris
+            logger.warning("⚠️ Range hasil append tidak terbaca, roster dimuat ulang dari sheet")
+            self.reload_from_sheet()
+            return new_rows
+        
+        in_sync = True
+        for offset, record in enumerate(records):
+            row_number = first_row + offset
+            if self.store is not None:
+                self.store.insert_student(row_number, record)
+            with self._roster_lock:
+                if self._roster is not None and self._roster.last_row + 1 == row_number:
+                    self._roster.append(Student.from_record(row_number, record))
+                    self._index_row(row_number, record['Telegram ID'], record['Email'], record['Username'])
+                else:
+                    in_sync = False
+        
+        if not in_sync:
+            # Ada baris di sheet yang belum ada di cache (misal ditambah admin)
+            if self.store is not None:
+                with self._roster_lock:
+                    self._roster = self.store.load_roster()
+                    self._roster_loaded_at = time.monotonic()
+                    self._rebuild_row_index(self._roster)
+            else:
+                self.invalidate_roster_cache()
+        return new_rows
+    
     def check_auto_kick_conditions(self):
         """Memeriksa kondisi untuk mengeluarkan murid secara otomatis"""
         try:
-            df = self.get_student_data()
-            students_to_kick = []
-            students_to_warn = []
-            
-            for _, student in df.iterrows():
-                telegram_id = student['Telegram ID']
-                total_alpha = int(student['Total Alpha']) if pd.notna(student['Total Alpha']) else 0
-                total_izin = int(student['Total Izin']) if pd.notna(student['Total Izin']) else 0
-                nama = student['Nama']
-                
-                # Kick: Alpha dan Izin 3 kali
-                if total_alpha >= 3 or total_izin >=3:
-                    students_to_kick.append({
-                        'telegram_id': telegram_id,
-                        'nama': nama,
-                        'alasan': f"Alpha {total_alpha} kali"
-                    })
-                
-                # Peringatan: Izin 2 kali dan Alpha 2 kali
-                if total_izin >= 2 or total_alpha >= 2:
-                    students_to_warn.append({
-                        'telegram_id': telegram_id,
-                        'nama': nama,
-                        'total_izin': total_izin,
-                        'total_alpha': total_alpha
-                    })
+            roster = self.get_student_data()
+            # Batas kick/peringatan diatur lewat config (KICK_*/WARN_*_THRESHOLD)
+            students_to_kick, students_to_warn = attendance_rules.split(roster)
 
             logger.info(f"🔍 Auto-kick check: {len(students_to_kick)} akan dikick, {len(students_to_warn)} peringatan")
             return students_to_kick, students_to_warn
@@ -577,33 +914,30 @@ class ClassroomAutoReminder:
     def reset_daily_attendance(self):
         """Reset status kehadiran harian"""
         try:
-            df = self.get_student_data()
-            for idx, row in df.iterrows():
-                self.worksheet.update_cell(idx + 2, 6, 'Belum Absen')  # Reset status terakhir
+            roster = self.get_student_data()
+            # Reset status terakhir seluruh murid dalam satu request
+            self.write_changes({
+                student.row_number: {'Status Terakhir': 'Belum Absen'}
+                for student in roster
+            })
             logger.info("Status kehadiran harian direset")
         except Exception as e:
             logger.error(f"Error resetting attendance: {e}")
 
     def get_student_emails(self):
         """Ambil daftar email siswa dari spreadsheet"""
-        df = self.get_student_data()
+        roster = self.get_student_data()
         # Filter hanya siswa yang memiliki email
-        students_with_email = df[df['Email'].notna() & (df['Email'] != '')]
-        return students_with_email['Email'].tolist() 
-
-    # Dalam class AttendanceBot, tambahkan method ini:
+        return [student.email for student in roster if student.email]
 
     def initialize_classroom_service(self):
         """Inisialisasi Google Classroom service"""
         try:
-            if not hasattr(self, 'classroom_service') or self.classroom_service is None:
-                creds = self.get_credentials()
-                self.classroom_service = build('classroom', 'v1', credentials=creds)
-                return self.classroom_service
+            return self.clients.classroom_service
         except Exception as e:
             logger.error(f"Error initializing Classroom service: {e}")
             return None
-    
+
     def get_students_without_submission(self, course_id, coursework_id):
         """Dapatkan siswa yang belum mengumpulkan tugas berdasarkan email di spreadsheet"""
         try:
@@ -613,22 +947,21 @@ class ClassroomAutoReminder:
             if not student_emails:
                 return [], "Tidak ada email siswa yang terdaftar di spreadsheet"
         
-            # Dapatkan submission dari Classroom
-                submissions = self.classroom_service.courses().courseWork().studentSubmissions().list(
-                    courseId=course_id,
-                    courseWorkId=coursework_id
-                ).execute()
-        
-                submitted_emails = []
-            if submissions.get('studentSubmissions'):
-                for submission in submissions['studentSubmissions']:
-                    # Dapatkan email student dari submission
-                    student_profile = self.classroom_service.userProfiles().get(
-                        userId=submission['userId']
-                    ).execute()
-                    student_email = student_profile.get('emailAddress', '')
-                    if student_email:
-                        submitted_emails.append(student_email.lower())
+            # Inisialisasi classroom service
+            classroom_service = self.initialize_classroom_service()
+            if not classroom_service:
+                return [], "Gagal menginisialisasi Classroom service"
+        
+            # Dapatkan submission dari Classroom (semua halaman)
+            submissions = iter_items(
+                classroom_service.courses().courseWork().studentSubmissions(), 'studentSubmissions',
+                courseId=course_id,
+                courseWorkId=coursework_id
+            )
+        
+            # Email student dari submission (profil diambil lewat batch)
+            emails = get_user_emails(classroom_service, [submission['userId'] for submission in submissions])
+            submitted_emails = {email.lower() for email in emails.values() if email}
         
             # Cari siswa yang terdaftar tapi belum submit
             students_without_submission = []
@@ -641,13 +974,20 @@ class ClassroomAutoReminder:
         except Exception as e:
             logger.error(f"Error checking submissions: {e}")
             return [], f"Error: {str(e)}"
-        
+
+
+def get_attendance_bot(context=None, update=None):
+    """Ambil AttendanceBot milik kelas dari chat/job ini (lihat ClassRegistry.resolve)"""
+    from .class_registry import get_class_registry
+    registry = get_class_registry(context)
+    return registry.attendance_bot(registry.resolve(context, update))
+
 
 class ClassroomAutoReminder:
     def __init__(self, bot_instance):
         self.bot = bot_instance
         self.running = False
-        self.reminder_thread = None
+        self.reminder_jobs = []
     
     def get_all_coursework(self, course_id):
         """Ambil semua tugas dari course tertentu"""
@@ -656,23 +996,20 @@ class ClassroomAutoReminder:
             if not classroom_service:
                 return []
                 
-            coursework = classroom_service.courses().courseWork().list(
-                courseId=course_id
-            ).execute()
+            coursework = iter_items(classroom_service.courses().courseWork(), 'courseWork', courseId=course_id)
             
             active_assignments = []
-            if coursework.get('courseWork'):
-                for assignment in coursework['courseWork']:
-                    # Cek apakah tugas masih aktif (belum lewat due date)
-                    if assignment.get('dueDate'):
-                        due_date = datetime(
-                            assignment['dueDate']['year'],
-                            assignment['dueDate']['month'], 
-                            assignment['dueDate']['day']
-                        )
-                        # Jika due date masih di masa depan atau hari ini
-                        if due_date >= datetime.now().replace(hour=0, minute=0, second=0, microsecond=0):
-                            active_assignments.append(assignment)
+            for assignment in coursework:
+                # Cek apakah tugas masih aktif (belum lewat due date)
+                if assignment.get('dueDate'):
+                    due_date = datetime(
+                        assignment['dueDate']['year'],
+                        assignment['dueDate']['month'], 
+                        assignment['dueDate']['day']
+                    )
+                    # Jika due date masih di masa depan atau hari ini
+                    if due_date >= datetime.now().replace(hour=0, minute=0, second=0, microsecond=0):
+                        active_assignments.append(assignment)
             
             return active_assignments
         except Exception as e:
@@ -681,58 +1018,67 @@ class ClassroomAutoReminder:
     
     def get_students_without_submission_for_coursework(self, course_id, coursework_id):
         """Dapatkan siswa yang belum mengumpulkan tugas tertentu"""
+        late_by_coursework, status_msg = self.get_students_without_submission_by_coursework(course_id, [coursework_id])
+        if coursework_id not in late_by_coursework and status_msg == "Berhasil memeriksa":
+            return [], "Gagal mengambil submission tugas"
+        return late_by_coursework.get(coursework_id, []), status_msg
+    
+    def get_students_without_submission_by_coursework(self, course_id, coursework_ids):
+        """Siswa (email) yang belum mengumpulkan beberapa tugas sekaligus: ({coursework_id: [email]}, status).
+
+        Submission semua tugas dan profil siswa yang sudah mengumpulkan diambil
+        lewat batch HTTP, bukan satu request per tugas / per submission. Tugas
+        yang gagal diambil tidak ada di hasil.
+        """
         try:
             student_emails = self.bot.get_student_emails()
             
             if not student_emails:
-                return [], "Tidak ada email siswa terdaftar"
+                return {}, "Tidak ada email siswa terdaftar"
             
-            # Dapatkan submission
             classroom_service = self.bot.initialize_classroom_service()
             if not classroom_service:
-                return [], "Gagal menginisialisasi Classroom service"
-                
-            submissions = classroom_service.courses().courseWork().studentSubmissions().list(
-                courseId=course_id,
-                courseWorkId=coursework_id
-            ).execute()
+                return {}, "Gagal menginisialisasi Classroom service"
             
-            submitted_emails = []
-            if submissions.get('studentSubmissions'):
-                for submission in submissions['studentSubmissions']:
-                    if submission['state'] == 'TURNED_IN' or submission['state'] == 'RETURNED':
-                        student_profile = classroom_service.userProfiles().get(
-                            userId=submission['userId']
-                        ).execute()
-                        student_email = student_profile.get('emailAddress', '')
-                        if student_email:
-                            submitted_emails.append(student_email.lower())
+            submissions = list_submissions(classroom_service, course_id, coursework_ids)
+            submitted_ids = {
+                coursework_id: {
+                    submission['userId'] for submission in items
+                    if submission['state'] == 'TURNED_IN' or submission['state'] == 'RETURNED'
+                }
+                for coursework_id, items in submissions.items()
+            }
+            emails = get_user_emails(classroom_service, set().union(*submitted_ids.values()))
             
             # Siswa yang belum submit
-            students_without_submission = []
-            for email in student_emails:
-                if email.lower() not in submitted_emails:
-                    students_without_submission.append(email)
+            late_by_coursework = {}
+            for coursework_id, user_ids in submitted_ids.items():
+                submitted_emails = {emails[user_id].lower() for user_id in user_ids if emails.get(user_id)}
+                late_by_coursework[coursework_id] = [
+                    email for email in student_emails if email.lower() not in submitted_emails
+                ]
             
-            return students_without_submission, "Berhasil memeriksa"
+            return late_by_coursework, "Berhasil memeriksa"
             
         except Exception as e:
             logger.error(f"Error checking submissions: {e}")
-            return [], f"Error: {str(e)}"
+            return {}, f"Error: {str(e)}"
     
     def format_reminder_message(self, assignment, late_students, course_id):
         """Format pesan reminder yang akan dikirim ke grup"""
         due_date = f"{assignment['dueDate']['day']}/{assignment['dueDate']['month']}/{assignment['dueDate']['year']}"
         
         # Dapatkan data siswa yang terlambat
-        df = self.bot.get_student_data()
-        late_students_data = df[df['Email'].isin(late_students)]
+        late_emails = set(late_students)
+        late_students_data = [
+            student for student in self.bot.get_student_data() if student.email in late_emails
+        ]
         
         student_list = []
-        for _, student in late_students_data.iterrows():
-            student_info = f"• {student['Nama']}"
-            if student.get('Username') and student['Username'] != '-':
-                student_info += f" (@{student['Username'].replace('@', '')})"
+        for student in late_students_data:
+            student_info = f"• {student.nama}"
+            if student.username and student.username != '-':
+                student_info += f" (@{student.username.replace('@', '')})"
             student_list.append(student_info)
         
         message = (
@@ -764,40 +1110,62 @@ class ClassroomAutoReminder:
         
         return message
     
-    def send_reminder_to_group(self, context, chat_id, message):
-        """Kirim reminder ke grup"""
+    async def send_reminder_to_group(self, context, chat_id, message):
+        """Kirim reminder ke grup (laju kirim per chat dibatasi di outbound)"""
         try:
-            context.bot.send_message(
-                chat_id=chat_id,
-                text=message,
-                parse_mode='Markdown'
-            )
+            await send_message(context.bot, chat_id, message, parse_mode='Markdown')
             logger.info(f"Reminder sent to group {chat_id}")
         except Exception as e:
             logger.error(f"Error sending reminder: {e}")
     
-    def check_and_send_reminders(self, context, course_id, group_chat_id):
-        """Cek semua tugas aktif dan kirim reminder"""
+    async def check_and_send_reminders(self, context, course_id, group_chat_id):
+        """Cek semua tugas aktif dan kirim reminder.
+
+        Tugas dibagi rata menjadi REMINDER_MAX_CONCURRENCY kelompok (maksimal
+        CLASSROOM_BATCH_SIZE tugas, satu batch HTTP per kelompok) yang dicek
+        secara paralel, dibatasi semaphore. Setelah semua hasil terkumpul pesan
+        dikirim berurutan; jeda antar pesan hanya diatur oleh pembatas laju kirim.
+        """
         try:
-            assignments = self.get_all_coursework(course_id)
+            # Panggilan Google dijalankan di thread pool agar event loop tetap responsif
+            assignments = await run_blocking('classroom', self.get_all_coursework, course_id)
             
             if not assignments:
                 logger.info("No active assignments found")
                 return
             
-            for assignment in assignments:
-                late_students, status_msg = self.get_students_without_submission_for_coursework(
-                    course_id, assignment['id']
-                )
-                
-                if late_students:
-                    reminder_message = self.format_reminder_message(
-                        assignment, late_students, course_id
+            coursework_ids = [assignment['id'] for assignment in assignments]
+            # Kelompok dibuat cukup kecil agar semua slot paralel terpakai
+            group_size = min(CLASSROOM_BATCH_SIZE, -(-len(coursework_ids) // max(REMINDER_MAX_CONCURRENCY, 1)))
+            groups = [
+                coursework_ids[start:start + group_size]
+                for start in range(0, len(coursework_ids), group_size)
+            ]
+            semaphore = asyncio.Semaphore(REMINDER_MAX_CONCURRENCY)
+            
+            async def check(group):
+                async with semaphore:
+                    return await run_blocking(
+                        'classroom', self.get_students_without_submission_by_coursework, course_id, group
                     )
-                    self.send_reminder_to_group(context, group_chat_id, reminder_message)
-                
-                # Tunggu sebentar antara setiap tugas
-                time.sleep(2)
+            
+            late_by_coursework = {}
+            for late, status_msg in await asyncio.gather(*(check(group) for group in groups)):
+                late_by_coursework.update(late)
+            
+            pending = [
+                (assignment, late_by_coursework[assignment['id']])
+                for assignment in assignments if late_by_coursework.get(assignment['id'])
+            ]
+            if not pending:
+                return
+            
+            messages = await run_blocking('sheets', lambda: [
+                self.format_reminder_message(assignment, late_students, course_id)
+                for assignment, late_students in pending
+            ])
+            for reminder_message in messages:
+                await self.send_reminder_to_group(context, group_chat_id, reminder_message)
                     
         except Exception as e:
             logger.error(f"Error in auto reminder: {e}")
@@ -807,68 +1175,22 @@ class ClassroomAutoReminder:
         if self.running:
             return "Reminder sudah berjalan"
         
-        self.running = True
+        async def reminder_job(job_context):
+            await self.check_and_send_reminders(job_context, course_id, group_chat_id)
         
-        def reminder_job():
-            while self.running:
-                try:
-                    # Jalankan setiap hari jam 08:00
-                    schedule.every().day.at("08:00").do(
-                        self.check_and_send_reminders, context, course_id, group_chat_id
-                    )
-                    
-                    # Jalankan juga jam 18:00 untuk reminder sore
-                    schedule.every().day.at("18:00").do(
-                        self.check_and_send_reminders, context, course_id, group_chat_id
-                    )
-                    
-                    while self.running:
-                        schedule.run_pending()
-                        time.sleep(60)  # Cek setiap menit
-                        
-                except Exception as e:
-                    logger.error(f"Error in reminder job: {e}")
-                    time.sleep(300)  # Tunggu 5 menit jika error
-        
-        self.reminder_thread = Thread(target=reminder_job)
-        self.reminder_thread.daemon = True
-        self.reminder_thread.start()
+        # Dijadwalkan lewat job queue PTB (jam 08:00 dan 18:00)
+        self.reminder_jobs = [
+            context.job_queue.run_daily(background_job(reminder_job), time=dt_time(hour=8, minute=0)),
+            context.job_queue.run_daily(background_job(reminder_job), time=dt_time(hour=18, minute=0)),
+        ]
+        self.running = True
         
         return "✅ Reminder harian otomatis telah diaktifkan!\nBot akan mengecek setiap hari jam 08:00 dan 18:00"
     
     def stop_reminders(self):
         """Hentikan reminder otomatis"""
         self.running = False
-        if self.reminder_thread:
-            self.reminder_thread.join(timeout=5)
+        for job in self.reminder_jobs:
+            job.schedule_removal()
+        self.reminder_jobs = []
         return "❌ Reminder otomatis dihentikan"
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
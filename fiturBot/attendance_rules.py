@@ -0,0 +1,59 @@
+import logging
+from config import (
+    KICK_ALPHA_THRESHOLD, KICK_IZIN_THRESHOLD, WARN_ALPHA_THRESHOLD, WARN_IZIN_THRESHOLD
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AttendanceRules:
+    """Evaluasi aturan kick & peringatan untuk seluruh roster sekaligus.
+
+    Counter di Student sudah bertipe int, jadi satu kali lewat roster cukup
+    untuk menentukan murid yang dikick dan diberi peringatan.
+    """
+
+    def __init__(self, kick_alpha=KICK_ALPHA_THRESHOLD, kick_izin=KICK_IZIN_THRESHOLD,
+                 warn_alpha=WARN_ALPHA_THRESHOLD, warn_izin=WARN_IZIN_THRESHOLD):
+        self.kick_alpha = kick_alpha
+        self.kick_izin = kick_izin
+        self.warn_alpha = warn_alpha
+        self.warn_izin = warn_izin
+
+    def count_warnings(self, roster):
+        """Jumlah murid yang masuk kriteria peringatan"""
+        return sum(1 for student in roster if self.is_warning(student.total_alpha, student.total_izin))
+
+    def is_kick(self, total_alpha, total_izin):
+        return total_alpha >= self.kick_alpha or total_izin >= self.kick_izin
+
+    def is_warning(self, total_alpha, total_izin):
+        return total_alpha >= self.warn_alpha or total_izin >= self.warn_izin
+
+    def split(self, roster):
+        """Daftar murid yang dikick dan diberi peringatan (format check_auto_kick_conditions).
+
+        Satu kali lewat roster: tiap murid langsung dimasukkan ke kedua kelompok jika cocok.
+        """
+        students_to_kick = []
+        students_to_warn = []
+        for student in roster:
+            alpha, izin = student.total_alpha, student.total_izin
+            if self.is_kick(alpha, izin):
+                students_to_kick.append({
+                    'telegram_id': student.telegram_id,
+                    'nama': student.nama,
+                    'alasan': f"Alpha {alpha}x atau Izin {izin}x"
+                })
+            if self.is_warning(alpha, izin):
+                students_to_warn.append({
+                    'telegram_id': student.telegram_id,
+                    'nama': student.nama,
+                    'total_izin': izin,
+                    'total_alpha': alpha
+                })
+        return students_to_kick, students_to_warn
+
+
+# Aturan default dari config
+attendance_rules = AttendanceRules()
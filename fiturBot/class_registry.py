@@ -0,0 +1,207 @@
+import logging
+import threading
+from config import (
+    GROUP_CHAT_ID, SPREADSHEET_URL, WORKSHEET_NAME, CLASSROOM_COURSE_ID, GOOGLE_MEET_LINK,
+    ANNOUNCEMENT_TOPIC_ID, ASSIGNMENT_TOPIC_ID, ATTENDANCE_TOPIC_ID,
+    ROSTER_DB_PATH, ROSTER_SNAPSHOT_PATH, HISTORY_WORKSHEET_NAME, CLASSES_CONFIG
+)
+from .attendance_bot import AttendanceBot
+from .async_facade import AsyncAttendanceBot
+from .google_clients import get_google_clients
+
+logger = logging.getLogger(__name__)
+
+
+class ClassConfig:
+    """Satu kelas: grup Telegram -> worksheet absensi -> course Classroom"""
+
+    __slots__ = (
+        'key', 'name', 'chat_id', 'spreadsheet_url', 'worksheet_name', 'course_id', 'meet_link',
+        'announcement_topic_id', 'assignment_topic_id', 'attendance_topic_id',
+        'history_worksheet_name', 'db_path', 'snapshot_path'
+    )
+
+    def __init__(self, key, chat_id, worksheet_name, course_id, name=None,
+                 spreadsheet_url=SPREADSHEET_URL, meet_link=GOOGLE_MEET_LINK,
+                 announcement_topic_id=ANNOUNCEMENT_TOPIC_ID, assignment_topic_id=ASSIGNMENT_TOPIC_ID,
+                 attendance_topic_id=ATTENDANCE_TOPIC_ID, history_worksheet_name=HISTORY_WORKSHEET_NAME,
+                 db_path=ROSTER_DB_PATH, snapshot_path=ROSTER_SNAPSHOT_PATH):
+        self.key = key
+        self.name = name or key
+        self.chat_id = chat_id
+        self.spreadsheet_url = spreadsheet_url
+        self.worksheet_name = worksheet_name
+        self.course_id = course_id
+        self.meet_link = meet_link
+        self.announcement_topic_id = announcement_topic_id
+        self.assignment_topic_id = assignment_topic_id
+        self.attendance_topic_id = attendance_topic_id
+        self.history_worksheet_name = history_worksheet_name
+        self.db_path = db_path
+        self.snapshot_path = snapshot_path
+
+    @classmethod
+    def from_dict(cls, data):
+        """Buat ClassConfig dari satu entri CLASSES_CONFIG.
+
+        Worksheet riwayat, database lokal dan snapshot diberi nama per kelas agar tidak
+        bercampur dengan kelas lain.
+        """
+        worksheet_name = data.get('worksheet', WORKSHEET_NAME)
+        key = str(data.get('key') or worksheet_name)
+        return cls(
+            key=key,
+            name=data.get('name'),
+            chat_id=int(data['chat_id']),
+            worksheet_name=worksheet_name,
+            course_id=str(data.get('course_id', CLASSROOM_COURSE_ID)),
+            spreadsheet_url=data.get('spreadsheet_url', SPREADSHEET_URL),
+            meet_link=data.get('meet_link', GOOGLE_MEET_LINK),
+            announcement_topic_id=int(data.get('announcement_topic_id', ANNOUNCEMENT_TOPIC_ID)),
+            assignment_topic_id=int(data.get('assignment_topic_id', ASSIGNMENT_TOPIC_ID)),
+            attendance_topic_id=int(data.get('attendance_topic_id', ATTENDANCE_TOPIC_ID)),
+            history_worksheet_name=data.get('history_worksheet', f"{HISTORY_WORKSHEET_NAME} - {worksheet_name}"),
+            db_path=data.get('db_path', f"data/roster_{key}.db"),
+            snapshot_path=data.get('snapshot_path', f"data/roster_snapshot_{key}.json"),
+        )
+
+    @classmethod
+    def from_globals(cls):
+        """Satu kelas dari konfigurasi lama (GROUP_CHAT_ID / WORKSHEET_NAME / CLASSROOM_COURSE_ID)"""
+        return cls(key='default', chat_id=GROUP_CHAT_ID, worksheet_name=WORKSHEET_NAME, course_id=CLASSROOM_COURSE_ID)
+
+    def __repr__(self):
+        return f"ClassConfig(key={self.key!r}, chat_id={self.chat_id}, worksheet={self.worksheet_name!r})"
+
+
+class ClassRegistry:
+    """Daftar kelas yang dilayani satu proses bot.
+
+    Tiap kelas punya AttendanceBot sendiri (cache roster, index, store lokal
+    dan log absen terpisah) yang dibuat saat pertama dipakai. Koneksi Google,
+    thread pool dan kuota dipakai bersama, jadi biaya per kelas tambahan hanya
+    roster di memori dan satu file SQLite.
+    """
+
+    def __init__(self, classes, clients=None):
+        if not classes:
+            raise ValueError("Minimal satu kelas harus dikonfigurasi")
+        self.classes = list(classes)
+        self.clients = clients or get_google_clients()
+        self._by_key = {class_config.key: class_config for class_config in self.classes}
+        self._by_chat = {
+            class_config.chat_id: class_config for class_config in self.classes if class_config.chat_id is not None
+        }
+        self._bots = {}
+        self._async_bots = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, entries=CLASSES_CONFIG, clients=None):
+        classes = [ClassConfig.from_dict(entry) for entry in entries] or [ClassConfig.from_globals()]
+        logger.info(f"🏫 {len(classes)} kelas terdaftar: {', '.join(c.name for c in classes)}")
+        return cls(classes, clients)
+
+    @property
+    def default(self):
+        return self.classes[0]
+
+    def get(self, key):
+        return self._by_key.get(key)
+
+    def for_chat(self, chat_id):
+        """Kelas milik grup Telegram ini, None jika bukan grup kelas"""
+        return self._by_chat.get(chat_id)
+
+    def for_user(self, telegram_id):
+        """Kelas yang roster-nya (sudah dimuat) berisi Telegram ID ini"""
+        for class_config, bot in self.loaded_bots():
+            if bot.knows_student(telegram_id):
+                return class_config
+        return None
+
+    def classes_for_student(self, telegram_id):
+        """Semua kelas yang roster-nya berisi Telegram ID ini (roster dimuat jika perlu, blocking)"""
+        return [
+            class_config for class_config in self.classes
+            if self.attendance_bot(class_config).find_student_row(telegram_id=telegram_id) is not None
+        ]
+
+    def resolve(self, context=None, update=None):
+        """Tentukan kelas untuk satu update / job.
+
+        Urutan: grup asal pesan, kelas milik job terjadwal (`job.data`), kelas
+        yang roster-nya berisi pengirim (chat pribadi), lalu kelas pertama.
+        """
+        chat = getattr(update, 'effective_chat', None)
+        if chat is not None:
+            class_config = self.for_chat(chat.id)
+            if class_config is not None:
+                return class_config
+
+        job = getattr(context, 'job', None)
+        job_class = getattr(job, 'data', None)
+        if isinstance(job_class, ClassConfig):
+            return job_class
+
+        user = getattr(update, 'effective_user', None)
+        if user is not None and len(self.classes) > 1:
+            class_config = self.for_user(user.id)
+            if class_config is not None:
+                return class_config
+        return self.default
+
+    def attendance_bot(self, class_config=None):
+        """AttendanceBot milik satu kelas (dibuat sekali saat pertama dipakai)"""
+        class_config = class_config or self.default
+        with self._lock:
+            bot = self._bots.get(class_config.key)
+            if bot is None:
+                bot = self._bots[class_config.key] = AttendanceBot(
+                    self.clients,
+                    worksheet_name=class_config.worksheet_name,
+                    spreadsheet_url=class_config.spreadsheet_url,
+                    course_id=class_config.course_id,
+                    db_path=class_config.db_path,
+                    history_worksheet_name=class_config.history_worksheet_name,
+                    snapshot_path=class_config.snapshot_path,
+                )
+                logger.info(f"✅ AttendanceBot kelas '{class_config.name}' siap")
+            return bot
+
+    def async_bot(self, class_config=None):
+        """Facade async milik satu kelas (lock per murid ikut terpisah per kelas)"""
+        class_config = class_config or self.default
+        bot = self.attendance_bot(class_config)
+        with self._lock:
+            async_bot = self._async_bots.get(class_config.key)
+            if async_bot is None:
+                async_bot = self._async_bots[class_config.key] = AsyncAttendanceBot(bot)
+            return async_bot
+
+    def loaded_bots(self):
+        """[(ClassConfig, AttendanceBot)] untuk kelas yang bot-nya sudah dibuat"""
+        with self._lock:
+            return [(self._by_key[key], bot) for key, bot in self._bots.items()]
+
+
+_shared_registry = None
+_shared_registry_lock = threading.Lock()
+
+
+def get_class_registry(context=None):
+    """Ambil ClassRegistry bersama (disimpan juga di bot_data Application)"""
+    global _shared_registry
+    if context is not None and context.bot_data.get('class_registry') is not None:
+        return context.bot_data['class_registry']
+    with _shared_registry_lock:
+        if _shared_registry is None:
+            _shared_registry = ClassRegistry.from_config()
+        if context is not None:
+            context.bot_data['class_registry'] = _shared_registry
+        return _shared_registry
+
+
+def resolve_class(context=None, update=None):
+    """ClassConfig untuk update / job ini"""
+    return get_class_registry(context).resolve(context, update)
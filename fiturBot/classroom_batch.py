@@ -0,0 +1,120 @@
+import time
+import logging
+from config import CLASSROOM_BATCH_SIZE, CLASSROOM_PAGE_SIZE, ENABLE_PROFILE_CACHE
+from .quota import get_quota_governor, is_retryable
+from .classroom_pages import iter_items
+from .profile_cache import get_profile_cache
+
+logger = logging.getLogger(__name__)
+
+
+def execute_batched(service, requests, batch_size=CLASSROOM_BATCH_SIZE):
+    """Eksekusi banyak request Classroom lewat batch HTTP (maks `batch_size` per batch).
+
+    `requests` = {kunci: request belum di-execute}. Kembalikan (hasil, error):
+    {kunci: response} dan {kunci: exception}; kegagalan satu item tidak
+    menggagalkan item lain. Item yang gagal sementara (429 / 5xx) dikirim ulang
+    dengan backoff. Setiap batch dihitung sebanyak jumlah itemnya di kuota.
+    """
+    governor = get_quota_governor()
+    results, errors = {}, {}
+    pending = list(requests.items())
+    # Isi batch yang bukan GET (misal create) hanya diulang saat kena rate limit
+    idempotent = all(request.method.upper() == 'GET' for request in requests.values())
+
+    for attempt in range(governor.max_retries + 1):
+        retry = []
+        for start in range(0, len(pending), batch_size):
+            chunk = dict(pending[start:start + batch_size])
+            keys = {str(position): key for position, key in enumerate(chunk)}
+
+            def callback(request_id, response, exception, keys=keys):
+                key = keys[request_id]
+                if exception is None:
+                    results[key] = response
+                elif is_retryable(exception, idempotent) and attempt < governor.max_retries:
+                    retry.append((key, requests[key]))
+                else:
+                    errors[key] = exception
+
+            batch = service.new_batch_http_request(callback=callback)
+            for request_id, key in keys.items():
+                batch.add(chunk[key], request_id=request_id)
+            try:
+                governor.execute('classroom', batch.execute, cost=len(chunk), idempotent=idempotent)
+            except Exception as e:
+                # Seluruh batch gagal (setelah retry governor): catat untuk semua item di batch
+                logger.error(f"❌ Batch Classroom ({len(chunk)} request) gagal: {e}")
+                for key in chunk:
+                    if key not in results:
+                        errors[key] = e
+
+        if not retry:
+            break
+        delay = governor.backoff_delay(attempt)
+        logger.warning(f"⏳ {len(retry)} request batch Classroom dicoba lagi dalam {delay:.1f}s")
+        time.sleep(delay)
+        pending = retry
+
+    return results, errors
+
+
+def list_submissions(service, course_id, coursework_ids):
+    """Semua studentSubmissions untuk beberapa tugas: {coursework_id: [submission]}.
+
+    Halaman pertama tiap tugas diambil sekaligus lewat batch; halaman
+    berikutnya (tugas dengan banyak siswa) diikuti per tugas lewat iter_items.
+    Tugas yang gagal diambil tidak ada di hasil (error dicatat di log).
+    """
+    collection = service.courses().courseWork().studentSubmissions()
+    requests = {
+        coursework_id: collection.list(courseId=course_id, courseWorkId=coursework_id, pageSize=CLASSROOM_PAGE_SIZE)
+        for coursework_id in coursework_ids
+    }
+    responses, errors = execute_batched(service, requests)
+    for coursework_id, error in errors.items():
+        logger.error(f"❌ Gagal mengambil submission tugas {coursework_id}: {error}")
+
+    submissions = {}
+    for coursework_id, response in responses.items():
+        items = list(response.get('studentSubmissions', []))
+        if response.get('nextPageToken'):
+            items.extend(iter_items(collection, 'studentSubmissions', courseId=course_id,
+                                    courseWorkId=coursework_id, pageToken=response['nextPageToken']))
+        submissions[coursework_id] = items
+    return submissions
+
+
+def get_user_emails(service, user_ids):
+    """Email untuk setiap userId: {userId: email}.
+
+    Profil diambil dari cache persisten lebih dulu (ENABLE_PROFILE_CACHE); yang
+    belum ada / kedaluwarsa diambil lewat userProfiles().get yang di-batch lalu
+    disimpan ke cache, termasuk yang gagal permanen (cache negatif).
+    """
+    user_ids = set(user_ids)
+    emails = {}
+    cache = get_profile_cache() if ENABLE_PROFILE_CACHE else None
+    if cache is not None:
+        try:
+            cached, user_ids = cache.get_many(user_ids)
+            emails = {user_id: email for user_id, (email, _) in cached.items() if email}
+        except Exception as e:
+            logger.warning(f"⚠️ Cache profil tidak bisa dibaca: {e}")
+    if not user_ids:
+        return emails
+
+    requests = {user_id: service.userProfiles().get(userId=user_id) for user_id in user_ids}
+    profiles, errors = execute_batched(service, requests)
+    for user_id, error in errors.items():
+        logger.error(f"❌ Gagal mengambil profil {user_id}: {error}")
+
+    if cache is not None:
+        try:
+            cache.put_many(profiles)
+            cache.put_failures([user_id for user_id, error in errors.items() if not is_retryable(error)])
+        except Exception as e:
+            logger.warning(f"⚠️ Cache profil tidak bisa disimpan: {e}")
+
+    emails.update((user_id, profile.get('emailAddress', '')) for user_id, profile in profiles.items())
+    return emails
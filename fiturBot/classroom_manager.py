@@ -1,82 +1,93 @@
-import os
 import logging
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-from config import SCOPES, CREDENTIALS_FILE, CLASSROOM_COURSE_ID
+import importlib.util
+from config import CLASSROOM_COURSE_ID
+from .google_clients import get_google_clients
+from .classroom_pages import iter_items
+from .classroom_batch import list_submissions
 
 logger = logging.getLogger(__name__)
 
-try:
-    from googleapiclient.discovery import build
-    from google.auth.transport.requests import Request
-    GOOGLE_CLASSROOM_AVAILABLE = True
-except ImportError:
-    GOOGLE_CLASSROOM_AVAILABLE = False
+# Service Classroom dibangun di google_clients; di sini cukup cek library-nya terpasang
+GOOGLE_CLASSROOM_AVAILABLE = importlib.util.find_spec('googleapiclient') is not None
+if not GOOGLE_CLASSROOM_AVAILABLE:
     print("⚠️  Google Classroom API tidak tersedia. Fitur reminder tugas akan dinonaktifkan.")
 
 class ClassroomManager:
-    def __init__(self):
+    def __init__(self, clients=None, course_id=CLASSROOM_COURSE_ID):
         if not GOOGLE_CLASSROOM_AVAILABLE:
             raise ImportError("Google Classroom API tidak terinstall")
-        self.service = None
+        self.clients = clients or get_google_clients()
+        self.course_id = course_id
         self.setup_classroom()
     
+    @property
+    def service(self):
+        # Service Classroom milik thread yang sedang berjalan (httplib2 tidak thread-safe)
+        return self.clients.classroom_service
+    
     def setup_classroom(self):
         """Setup koneksi ke Google Classroom"""
         try:
             logger.info("Memulai koneksi ke Google Classroom...")
             
-            # Validasi file credentials
-            if not os.path.exists(CREDENTIALS_FILE):
-                raise FileNotFoundError(f"File {CREDENTIALS_FILE} tidak ditemukan!")
-            
-            # Setup credentials dan koneksi
-            creds = Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=SCOPES)
-            self.service = build('classroom', 'v1', credentials=creds)
-            
+            # Service dibangun oleh registry GoogleClients
+            self.clients.classroom_service
             logger.info("✅ Berhasil terhubung ke Google Classroom!")
             
         except Exception as e:
             logger.error(f"❌ Error connecting to Google Classroom: {e}")
             raise
     
+    def get_roster_map(self):
+        """Ambil roster course sekali (semua halaman students().list): {userId: profile}"""
+        roster = {}
+        for student in iter_items(self.service.courses().students(), 'students', courseId=self.course_id):
+            roster[student['userId']] = student.get('profile', {})
+        logger.info(f"👥 Roster Classroom: {len(roster)} siswa")
+        return roster
+    
+    def _student_name(self, roster, student_id):
+        """Nama siswa dari roster; siswa di luar roster (misal sudah keluar) diambil sekali lalu disimpan"""
+        if student_id not in roster:
+            student = self.service.courses().students().get(
+                courseId=self.course_id,
+                userId=student_id
+            ).execute()
+            roster[student_id] = student.get('profile', {})
+        return roster[student_id]['name']['fullName']
+    
     def get_unsubmitted_assignments(self):
         """Mendapatkan daftar siswa yang belum mengumpulkan tugas"""
         try:
-            # Dapatkan daftar course work (tugas)
-            course_work = self.service.courses().courseWork().list(
-                courseId=CLASSROOM_COURSE_ID
-            ).execute()
-            logger.info(f"📋 Found {len(course_work.get('courseWork', []))} assignments")
+            # Dapatkan daftar course work (tugas), semua halaman
+            course_work = list(iter_items(self.service.courses().courseWork(), 'courseWork', courseId=self.course_id))
+            logger.info(f"📋 Found {len(course_work)} assignments")
             
+            # Roster dimuat sekali per run, submission dicocokkan di memori
+            roster = self.get_roster_map()
+            # Submission semua tugas diambil lewat batch HTTP
+            submissions_by_work = list_submissions(self.service, self.course_id, [work['id'] for work in course_work])
             unsubmitted_students = {}
             
-            for work in course_work.get('courseWork', []):
+            for work in course_work:
                 work_title = work['title']
                 work_id = work['id']
 
                 logger.info(f"📝 Checking assignment: {work_title}")
                 
-                # Dapatkan submission untuk setiap tugas
-                submissions = self.service.courses().courseWork().studentSubmissions().list(
-                    courseId=CLASSROOM_COURSE_ID,
-                    courseWorkId=work_id
-                ).execute()
-                logger.info(f"   📊 Found {len(submissions.get('studentSubmissions', []))} submissions")
+                if work_id not in submissions_by_work:
+                    continue
+                submissions = submissions_by_work[work_id]
+                logger.info(f"   📊 Found {len(submissions)} submissions")
                 
                 # Cek siswa yang belum submit
-                for submission in submissions.get('studentSubmissions', []):
+                for submission in submissions:
                     if submission['state'] != 'TURNED_IN':
                         student_id = submission['userId']
                         
                         # Dapatkan info siswa
                         try:
-                            student = self.service.courses().students().get(
-                            courseId=CLASSROOM_COURSE_ID,
-                            userId=student_id
-                            ).execute()
-                        
-                            student_name = student['profile']['name']['fullName']
+                            student_name = self._student_name(roster, student_id)
                         
                             if student_name not in unsubmitted_students:
                                 unsubmitted_students[student_name] = []
@@ -0,0 +1,21 @@
+from config import CLASSROOM_PAGE_SIZE
+
+
+def iter_pages(collection, items_key, page_size=CLASSROOM_PAGE_SIZE, **params):
+    """Iterasi semua halaman `collection.list(...)` (mengikuti nextPageToken lewat list_next).
+
+    `collection` adalah resource googleapiclient, misal `service.courses().courseWork()`.
+    Setiap halaman (list item di `items_key`) dikirim ke pemanggil begitu diterima,
+    jadi hanya satu halaman yang disimpan di memori.
+    """
+    request = collection.list(pageSize=page_size, **params)
+    while request is not None:
+        response = request.execute()
+        yield response.get(items_key, [])
+        request = collection.list_next(request, response)
+
+
+def iter_items(collection, items_key, page_size=CLASSROOM_PAGE_SIZE, **params):
+    """Seperti iter_pages, tapi per item"""
+    for page in iter_pages(collection, items_key, page_size, **params):
+        yield from page
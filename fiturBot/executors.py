@@ -0,0 +1,49 @@
+import asyncio
+import functools
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import SHEETS_MAX_CONCURRENCY, CLASSROOM_MAX_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+# Jumlah thread maksimal per backend Google (panggilan blocking)
+BACKEND_CONCURRENCY = {
+    'sheets': SHEETS_MAX_CONCURRENCY,
+    'classroom': CLASSROOM_MAX_CONCURRENCY,
+}
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(backend):
+    """Ambil thread pool terbatas untuk backend tertentu ('sheets' / 'classroom')"""
+    with _executors_lock:
+        if backend not in _executors:
+            _executors[backend] = ThreadPoolExecutor(
+                max_workers=BACKEND_CONCURRENCY.get(backend, 2),
+                thread_name_prefix=f"google-{backend}"
+            )
+            logger.info(f"🧵 Thread pool '{backend}' dibuat ({BACKEND_CONCURRENCY.get(backend, 2)} worker)")
+        return _executors[backend]
+
+
+async def run_blocking(backend, func, *args, **kwargs):
+    """Jalankan fungsi blocking (gspread / googleapiclient) di thread pool backend.
+
+    Context (misal prioritas request untuk QuotaGovernor) ikut disalin ke thread.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(backend), call)
+
+
+def shutdown_executors(wait=True):
+    """Matikan semua thread pool (dipanggil saat bot berhenti)"""
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=wait)
+        _executors.clear()
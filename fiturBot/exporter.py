@@ -0,0 +1,97 @@
+import io
+import csv
+import json
+import logging
+import tempfile
+from config import EXPORT_SPOOL_MAX_BYTES
+from .roster_store import EVENT_COLUMNS
+from .attendance_bot import AttendanceBot
+
+# openpyxl opsional: tanpa library ini export XLSX tidak tersedia
+try:
+    from openpyxl import Workbook
+except ImportError:
+    Workbook = None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('csv', 'xlsx', 'jsonl')
+
+
+def roster_rows(sources):
+    """Kolom dan baris (generator) total kehadiran saat ini dari roster di cache.
+
+    `sources` = [(ClassConfig, AttendanceBot)]; kolom Kelas ditambahkan jika
+    lebih dari satu kelas.
+    """
+    rosters = [(class_config, bot.get_student_data()) for class_config, bot in sources]
+    columns = []
+    for _, roster in rosters:
+        columns.extend(column for column in roster.columns if column not in columns)
+    multi = len(rosters) > 1
+
+    def rows():
+        for class_config, roster in rosters:
+            for student in roster:
+                row = [student.get(column, '') for column in columns]
+                yield [class_config.name, *row] if multi else row
+
+    return (['Kelas', *columns] if multi else columns), rows()
+
+
+def history_rows(sources, start=None, end=None):
+    """Kolom dan baris (generator) riwayat absen dengan tanggal pertemuan start..end"""
+    multi = len(sources) > 1
+
+    def rows():
+        for class_config, bot in sources:
+            for event in bot.iter_attendance_events(start, end):
+                row = [event.get(column, '') for column in EVENT_COLUMNS]
+                yield [class_config.name, *row] if multi else row
+
+    return (['Kelas', *AttendanceBot.HISTORY_HEADER] if multi else list(AttendanceBot.HISTORY_HEADER)), rows()
+
+
+def write_export(columns, rows, fmt):
+    """Tulis baris langsung ke file upload (SpooledTemporaryFile), kembalikan (file, jumlah_baris).
+
+    File kecil tetap di memori; lewat EXPORT_SPOOL_MAX_BYTES otomatis pindah
+    ke file sementara di disk. Pemanggil wajib menutup file setelah dikirim.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format tidak dikenal: {fmt}")
+    if fmt == 'xlsx' and Workbook is None:
+        raise ValueError("Export XLSX butuh library openpyxl (pip install openpyxl)")
+
+    buffer = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_BYTES, mode='w+b')
+    count = 0
+    try:
+        if fmt == 'xlsx':
+            # Mode write-only: baris langsung ditulis, tidak disimpan sebagai objek sel
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet('Data')
+            sheet.append(columns)
+            for row in rows:
+                sheet.append(row)
+                count += 1
+            workbook.save(buffer)
+        else:
+            text = io.TextIOWrapper(buffer, encoding='utf-8', newline='')
+            if fmt == 'csv':
+                writer = csv.writer(text)
+                writer.writerow(columns)
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+            else:
+                for row in rows:
+                    text.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str))
+                    text.write('\n')
+                    count += 1
+            text.flush()
+            text.detach()
+        buffer.seek(0)
+        return buffer, count
+    except Exception:
+        buffer.close()
+        raise
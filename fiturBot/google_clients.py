@@ -0,0 +1,155 @@
+import os
+import logging
+import threading
+import gspread
+from google.oauth2.service_account import Credentials
+from gspread.http_client import HTTPClient
+from gspread.urls import DRIVE_FILES_API_V3_URL
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
+from config import SCOPES, CREDENTIALS_FILE, SPREADSHEET_URL
+from .quota import get_quota_governor
+
+logger = logging.getLogger(__name__)
+
+
+# Endpoint tulis Sheets yang aman diulang: menulis nilai absolut, bukan menambah baris
+IDEMPOTENT_SHEETS_SUFFIXES = ('values:batchUpdate', 'values:batchClear', ':clear')
+
+
+class GovernedHTTPClient(HTTPClient):
+    """HTTP client gspread yang melewatkan setiap request lewat QuotaGovernor"""
+
+    def request(self, method, endpoint, *args, **kwargs):
+        method_name = method.lower()
+        if endpoint.startswith(DRIVE_FILES_API_V3_URL):
+            api = 'drive'
+        elif method_name == 'get':
+            api = 'sheets_read'
+        else:
+            api = 'sheets_write'
+        # append (values:append) dan POST lain hanya diulang saat kena rate limit
+        idempotent = method_name in ('get', 'put') or endpoint.split('?')[0].endswith(IDEMPOTENT_SHEETS_SUFFIXES)
+        return get_quota_governor().execute(
+            api, super().request, (method, endpoint, *args), kwargs, idempotent=idempotent
+        )
+
+
+class GovernedHttpRequest(HttpRequest):
+    """Request googleapiclient (Classroom) yang di-execute lewat QuotaGovernor"""
+
+    def execute(self, http=None, num_retries=0):
+        return get_quota_governor().execute(
+            'classroom', super().execute, kwargs={'http': http, 'num_retries': num_retries},
+            idempotent=self.method.upper() == 'GET'
+        )
+
+
+class GoogleClients:
+    """Registry koneksi Google yang dibuat sekali dan dipakai bersama.
+
+    Credentials, client gspread, spreadsheet, worksheet dan service Classroom
+    dibangun secara lazy saat pertama kali dibutuhkan lalu disimpan. Semua
+    client memakai objek credentials yang sama, sehingga access token cukup
+    di-refresh sekali oleh google-auth ketika kedaluwarsa.
+    """
+
+    def __init__(self, credentials_file=CREDENTIALS_FILE, scopes=SCOPES):
+        self.credentials_file = credentials_file
+        self.scopes = scopes
+        self._lock = threading.RLock()
+        self._credentials = None
+        self._gc = None
+        self._spreadsheets = {}
+        self._worksheets = {}
+        # httplib2 tidak thread-safe, jadi service Classroom dibuat per thread
+        self._classroom_local = threading.local()
+
+    @property
+    def credentials(self):
+        """Credentials service account (dibaca dari file sekali saja)"""
+        with self._lock:
+            if self._credentials is None:
+                if not self.credentials_file or not os.path.exists(self.credentials_file):
+                    raise FileNotFoundError(f"File {self.credentials_file} tidak ditemukan!")
+                self._credentials = Credentials.from_service_account_file(
+                    self.credentials_file, scopes=self.scopes
+                )
+                logger.info("🔑 Credentials Google dimuat")
+            return self._credentials
+
+    @property
+    def gc(self):
+        """Client gspread dengan sesi HTTP yang sudah terotorisasi"""
+        with self._lock:
+            if self._gc is None:
+                self._gc = gspread.authorize(self.credentials, http_client=GovernedHTTPClient)
+                logger.info("✅ Client Google Sheets siap")
+            return self._gc
+
+    def spreadsheet(self, url=SPREADSHEET_URL):
+        """Buka spreadsheet berdasarkan URL (di-cache per URL)"""
+        with self._lock:
+            if url not in self._spreadsheets:
+                self._spreadsheets[url] = self.gc.open_by_url(url)
+            return self._spreadsheets[url]
+
+    def worksheet(self, name, url=SPREADSHEET_URL):
+        """Ambil worksheet berdasarkan nama (di-cache per spreadsheet & nama)"""
+        key = (url, name)
+        with self._lock:
+            if key not in self._worksheets:
+                self._worksheets[key] = self.spreadsheet(url).worksheet(name)
+                logger.info(f"✅ Berhasil terhubung ke worksheet '{name}'")
+            return self._worksheets[key]
+
+    def file_revision(self, url=SPREADSHEET_URL):
+        """Probe murah perubahan spreadsheet: (version, modifiedTime) dari Drive API.
+
+        Hanya mengambil metadata file lewat sesi gspread yang sudah ada, jauh
+        lebih ringan daripada membaca seluruh isi worksheet.
+        """
+        spreadsheet = self.spreadsheet(url)
+        response = self.gc.http_client.request(
+            'get',
+            f"{DRIVE_FILES_API_V3_URL}/{spreadsheet.id}",
+            params={'fields': 'version,modifiedTime', 'supportsAllDrives': True},
+        )
+        metadata = response.json()
+        return metadata.get('version'), metadata.get('modifiedTime')
+
+    @property
+    def classroom_service(self):
+        """Service Google Classroom (dibangun sekali per thread, credentials dipakai bersama)"""
+        service = getattr(self._classroom_local, 'service', None)
+        if service is None:
+            # Discovery document statis bawaan library, tidak ada request HTTP
+            service = build(
+                'classroom', 'v1', credentials=self.credentials, cache_discovery=False,
+                requestBuilder=GovernedHttpRequest
+            )
+            self._classroom_local.service = service
+            logger.info(f"✅ Berhasil terhubung ke Google Classroom! ({threading.current_thread().name})")
+        return service
+
+    def reset(self):
+        """Buang semua koneksi yang tersimpan agar dibangun ulang saat dibutuhkan"""
+        with self._lock:
+            self._credentials = None
+            self._gc = None
+            self._spreadsheets.clear()
+            self._worksheets.clear()
+            self._classroom_local = threading.local()
+
+
+_shared_clients = None
+_shared_clients_lock = threading.Lock()
+
+
+def get_google_clients():
+    """Ambil registry GoogleClients bersama untuk seluruh proses"""
+    global _shared_clients
+    with _shared_clients_lock:
+        if _shared_clients is None:
+            _shared_clients = GoogleClients()
+        return _shared_clients
@@ -1,6 +1,6 @@
 from .user_handlers import start, absen, status, test_connection, get_my_info, register, materi, materi1, materi2, materi3
 from .admin_handlers import (
-    admin_stats, reset_attendance, force_attendance_check, export_data, manual_kick, list_warnings, list_kehadiran, get_all_member_ids, get_simple_member_ids,
+    admin_stats, refresh_data, bot_metrics, reset_attendance, force_attendance_check, export_data, bulk_register, manual_kick, list_warnings, list_kehadiran, get_all_member_ids, get_simple_member_ids,
     classroom_reminder_now, class_reminder_now, check_topics, admin_help, test_classroom, start_auto_reminder, stop_auto_reminder, test_auto_reminder
 )
 from fiturBot.quiz_handler import (
@@ -12,7 +12,7 @@ from fiturBot.quiz_handler import (
 
 __all__ = [
     'start', 'absen', 'status', 'test_connection', 'get_my_info', 'register', 'test_topic',
-    'admin_stats', 'admin_help', 'reset_attendance', 'force_attendance_check', 'export_data',
+    'admin_stats', 'refresh_data', 'bot_metrics', 'admin_help', 'reset_attendance', 'force_attendance_check', 'export_data', 'bulk_register',
     'manual_kick', 'list_warnings', 'list_kehadiran', 'classroom_reminder_now', 'class_reminder_now', 'check_topics', 'test_classroom', 'materi', 'materi1', 'materi2', 'materi3', 'start_auto_reminder', 'stop_auto_reminder', 'test_auto_reminder', 'quiz_help',
     'create_question_start', 'get_all_member_ids', 'get_simple_member_ids',
     'quiz', 'start_command', 'help_command',
@@ -3,11 +3,17 @@ from telegram.ext import ContextTypes
 import logging
 import io
 from datetime import datetime, timedelta
-from ..attendance_bot import AttendanceBot, ClassroomAutoReminder
+from ..attendance_bot import ClassroomAutoReminder
+from ..async_facade import get_async_bot
+from ..class_registry import resolve_class, get_class_registry
+from ..executors import run_blocking
+from ..exporter import EXPORT_FORMATS, roster_rows, history_rows, write_export
+from .freshness import staleness_note
+from ..metrics import metrics
+from ..attendance_rules import attendance_rules
+from ..registration_import import parse_registration_csv
 from auto_functions import send_classroom_reminder, send_class_reminder, auto_check_attendance
-from config import ADMIN_IDS, GROUP_CHAT_ID, GOOGLE_MEET_LINK
-from .topic_utils import ANNOUNCEMENT_TOPIC_ID
-import pandas as pd
+from config import ADMIN_IDS
 from datetime import timezone
 
 logger = logging.getLogger(__name__)
@@ -31,25 +37,25 @@ def admin_required(func):
 async def admin_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Lihat statistik lengkap - ADMIN ONLY"""
     try:
-        bot = AttendanceBot()
-        df = bot.get_student_data()
+        bot = get_async_bot(context, update)
+        roster = await bot.get_student_data()
         
-        if df.empty:
+        if roster.empty:
             await update.message.reply_text("❌ Tidak ada data murid.")
             return
         
-        total_students = len(df)
-        total_alpha = df['Total Alpha'].sum()
-        total_izin = df['Total Izin'].sum()
-        # Hitung murid dalam status warning
-        warning_students = df[(df['Total Izin'] >= 2) | (df['Total Alpha'] >= 2)]
+        total_students = len(roster)
+        _, total_alpha, total_izin = roster.totals()
+        # Hitung murid dalam status warning (aturan yang sama dengan auto-check)
+        warning_count = attendance_rules.count_warnings(roster)
         
         stats_message = (
             "📊 **STATISTIK ADMIN**\n\n"
             f"• 👥 Total Murid: {total_students}\n"
             f"• ❌ Total Alpha: {total_alpha}\n"
             f"• ⚠️ Total Izin: {total_izin}\n"
-            f"• 🚨 Murid Warning: {len(warning_students)}"
+            f"• 🚨 Murid Warning: {warning_count}"
+            f"{staleness_note(roster)}"
         )
         
         await update.message.reply_text(stats_message)
@@ -61,11 +67,11 @@ async def admin_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def reset_attendance(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Reset data kehadiran - ADMIN ONLY"""
     try:
-        bot = AttendanceBot()
+        bot = get_async_bot(context, update)
         
         # Konfirmasi reset
         if context.args and context.args[0] == 'confirm':
-            bot.reset_daily_attendance()
+            await bot.reset_daily_attendance()
             await update.message.reply_text(
                 "✅ **Data kehadiran berhasil direset!**\n"
                 "Semua data alpha/izin telah dikembalikan ke 0."
@@ -88,67 +94,243 @@ async def reset_attendance(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def force_attendance_check(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Paksa pengecekan kehadiran - ADMIN ONLY"""
     try:
-        await auto_check_attendance(context)
+        await auto_check_attendance(context, resolve_class(context, update))
         await update.message.reply_text("✅ Pengecekan kehadiran dipaksa selesai!")
     except Exception as e:
         await update.message.reply_text(f"❌ Error: {e}")
 
 @admin_required
 async def export_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Export data ke CSV - ADMIN ONLY"""
+    """Export data (CSV/XLSX/JSONL) - ADMIN ONLY
+
+    Argumen opsional: format (csv|xlsx|jsonl), `riwayat` untuk log absen,
+    `dari=TANGGAL` / `sampai=TANGGAL`, dan `kelas=KODE` atau `kelas=semua`.
+    """
+    fmt, history, start, end, class_key = 'csv', False, None, None, None
+    for arg in context.args or []:
+        key, _, value = arg.partition('=')
+        key = key.lower()
+        if not value and key in EXPORT_FORMATS:
+            fmt = key
+        elif not value and key in ('riwayat', 'history'):
+            history = True
+        elif key in ('dari', 'sampai') and value:
+            parsed = parse_meeting_date(value)
+            if parsed is None:
+                await update.message.reply_text(f"❌ Tanggal tidak valid: {value}\nGunakan format YYYY-MM-DD atau DD/MM/YYYY.")
+                return
+            if key == 'dari':
+                start = parsed
+            else:
+                end = parsed
+            history = True
+        elif key == 'kelas' and value:
+            class_key = value
+        else:
+            await update.message.reply_text(
+                "❌ Argumen tidak dikenal: " + arg + "\n\n"
+                "Contoh: `/export_data xlsx riwayat dari=2024-05-01 sampai=2024-05-31 kelas=semua`",
+                parse_mode='Markdown'
+            )
+            return
+    
+    registry = get_class_registry(context)
+    if class_key is None:
+        classes = [resolve_class(context, update)]
+    elif class_key.lower() in ('semua', 'all'):
+        classes = registry.classes
+    else:
+        class_config = registry.get(class_key)
+        if class_config is None:
+            await update.message.reply_text(
+                f"❌ Kelas `{class_key}` tidak ditemukan. Kelas: {', '.join(c.key for c in registry.classes)}",
+                parse_mode='Markdown'
+            )
+            return
+        classes = [class_config]
+    sources = [(class_config, registry.attendance_bot(class_config)) for class_config in classes]
+    
+    def build():
+        # Baris ditulis langsung dari roster / log absen ke file upload (tanpa DataFrame / string penuh)
+        columns, rows = history_rows(sources, start, end) if history else roster_rows(sources)
+        return write_export(columns, rows, fmt)
+    
     try:
-        bot = AttendanceBot()
-        df = bot.get_student_data()
-        
-        if df.empty:
+        buffer, count = await run_blocking('sheets', build)
+    except Exception as e:
+        logger.error(f"Error export data: {e}")
+        await update.message.reply_text(f"❌ Error: {e}")
+        return
+    
+    try:
+        if count == 0:
             await update.message.reply_text("❌ Tidak ada data untuk di-export.")
             return
         
-        # Create CSV string
-        csv_data = df.to_csv(index=False)
-        
-        # Send as file
+        kind = "riwayat_absen" if history else "data_kehadiran"
+        period = ""
+        if start or end:
+            period = f" ({start.isoformat() if start else '...'} s/d {end.isoformat() if end else '...'})"
+        class_label = "semua kelas" if len(classes) > 1 else classes[0].name
         await update.message.reply_document(
-            document=io.BytesIO(csv_data.encode()),
-            filename=f"data_kehadiran_{datetime.now().strftime('%Y%m%d')}.csv",
-            caption="📁 Data kehadiran murid"
+            document=buffer,
+            filename=f"{kind}_{datetime.now().strftime('%Y%m%d')}.{fmt}",
+            caption=f"📁 {'Riwayat absen' if history else 'Data kehadiran murid'} - {class_label}{period}: {count} baris"
+        )
+    except Exception as e:
+        await update.message.reply_text(f"❌ Error: {e}")
+    finally:
+        buffer.close()
+
+@admin_required
+async def bulk_register(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Pendaftaran murid massal dari file CSV - ADMIN ONLY
+
+    Kirim file CSV dengan caption /import_murid, atau balas file CSV dengan /import_murid.
+    """
+    message = update.message
+    document = message.document or (message.reply_to_message.document if message.reply_to_message else None)
+    
+    if document is None or not (document.file_name or '').lower().endswith('.csv'):
+        await message.reply_text(
+            "📥 **Import Murid (CSV)**\n\n"
+            "Kirim file CSV dengan caption `/import_murid`, atau balas file CSV dengan `/import_murid`.\n\n"
+            "Kolom: `Nama, Telegram ID, Email, Username` (Email & Username opsional)",
+            parse_mode='Markdown'
+        )
+        return
+    
+    if document.file_size and document.file_size > 1024 * 1024:
+        await message.reply_text("❌ File terlalu besar (maksimal 1 MB).")
+        return
+    
+    try:
+        file = await document.get_file()
+        data = bytes(await file.download_as_bytearray())
+        rows, errors = parse_registration_csv(data)
+    except Exception as e:
+        await message.reply_text(f"❌ File CSV tidak bisa dibaca: {e}")
+        return
+    
+    try:
+        bot = get_async_bot(context, update)
+        results = await bot.register_students(rows) if rows else []
+    except Exception as e:
+        logger.error(f"Error bulk register: {e}")
+        await message.reply_text(f"❌ Gagal menyimpan ke spreadsheet: {e}")
+        return
+    
+    results = sorted(results + [(line, False, reason) for line, reason in errors])
+    added = sum(1 for _, ok, _ in results if ok)
+    report_lines = [f"{line}\t{'OK' if ok else 'GAGAL'}\t{detail}" for line, ok, detail in results]
+    
+    await message.reply_text(
+        f"📥 **HASIL IMPORT MURID**\n\n"
+        f"• ✅ Ditambahkan: {added}\n"
+        f"• ❌ Dilewati: {len(results) - added}"
+    )
+    if results:
+        await message.reply_document(
+            document=io.BytesIO(("baris\thasil\tketerangan\n" + "\n".join(report_lines)).encode()),
+            filename=f"hasil_import_{datetime.now().strftime('%Y%m%d_%H%M')}.tsv",
+            caption="📄 Hasil import per baris"
+        )
+
+@admin_required
+async def refresh_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Muat ulang data murid dari spreadsheet - ADMIN ONLY"""
+    try:
+        bot = get_async_bot(context, update)
+        roster = await bot.refresh_student_data()
+        
+        await update.message.reply_text(
+            f"✅ **Data murid dimuat ulang dari spreadsheet!**\n"
+            f"• Total murid: {len(roster)}"
+            f"{staleness_note(roster)}"
         )
         
     except Exception as e:
         await update.message.reply_text(f"❌ Error: {e}")
 
+@admin_required
+async def bot_metrics(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Tampilkan counter internal bot (probe sheet, reload, dll) - ADMIN ONLY"""
+    snapshot = metrics.snapshot()
+    if not snapshot:
+        await update.message.reply_text("📈 Belum ada metrik yang tercatat.")
+        return
+    
+    lines = [f"• {name}: {value}" for name, value in snapshot.items()]
+    await update.message.reply_text("📈 **Metrik Bot**\n\n" + "\n".join(lines))
+
 @admin_required
 async def manual_kick(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Kick murid manual - ADMIN ONLY"""
+    """Kick murid manual - ADMIN ONLY
+
+    Kelas ditentukan dari roster yang berisi Telegram ID target (bukan dari
+    chat admin). Jika murid tidak ditemukan atau ada di beberapa kelas, admin
+    wajib menyebut `kelas=KODE`.
+    """
     try:
         if not context.args:
             await update.message.reply_text(
-                "❌ Format: `/manual_kick <telegram_id> <alasan>`\n"
+                "❌ Format: `/manual_kick <telegram_id> [kelas=KODE] <alasan>`\n"
                 "Contoh: `/manual_kick 123456789 Alpha 3 kali`",
                 parse_mode='Markdown'
             )
             return
         
         telegram_id = context.args[0]
-        reason = ' '.join(context.args[1:]) if len(context.args) > 1 else "Manual kick by admin"
+        class_key = None
+        reason_words = []
+        for arg in context.args[1:]:
+            key, _, value = arg.partition('=')
+            if key.lower() == 'kelas' and value:
+                class_key = value
+            else:
+                reason_words.append(arg)
+        reason = ' '.join(reason_words) or "Manual kick by admin"
+        
+        registry = get_class_registry(context)
+        class_keys = ', '.join(c.key for c in registry.classes)
+        if class_key is not None:
+            class_config = registry.get(class_key)
+            if class_config is None:
+                await update.message.reply_text(
+                    f"❌ Kelas `{class_key}` tidak ditemukan. Kelas: {class_keys}", parse_mode='Markdown'
+                )
+                return
+        elif len(registry.classes) == 1:
+            class_config = registry.default
+        else:
+            matches = await run_blocking('sheets', registry.classes_for_student, telegram_id)
+            if len(matches) != 1:
+                problem = "tidak ditemukan di roster kelas mana pun" if not matches else (
+                    f"terdaftar di beberapa kelas ({', '.join(c.key for c in matches)})"
+                )
+                await update.message.reply_text(
+                    f"❌ Telegram ID {telegram_id} {problem}.\n"
+                    f"Sebutkan kelasnya: `/manual_kick {telegram_id} kelas=KODE <alasan>`\n"
+                    f"Kelas: {class_keys}",
+                    parse_mode='Markdown'
+                )
+                return
+            class_config = matches[0]
         
-        # Kick dari grup
+        # Kick dari grup kelas milik murid tersebut
         await context.bot.ban_chat_member(
-            chat_id=GROUP_CHAT_ID,
+            chat_id=class_config.chat_id,
             user_id=int(telegram_id)
         )
         
-        # Update spreadsheet
-        bot = AttendanceBot()
-        df = bot.get_student_data()
-        for idx, row in df.iterrows():
-            if str(row['Telegram ID']) == str(telegram_id):
-                bot.worksheet.update_cell(idx + 2, 6, f"Dikeluarkan: {reason} - Manual")
-                break
+        # Update spreadsheet kelas yang sama
+        bot = registry.async_bot(class_config)
+        await bot.update_student_status(telegram_id, f"Dikeluarkan: {reason} - Manual")
         
         await update.message.reply_text(
             f"✅ **Murid berhasil dikeluarkan!**\n"
             f"• ID: {telegram_id}\n"
+            f"• Kelas: {class_config.name}\n"
             f"• Alasan: {reason}"
         )
         
@@ -159,8 +341,8 @@ async def manual_kick(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def list_warnings(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Lihat daftar murid yang dapat peringatan - ADMIN ONLY"""
     try:
-        bot = AttendanceBot()
-        _, students_to_warn = bot.check_auto_kick_conditions()
+        bot = get_async_bot(context, update)
+        _, students_to_warn = await bot.check_auto_kick_conditions()
         
         if not students_to_warn:
             await update.message.reply_text("✅ Tidak ada murid yang perlu diperingatkan.")
@@ -183,30 +365,55 @@ async def list_warnings(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 @admin_required
 async def list_kehadiran(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Kirim laporan kehadiran ke grup - ADMIN ONLY"""
+    """Kirim laporan kehadiran ke grup - ADMIN ONLY
+
+    Tanpa argumen: murid dengan status terakhir 'Hadir' (pertemuan Senin ini).
+    Dengan tanggal (/list_kehadiran 2024-05-20 atau 20/05/2024): murid yang
+    hadir pada pertemuan tersebut menurut log riwayat absen.
+    """
     try:
-        bot = AttendanceBot()
-        df = bot.get_student_data()
+        bot = get_async_bot(context, update)
+        roster = await bot.get_student_data()
         
-        if df.empty:
+        if roster.empty:
             await update.message.reply_text("❌ Tidak ada data murid.")
             return
 
-        # Dapatkan hari Senin minggu ini
-        senin_minggu_ini = get_monday_wib()
+        tanggal_pertemuan = None
+        if context.args:
+            tanggal_pertemuan = parse_meeting_date(context.args[0])
+            if tanggal_pertemuan is None:
+                await update.message.reply_text(
+                    "❌ Format tanggal salah. Contoh: /list_kehadiran 2024-05-20 atau /list_kehadiran 20/05/2024"
+                )
+                return
         
         # Format tanggal Indonesia
+        hari_indonesia = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
         bulan_indonesia = {
             1: "Januari", 2: "Februari", 3: "Maret", 4: "April", 5: "Mei", 6: "Juni",
             7: "Juli", 8: "Agustus", 9: "September", 10: "Oktober", 11: "November", 12: "Desember"
         }
         
-        tanggal_str = f"Senin, {senin_minggu_ini.day} {bulan_indonesia[senin_minggu_ini.month]} {senin_minggu_ini.year}"
-
-        # Filter siswa yang hadir (status terakhir = 'Hadir')
-        siswa_hadir = df[df['Status Terakhir'] == 'Hadir']
+        if tanggal_pertemuan is None:
+            # Dapatkan hari Senin minggu ini
+            tanggal_pertemuan = get_monday_wib()
+            # Filter siswa yang hadir (status terakhir = 'Hadir')
+            siswa_hadir = roster.with_status('Hadir')
+        else:
+            # Status terakhir tiap murid pada pertemuan itu dari log absen
+            kehadiran = await bot.meeting_attendance(tanggal_pertemuan)
+            siswa_hadir = [
+                siswa for siswa in roster
+                if kehadiran.get(str(siswa.telegram_id), {}).get('status') == 'Hadir'
+            ]
+        
+        tanggal_str = (
+            f"{hari_indonesia[tanggal_pertemuan.weekday()]}, {tanggal_pertemuan.day} "
+            f"{bulan_indonesia[tanggal_pertemuan.month]} {tanggal_pertemuan.year}"
+        )
         
-        if siswa_hadir.empty:
+        if not siswa_hadir:
             await update.message.reply_text(
                 f"❌ Tidak ada murid yang hadir pada {tanggal_str}"
             )
@@ -235,14 +442,14 @@ async def list_kehadiran(update: Update, context: ContextTypes.DEFAULT_TYPE):
         motivasi = random.choice(motivasi_list)
         pantun = random.choice(pantun_list)
 
-        total_siswa = len(df)
+        total_siswa = len(roster)
         # Format daftar nama siswa yang hadir
         daftar_siswa = []
-        for idx, siswa in siswa_hadir.iterrows():
-            nama = siswa['Nama']
+        for siswa in siswa_hadir:
+            nama = siswa.nama
             # Tambahkan username jika ada
-            if 'Username' in siswa and pd.notna(siswa['Username']) and siswa['Username'] != '-':
-                username = siswa['Username'].replace('@', '')
+            if siswa.username and siswa.username != '-':
+                username = siswa.username.replace('@', '')
                 daftar_siswa.append(f"• {nama} (@{username})")
             else:
                 daftar_siswa.append(f"• {nama}")
@@ -256,7 +463,7 @@ async def list_kehadiran(update: Update, context: ContextTypes.DEFAULT_TYPE):
             f"Terima kasih atas kehadiran teman-teman yang telah hadir di kelas pada {tanggal_str}\n\n"
             f"**📊 DATA KEHADIRAN:**\n"
             f"• Total yang hadir: {len(siswa_hadir)} dari {total_siswa} murid\n"
-            f"• Persentase kehadiran: {(len(siswa_hadir) / len(df) * 100):.1f}%\n\n"
+            f"• Persentase kehadiran: {(len(siswa_hadir) / total_siswa * 100):.1f}%\n\n"
             f"**👥 DAFTAR MURID YANG HADIR:**\n"
             f"{chr(10).join(daftar_siswa)}\n\n"
             f"**💫 KATA MOTIVASI:**\n"
@@ -270,11 +477,12 @@ async def list_kehadiran(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         # Kirim ke grup
         try:
+            class_config = resolve_class(context, update)
             await context.bot.send_message(
-                chat_id=GROUP_CHAT_ID,
+                chat_id=class_config.chat_id,
                 text=message,
                 parse_mode='Markdown',
-                message_thread_id=ANNOUNCEMENT_TOPIC_ID
+                message_thread_id=class_config.announcement_topic_id
             )
             await update.message.reply_text(
                 f"✅ Laporan kehadiran berhasil dikirim ke grup!\n"
@@ -302,6 +510,15 @@ def get_monday_wib():
     monday = today - timedelta(days=today.weekday())
     return monday.replace(hour=0, minute=0, second=0, microsecond=0)
 
+def parse_meeting_date(text):
+    """Ubah argumen tanggal (YYYY-MM-DD atau DD/MM/YYYY) menjadi date, None jika tidak valid"""
+    for date_format in ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y'):
+        try:
+            return datetime.strptime(text.strip(), date_format).date()
+        except ValueError:
+            continue
+    return None
+
 def get_wib_time():
     """Mendapatkan waktu sekarang dalam WIB"""
     WIB = timezone(timedelta(hours=7))
@@ -311,7 +528,7 @@ def get_wib_time():
 async def class_reminder_now(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Kirim reminder kelas sekarang - ADMIN ONLY"""
     try:
-        await send_class_reminder(context)
+        await send_class_reminder(context, resolve_class(context, update))
         await update.message.reply_text("✅ Reminder kelas berhasil dikirim!")
     except Exception as e:
         await update.message.reply_text(f"❌ Error: {e}")
@@ -320,13 +537,14 @@ async def class_reminder_now(update: Update, context: ContextTypes.DEFAULT_TYPE)
 async def check_topics(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Cek informasi topik yang tersedia - ADMIN ONLY"""
     try:
-        from config import TOPIC_NAMES, ANNOUNCEMENT_TOPIC_ID, ASSIGNMENT_TOPIC_ID, ATTENDANCE_TOPIC_ID
+        from config import TOPIC_NAMES
+        class_config = resolve_class(context, update)
         
         topic_info = (
-            "📋 **INFORMASI TOPIK GRUP**\n\n"
-            f"• 🎯 PENGUMUMAN & INFO: Topic ID {ANNOUNCEMENT_TOPIC_ID} ({TOPIC_NAMES.get(ANNOUNCEMENT_TOPIC_ID, 'Unknown')})\n"
-            f"• 📚 TUGAS: Topic ID {ASSIGNMENT_TOPIC_ID} ({TOPIC_NAMES.get(ASSIGNMENT_TOPIC_ID, 'Unknown')})\n"
-            f"• ✅ ABSENSI: Topic ID {ATTENDANCE_TOPIC_ID} ({TOPIC_NAMES.get(ATTENDANCE_TOPIC_ID, 'Unknown')})\n\n"
+            f"📋 **INFORMASI TOPIK GRUP** ({class_config.name})\n\n"
+            f"• 🎯 PENGUMUMAN & INFO: Topic ID {class_config.announcement_topic_id} ({TOPIC_NAMES.get(class_config.announcement_topic_id, 'Unknown')})\n"
+            f"• 📚 TUGAS: Topic ID {class_config.assignment_topic_id} ({TOPIC_NAMES.get(class_config.assignment_topic_id, 'Unknown')})\n"
+            f"• ✅ ABSENSI: Topic ID {class_config.attendance_topic_id} ({TOPIC_NAMES.get(class_config.attendance_topic_id, 'Unknown')})\n\n"
             "Bot akan mengirim pesan ke topik-topik tersebut sesuai dengan jenis pesannya."
         )
         
@@ -349,16 +567,19 @@ async def admin_help(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         "📊 MANAJEMEN DATA:\n"
         "• /admin_stats - Lihat statistik lengkap\n"
-        "• /export_data - Export data ke CSV\n"
+        "• /export_data [csv|xlsx|jsonl] [riwayat] [dari=TGL] [sampai=TGL] [kelas=KODE|semua] - Export data\n"
+        "• /import_murid - Daftarkan murid massal dari file CSV\n"
         "• /list_warnings - Lihat daftar peringatan\n"
-        "• /list_kehadiran - Kirim laporan kehadiran ke grup\n\n"
+        "• /list_kehadiran [tanggal] - Kirim laporan kehadiran ke grup (tanggal opsional, contoh 2024-05-20)\n"
+        "• /refresh_data - Muat ulang data dari spreadsheet (setelah edit manual)\n"
+        "• /bot_metrics - Lihat metrik internal bot (cache, probe sheet)\n\n"
         
         "🔄 RESET & MAINTENANCE:\n"
         "• /reset_attendance confirm - Reset SEMUA data kehadiran\n"
         "• /force_check - Paksa pengecekan kehadiran otomatis\n\n"
         
         "👤 MANAJEMEN MURID:\n"
-        "• `/manual_kick 123456789 Alasan` - Keluarkan murid manual\n"
+        "• `/manual_kick 123456789 [kelas=KODE] Alasan` - Keluarkan murid manual\n"
         "   Contoh: `/manual_kick 123456789 Alpha 3 kali`\n\n"
         
         "🔔 SISTEM REMINDER:\n"
@@ -396,16 +617,10 @@ async def admin_help(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def test_classroom(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Test koneksi Google Classroom"""
     try:
-        bot = AttendanceBot()
-        classroom_service = bot.initialize_classroom_service()
-        
-        if not classroom_service:
-            await update.message.reply_text("❌ Gagal menginisialisasi Google Classroom service")
-            return
+        bot = get_async_bot(context, update)
             
-        # Test dengan mengambil daftar courses
-        results = classroom_service.courses().list().execute()
-        courses = results.get('courses', [])
+        # Test dengan mengambil daftar courses (semua halaman)
+        courses = await bot.list_classroom(lambda service: service.courses(), 'courses')
         
         if not courses:
             await update.message.reply_text("✅ Connected to Google Classroom, but no courses found")
@@ -455,10 +670,10 @@ async def start_auto_reminder(update: Update, context: ContextTypes.DEFAULT_TYPE
     group_chat_id = context.args[1]
 
     try:
-        bot = AttendanceBot()
+        bot = get_async_bot(context, update)
         
         if auto_reminder is None:
-            auto_reminder = ClassroomAutoReminder(bot)
+            auto_reminder = ClassroomAutoReminder(bot.bot)
         
         result = auto_reminder.start_daily_reminders(context, course_id, group_chat_id)
         await update.message.reply_text(result)
@@ -505,13 +720,13 @@ async def test_auto_reminder(update: Update, context: ContextTypes.DEFAULT_TYPE)
     group_chat_id = context.args[1]
 
     try:
-        bot = AttendanceBot()
+        bot = get_async_bot(context, update)
         
         if auto_reminder is None:
-            auto_reminder = ClassroomAutoReminder(bot)
+            auto_reminder = ClassroomAutoReminder(bot.bot)
         
         # Jalankan langsung sekarang (tanpa jadwal)
-        auto_reminder.check_and_send_reminders(context, course_id, group_chat_id)
+        await auto_reminder.check_and_send_reminders(context, course_id, group_chat_id)
         await update.message.reply_text("✅ Test reminder telah dijalankan! Cek grup untuk melihat hasilnya.")
         
     except Exception as e:
@@ -545,29 +760,27 @@ async def classroom_reminder_now(update: Update, context: ContextTypes.DEFAULT_T
     await update.message.reply_text("🔄 Memeriksa tugas Classroom...")
 
     try:
-        bot = AttendanceBot()
-        
-        # Inisialisasi classroom service
-        classroom_service = bot.initialize_classroom_service()
-        if not classroom_service:
-            await update.message.reply_text("❌ Gagal menginisialisasi Google Classroom service")
-            return
+        bot = get_async_bot(context, update)
         
         # Buat instance reminder temporary
-        auto_reminder_temp = ClassroomAutoReminder(bot)
+        auto_reminder_temp = ClassroomAutoReminder(bot.bot)
         
         # Dapatkan detail tugas
-        assignment = classroom_service.courses().courseWork().get(
-            courseId=course_id,
-            courseWorkId=coursework_id
-        ).execute()
+        assignment = await bot.execute_classroom(
+            lambda service: service.courses().courseWork().get(
+                courseId=course_id,
+                courseWorkId=coursework_id
+            )
+        )
         
-        students_without_submission, message = auto_reminder_temp.get_students_without_submission_for_coursework(
+        students_without_submission, message = await bot.run_classroom(
+            auto_reminder_temp.get_students_without_submission_for_coursework,
             course_id, coursework_id
         )
         
         if students_without_submission:
-            reminder_message = auto_reminder_temp.format_reminder_message(
+            reminder_message = await bot.run_sheets(
+                auto_reminder_temp.format_reminder_message,
                 assignment, students_without_submission, course_id
             )
             # Kirim ke grup
@@ -601,11 +814,12 @@ async def get_all_member_ids(update: Update, context: ContextTypes.DEFAULT_TYPE)
         total_members = 0
 
         try:
-            # Dapatkan informasi tentang chat (group)
-            chat = await context.bot.get_chat(GROUP_CHAT_ID)
+            # Dapatkan informasi tentang chat (grup kelas)
+            group_chat_id = resolve_class(context, update).chat_id
+            chat = await context.bot.get_chat(group_chat_id)
             
             # Dapatkan semua member (perlu bot menjadi admin dengan permission melihat member)
-            async for member in context.bot.get_chat_members(GROUP_CHAT_ID):
+            async for member in context.bot.get_chat_members(group_chat_id):
                 total_members += 1
                 user = member.user
                 
@@ -705,7 +919,7 @@ async def get_simple_member_ids(update: Update, context: ContextTypes.DEFAULT_TY
         total_members = 0
 
         try:
-            async for member in context.bot.get_chat_members(GROUP_CHAT_ID):
+            async for member in context.bot.get_chat_members(resolve_class(context, update).chat_id):
                 total_members += 1
                 member_ids.append(str(member.user.id))
                 
@@ -0,0 +1,14 @@
+from datetime import datetime, timedelta, timezone
+from config import ROSTER_STALE_NOTICE_AFTER
+
+WIB = timezone(timedelta(hours=7))
+
+
+def staleness_note(roster):
+    """Baris penanda umur data roster untuk ditambahkan di akhir balasan"""
+    if roster.fetched_at is None:
+        return "\n\n🕒 Data belum pernah tersinkron dengan spreadsheet"
+    waktu = datetime.fromtimestamp(roster.fetched_at, WIB).strftime('%d/%m/%Y %H:%M WIB')
+    if roster.age() > ROSTER_STALE_NOTICE_AFTER:
+        return f"\n\n🕒 Data per {waktu} (⚠️ mungkin belum terbaru)"
+    return f"\n\n🕒 Data per {waktu}"
@@ -1,15 +1,17 @@
 import logging
 from telegram.ext import ContextTypes
-from config import GROUP_CHAT_ID, ANNOUNCEMENT_TOPIC_ID, ASSIGNMENT_TOPIC_ID, ATTENDANCE_TOPIC_ID
+from ..class_registry import resolve_class
 
 logger = logging.getLogger(__name__)
 
-async def send_to_announcement_topic(context: ContextTypes.DEFAULT_TYPE, message: str, parse_mode='Markdown'):
+async def send_to_announcement_topic(context: ContextTypes.DEFAULT_TYPE, message: str, parse_mode='Markdown', class_config=None):
     """Mengirim pesan ke topik PENGUMUMAN & INFO"""
+    # Kelas tujuan: dari argumen, job terjadwal (job.data), atau kelas pertama
+    class_config = class_config or resolve_class(context)
     try:
         await context.bot.send_message(
-            chat_id=GROUP_CHAT_ID,
-            message_thread_id=ANNOUNCEMENT_TOPIC_ID,
+            chat_id=class_config.chat_id,
+            message_thread_id=class_config.announcement_topic_id,
             text=message,
             parse_mode=parse_mode
         )
@@ -18,17 +20,18 @@ async def send_to_announcement_topic(context: ContextTypes.DEFAULT_TYPE, message
         logger.error(f"Error sending to announcement topic: {e}")
         # Fallback ke regular message
         await context.bot.send_message(
-            chat_id=GROUP_CHAT_ID,
+            chat_id=class_config.chat_id,
             text=message,
             parse_mode=parse_mode
         )
 
-async def send_to_assignment_topic(context: ContextTypes.DEFAULT_TYPE, message: str, parse_mode='Markdown'):
+async def send_to_assignment_topic(context: ContextTypes.DEFAULT_TYPE, message: str, parse_mode='Markdown', class_config=None):
     """Mengirim pesan ke topik TUGAS"""
+    class_config = class_config or resolve_class(context)
     try:
         await context.bot.send_message(
-            chat_id=GROUP_CHAT_ID,
-            message_thread_id=ASSIGNMENT_TOPIC_ID,
+            chat_id=class_config.chat_id,
+            message_thread_id=class_config.assignment_topic_id,
             text=message,
             parse_mode=parse_mode
         )
@@ -36,17 +39,18 @@ async def send_to_assignment_topic(context: ContextTypes.DEFAULT_TYPE, message:
     except Exception as e:
         logger.error(f"Error sending to assignment topic: {e}")
         await context.bot.send_message(
-            chat_id=GROUP_CHAT_ID,
+            chat_id=class_config.chat_id,
             text=message,
             parse_mode=parse_mode
         )
 
-async def send_to_attendance_topic(context: ContextTypes.DEFAULT_TYPE, message: str, parse_mode='Markdown'):
+async def send_to_attendance_topic(context: ContextTypes.DEFAULT_TYPE, message: str, parse_mode='Markdown', class_config=None):
     """Mengirim pesan ke topik Perihal Absensi Kelas"""
+    class_config = class_config or resolve_class(context)
     try:
         await context.bot.send_message(
-            chat_id=GROUP_CHAT_ID,
-            message_thread_id=ATTENDANCE_TOPIC_ID,
+            chat_id=class_config.chat_id,
+            message_thread_id=class_config.attendance_topic_id,
             text=message,
             parse_mode=parse_mode
         )
@@ -54,7 +58,7 @@ async def send_to_attendance_topic(context: ContextTypes.DEFAULT_TYPE, message:
     except Exception as e:
         logger.error(f"Error sending to attendance topic: {e}")
         await context.bot.send_message(
-            chat_id=GROUP_CHAT_ID,
+            chat_id=class_config.chat_id,
             text=message,
             parse_mode=parse_mode
         )
\ No newline at end of file
@@ -1,7 +1,10 @@
 from telegram import Update
 from telegram.ext import ContextTypes
 import logging
-from ..attendance_bot import AttendanceBot
+from ..async_facade import get_async_bot
+from ..class_registry import resolve_class
+from .freshness import staleness_note
+from ..attendance_rules import attendance_rules
 from config import ADMIN_IDS
 from datetime import datetime, timedelta, timezone
 import random
@@ -238,19 +241,19 @@ async def materi3(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def absen(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handler untuk absen dengan pilihan status dan notifikasi Total Hadir"""
     user_id = update.effective_user.id
-    bot = AttendanceBot()
+    bot = get_async_bot(context, update)
     
     # Cek apakah user sudah terdaftar
-    df = bot.get_student_data()
-    if df.empty:
+    roster = await bot.get_student_data()
+    if roster.empty:
             await update.message.reply_text(
                 "❌ **Sistem sedang sibuk, silakan coba lagi dalam beberapa detik.**"
             )
             return
         
-    student_data = df[df['Telegram ID'] == user_id]
+    student = await bot.get_student(telegram_id=user_id)
     
-    if student_data.empty:
+    if student is None:
         await update.message.reply_text(
             "❌ **Anda belum terdaftar dalam sistem!**\n\n"
             "Silakan daftar terlebih dahulu dengan:\n"
@@ -261,18 +264,10 @@ async def absen(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
     
-    student = student_data.iloc[0]
-    student_name = student['Nama']
-
-    # Konversi ke integer untuk memastikan tipe data benar
-    try:
-        total_hadir = int(student['Total Hadir']) if 'Total Hadir' in student and str(student['Total Hadir']).strip().isdigit() else 0
-        total_alpha = int(student['Total Alpha']) if 'Total Alpha' in student and str(student['Total Alpha']).strip().isdigit() else 0
-        total_izin = int(student['Total Izin']) if 'Total Izin' in student and str(student['Total Izin']).strip().isdigit() else 0
-    except (ValueError, TypeError):
-        total_hadir = 0
-        total_alpha = 0
-        total_izin = 0
+    student_name = student.nama
+    total_hadir = student.total_hadir
+    total_alpha = student.total_alpha
+    total_izin = student.total_izin
     
     # Jika tidak ada argumen, tampilkan pilihan absen
     if not context.args:
@@ -290,7 +285,8 @@ async def absen(update: Update, context: ContextTypes.DEFAULT_TYPE):
             f"• Hadir: {total_hadir}x\n"
             f"• Alpha: {total_alpha}x\n"
             f"• Izin: {total_izin}x\n"
-            f"• Status: {student['Status Terakhir']}",
+            f"• Status: {student.status_terakhir}"
+            f"{staleness_note(roster)}",
             parse_mode='Markdown'
         )
         return
@@ -310,23 +306,13 @@ async def absen(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     # Update data di spreadsheet
-    success = bot.update_student_record(user_id, status_absen.capitalize())
+    # Data terbaru untuk konfirmasi langsung dari hasil update (tanpa baca ulang)
+    student_updated = await bot.update_student_record(user_id, status_absen.capitalize())
     
-    if success:
-        # Dapatkan data terbaru untuk konfirmasi
-        df_updated = bot.get_student_data()
-        student_updated = df_updated[df_updated['Telegram ID'] == user_id].iloc[0]
-
-        # Konversi ke integer untuk data terbaru
-        try:
-            total_hadir_updated = int(student_updated['Total Hadir']) if 'Total Hadir' in student_updated else 0
-            total_alpha_updated = int(student_updated['Total Alpha'])
-            total_izin_updated = int(student_updated['Total Izin'])
-            
-        except (ValueError, TypeError):
-            total_hadir_updated = total_hadir
-            total_alpha_updated = total_alpha
-            total_izin_updated = total_izin
+    if student_updated is not None:
+        total_hadir_updated = student_updated.total_hadir
+        total_alpha_updated = student_updated.total_alpha
+        total_izin_updated = student_updated.total_izin
         
         emoji = {
             'hadir': '✅',
@@ -344,28 +330,32 @@ async def absen(update: Update, context: ContextTypes.DEFAULT_TYPE):
             f"• Total Hadir: {total_hadir_updated}x\n"
             f"• Total Alpha: {total_alpha_updated}x\n"
             f"• Total Izin: {total_izin_updated}x\n"
-            f"• Status Terakhir: {student_updated['Status Terakhir']}"
+            f"• Status Terakhir: {student_updated.status_terakhir}"
         )
 
         # Kirim notifikasi ke grup jika status hadir
         if status_absen == 'hadir':
-            await send_attendance_notification(context, user_id, student_name, total_hadir_updated)
+            await send_attendance_notification(
+                context, user_id, student_name, total_hadir_updated, resolve_class(context, update)
+            )
         
         # Tambahkan peringatan jika perlu (dengan tipe data ya sudah di konversi)
         if status_absen == 'alpha':
             message += "\n\n⚠️ **PERINGATAN:** Alpha akan mempengaruhi status kehadiran Anda!"
-        elif status_absen == 'izin' and total_izin_updated >= 2:
-            message += "\n\n⚠️ **PERINGATAN:** Total izin Anda sudah 2x, hati-hati!"
+        elif status_absen == 'izin' and total_izin_updated >= attendance_rules.warn_izin:
+            # Batas sama dengan pengecekan terjadwal (WARN_IZIN_THRESHOLD)
+            message += f"\n\n⚠️ **PERINGATAN:** Total izin Anda sudah {total_izin_updated}x, hati-hati!"
         
-        await update.message.reply_text(message)
+        await update.message.reply_text(message + staleness_note(roster))
     else:
         await update.message.reply_text(
             "❌ **Gagal mencatat absensi!**\n"
             "Jika masalah berlanjut, hubungi admin."
         )
 
-async def send_attendance_notification(context: ContextTypes.DEFAULT_TYPE, user_id: int, student_name: str, total_hadir: int):
-    """Mengirim notifikasi kehadiran ke grup dengan pantun lucu"""
+async def send_attendance_notification(context: ContextTypes.DEFAULT_TYPE, user_id: int, student_name: str, total_hadir: int, class_config=None):
+    """Mengirim notifikasi kehadiran ke grup kelas murid dengan pantun lucu"""
+    class_config = class_config or resolve_class(context)
     # Dapatkan hari Senin minggu ini
     today = datetime.now()
     senin_minggu_ini = get_monday_wib()
@@ -410,10 +400,9 @@ async def send_attendance_notification(context: ContextTypes.DEFAULT_TYPE, user_
         f"🕐 _Waktu sistem: {get_wib_time().strftime('%d/%m/%Y %H:%M WIB')}_"
     )
     
-    GROUP_CHAT_ID = -1002408972369
     try:
         await context.bot.send_message(
-            chat_id=GROUP_CHAT_ID,
+            chat_id=class_config.chat_id,
             text=notification_message
     )
         logger.info(f"Notifikasi kehadiran terkirim untuk {student_name} pada {tanggal_str}")
@@ -423,26 +412,17 @@ async def send_attendance_notification(context: ContextTypes.DEFAULT_TYPE, user_
 async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handler untuk melihat status"""
     user_id = update.effective_user.id
-    bot = AttendanceBot()
-    df = bot.get_student_data()
+    bot = get_async_bot(context, update)
 
     # Jika admin, tampilkan semua data
     if user_id in ADMIN_IDS:
-        if df.empty:
+        roster = await bot.get_student_data()
+        if roster.empty:
             await update.message.reply_text("❌ Tidak ada data murid.")
             return
         
-        # Konversi ke integer untuk perhitungan
-        try:
-            total_hadir = df['Total Hadir'].astype(int).sum() if 'Total Hadir' in df.columns else 0
-            total_alpha = df['Total Alpha'].astype(int).sum()
-            total_izin = df['Total Izin'].astype(int).sum()
-        except (ValueError, TypeError):
-            total_hadir = 0
-            total_alpha = 0
-            total_izin = 0
-            
-        total_students = len(df)
+        total_hadir, total_alpha, total_izin = roster.totals()
+        total_students = len(roster)
         
         stats_message = (
             "👑 **STATUS ADMIN**\n\n"
@@ -452,14 +432,16 @@ async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
             f"• ⚠️ Total Izin: {total_izin}\n\n"
             "Gunakan /admin_stats untuk info lebih detail\n"
             "Gunakan /list_warnings untuk lihat peringatan"
+            f"{staleness_note(roster)}"
         )
         await update.message.reply_text(stats_message)
         return
     
     # Untuk user biasa
-    student_data = df[df['Telegram ID'] == user_id]
+    roster = await bot.get_student_data()
+    student = await bot.get_student(telegram_id=user_id)
     
-    if student_data.empty:
+    if student is None:
         await update.message.reply_text(
             "❌ **Anda belum terdaftar dalam sistem kehadiran.**\n\n"
             "Gunakan `/register NamaLengkap EmailAnda` untuk mendaftar.\n"
@@ -467,51 +449,44 @@ async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
             parse_mode='Markdown'
         )
         return
-    
-    student = student_data.iloc[0]
 
-    # Konversi ke integer
-    try:
-        total_hadir = int(student['Total Hadir']) if 'Total Hadir' in student else 0
-        total_alpha = int(student['Total Alpha'])
-        total_izin = int(student['Total Izin'])
-    except (ValueError, TypeError):
-        total_hadir = 0
-        total_alpha = 0
-        total_izin = 0
+    total_hadir = student.total_hadir
+    total_alpha = student.total_alpha
+    total_izin = student.total_izin
     
     message = (
         f"📊 **STATUS KEHADIRAN**\n\n"
-        f"👤 **Nama:** {student['Nama']}\n"
+        f"👤 **Nama:** {student.nama}\n"
         f"✅ **Total Hadir**: {total_hadir}x\n"
         f"❌ **Total Alpha:** {total_alpha}x\n"
         f"⚠️ **Total Izin:** {total_izin}x\n"
-        f"📝 **Status Terakhir:** {student['Status Terakhir']}"
+        f"📝 **Status Terakhir:** {student.status_terakhir}"
     )
     
     # Tambahkan peringatan jika memenuhi kriteria (dengan tipe data intenger)
-    if total_alpha >= 2:
+    if total_alpha >= attendance_rules.warn_alpha:
         message += f"\n\n🚨 **PERINGATAN:** Anda memiliki {total_alpha}x alpha!"
-    if total_izin >= 2:
+    if total_izin >= attendance_rules.warn_izin:
         message += f"\n\n⚠️ **PERINGATAN:** Total izin Anda {total_izin}x!"
-    if student['Total Izin'] >= 2 or student['Total Alpha'] >= 2:
+    if attendance_rules.is_warning(total_alpha, total_izin):
         message += "\n\n⚠️ **STATUS PERINGATAN:** Anda terancam akan dikeluarkan jika tidak hadir pada pertemuan selanjutnya!"
     
-    await update.message.reply_text(message)
+    await update.message.reply_text(message + staleness_note(roster))
 
 async def test_connection(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Test koneksi Google Sheets"""
     try:
-        bot = AttendanceBot()
-        df = bot.get_student_data()
+        bot = get_async_bot(context, update)
+        roster = await bot.get_student_data(force_refresh=True)
         
-        if df.empty:
+        if roster.empty:
             await update.message.reply_text("❌ Tidak ada data di spreadsheet")
         else:
-            student_count = len(df)
+            student_count = len(roster)
             await update.message.reply_text(
                 f"✅ Koneksi Google Sheets BERHASIL!\n"
                 f"📊 Total murid terdaftar: {student_count}"
+                f"{staleness_note(roster)}"
             )
     except Exception as e:
         await update.message.reply_text(f"❌ Error: {e}")
@@ -548,13 +523,10 @@ async def register(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return 
     
-    bot = AttendanceBot()
+    bot = get_async_bot(context, update)
     
     # Cek apakah sudah terdaftar
-    df = bot.get_student_data()
-    existing_user = df[df['Telegram ID'] == user.id]
-    
-    if not existing_user.empty:
+    if await bot.get_student(telegram_id=user.id) is not None:
         await update.message.reply_text(
             "✅ Anda sudah terdaftar dalam sistem!\n"
             f"User ID Anda: `{user.id}`",
@@ -578,8 +550,7 @@ async def register(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         # Tambahkan ke spreadsheet
         try:
-            new_row = [nama, user.id, email, f"@{user.username}" if user.username else "-", 0, 0, 0, "Belum Absen", "Auto-registered"]
-            bot.worksheet.append_row(new_row)
+            await bot.register_student(nama, user.id, email, f"@{user.username}" if user.username else "-")
             
             confirmation_msg = (
                 f"✅ **Pendaftaran Berhasil!**\n\n"
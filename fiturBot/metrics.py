@@ -0,0 +1,34 @@
+import logging
+import threading
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+
+class Metrics:
+    """Registry counter sederhana (thread-safe) untuk statistik internal bot"""
+
+    def __init__(self):
+        self._counters = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def get(self, name):
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self):
+        """Salinan semua counter, urut berdasarkan nama"""
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+
+# Registry bersama untuk seluruh proses
+metrics = Metrics()
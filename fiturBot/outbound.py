@@ -0,0 +1,48 @@
+import asyncio
+import logging
+import time
+from telegram.error import RetryAfter
+from config import TELEGRAM_CHAT_SEND_INTERVAL
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ChatSendLimiter:
+    """Pembatas laju kirim pesan Telegram per chat.
+
+    Setiap chat mendapat slot kirim berjarak minimal `min_interval` detik,
+    sehingga pesan beruntun (misal reminder banyak tugas) tidak kena flood
+    limit Telegram. Hanya pengiriman yang menunggu; pengumpulan data tidak.
+    """
+
+    def __init__(self, min_interval=TELEGRAM_CHAT_SEND_INTERVAL):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._locks = {}
+
+    async def wait(self, chat_id):
+        lock = self._locks.get(chat_id)
+        if lock is None:
+            lock = self._locks[chat_id] = asyncio.Lock()
+        async with lock:
+            delay = self._next_slot.get(chat_id, 0.0) - time.monotonic()
+            if delay > 0:
+                metrics.increment('telegram_send.throttled')
+                await asyncio.sleep(delay)
+            self._next_slot[chat_id] = time.monotonic() + self.min_interval
+
+
+_limiter = ChatSendLimiter()
+
+
+async def send_message(bot, chat_id, text, **kwargs):
+    """Kirim pesan lewat pembatas laju per chat; RetryAfter dari Telegram ditunggu lalu dicoba sekali lagi"""
+    await _limiter.wait(chat_id)
+    try:
+        return await bot.send_message(chat_id=chat_id, text=text, **kwargs)
+    except RetryAfter as e:
+        metrics.increment('telegram_send.retry_after')
+        logger.warning(f"⏳ Telegram membatasi kirim ke {chat_id}, tunggu {e.retry_after}s")
+        await asyncio.sleep(e.retry_after)
+        return await bot.send_message(chat_id=chat_id, text=text, **kwargs)
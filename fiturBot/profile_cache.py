@@ -0,0 +1,98 @@
+import os
+import logging
+import sqlite3
+import threading
+import time
+from config import PROFILE_CACHE_PATH, PROFILE_CACHE_TTL, PROFILE_NEGATIVE_TTL
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileCache:
+    """Cache profil Classroom (userId -> email, nama) di SQLite.
+
+    Email siswa hampir tidak pernah berubah, jadi profil disimpan dengan TTL
+    panjang dan tetap ada setelah restart. userId yang gagal diambil (misal 404
+    / tidak ada akses) dicatat sebagai cache negatif dengan TTL pendek agar
+    tidak diminta ulang di setiap sweep.
+    """
+
+    def __init__(self, path, ttl=PROFILE_CACHE_TTL, negative_ttl=PROFILE_NEGATIVE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS user_profiles (
+                    user_id TEXT PRIMARY KEY,
+                    email TEXT,
+                    name TEXT,
+                    failed INTEGER NOT NULL DEFAULT 0,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+
+    def get_many(self, user_ids):
+        """Profil yang masih berlaku: ({userId: (email, nama)}, [userId yang harus diambil]).
+
+        userId di cache negatif ikut di hasil dengan nilai (None, None).
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        now = time.time()
+        found = {}
+        with self._lock:
+            for start in range(0, len(user_ids), 500):
+                chunk = user_ids[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT user_id, email, name, failed, fetched_at FROM user_profiles "
+                    f"WHERE user_id IN ({', '.join('?' for _ in chunk)})",
+                    chunk
+                ).fetchall()
+                for user_id, email, name, failed, fetched_at in rows:
+                    if now - fetched_at < (self.negative_ttl if failed else self.ttl):
+                        found[user_id] = (None, None) if failed else (email, name)
+        missing = [user_id for user_id in user_ids if user_id not in found]
+        metrics.increment('profile_cache.hit', len(found))
+        metrics.increment('profile_cache.miss', len(missing))
+        return found, missing
+
+    def put_many(self, profiles):
+        """Simpan hasil userProfiles().get: {userId: profile}"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO user_profiles (user_id, email, name, failed, fetched_at) VALUES (?, ?, ?, 0, ?)",
+                [
+                    (user_id, profile.get('emailAddress', ''), profile.get('name', {}).get('fullName', ''), now)
+                    for user_id, profile in profiles.items()
+                ]
+            )
+
+    def put_failures(self, user_ids):
+        """Catat userId yang gagal diambil (cache negatif)"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO user_profiles (user_id, email, name, failed, fetched_at) VALUES (?, NULL, NULL, 1, ?)",
+                [(user_id, now) for user_id in user_ids]
+            )
+
+
+_profile_cache = None
+_profile_cache_lock = threading.Lock()
+
+
+def get_profile_cache():
+    """Ambil ProfileCache bersama untuk seluruh proses (dipakai AttendanceBot & ClassroomAutoReminder)"""
+    global _profile_cache
+    with _profile_cache_lock:
+        if _profile_cache is None:
+            _profile_cache = ProfileCache(PROFILE_CACHE_PATH)
+        return _profile_cache
@@ -0,0 +1,193 @@
+import time
+import random
+import logging
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from config import (
+    SHEETS_READ_PER_MINUTE, SHEETS_WRITE_PER_MINUTE, CLASSROOM_REQUESTS_PER_MINUTE,
+    DRIVE_REQUESTS_PER_MINUTE, QUOTA_INTERACTIVE_RESERVE, QUOTA_MAX_RETRIES,
+    QUOTA_BACKOFF_BASE, QUOTA_BACKOFF_MAX
+)
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Prioritas request: command pengguna didahulukan daripada job terjadwal
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+_request_priority = contextvars.ContextVar('google_request_priority', default=INTERACTIVE)
+
+# Status HTTP yang layak dicoba ulang (timeout, rate limit, error server)
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+# 403 dari Drive/Classroom juga dipakai untuk rate limit
+RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded', 'usageLimits', 'Quota exceeded')
+
+
+def current_priority():
+    return _request_priority.get()
+
+
+@contextmanager
+def request_priority(priority):
+    """Set prioritas request Google untuk blok kode ini (ikut ke thread pool)"""
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+def background_job(callback):
+    """Bungkus callback job_queue agar request Google-nya berprioritas rendah"""
+    @functools.wraps(callback)
+    async def wrapper(*args, **kwargs):
+        with request_priority(BACKGROUND):
+            return await callback(*args, **kwargs)
+    return wrapper
+
+
+def error_status(error):
+    """Ambil status HTTP dari error gspread (APIError) / googleapiclient (HttpError)"""
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'resp', None), 'status', None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limited(error):
+    """429 atau 403 karena rate limit: request pasti ditolak sebelum diproses server"""
+    status = error_status(error)
+    return status == 429 or (status == 403 and any(reason in str(error) for reason in RATE_LIMIT_REASONS))
+
+
+def is_retryable(error, idempotent=True):
+    """Boleh dicoba ulang? Request non-idempoten (misal append) hanya saat kena rate limit,
+    karena 408 / 5xx bisa terjadi setelah request sudah diterapkan server (baris jadi ganda)."""
+    if is_rate_limited(error):
+        return True
+    return idempotent and error_status(error) in RETRYABLE_STATUS
+
+
+class TokenBucket:
+    """Token bucket per API (thread-safe).
+
+    Token terisi `rate_per_minute / 60` per detik hingga `capacity`. Request
+    berprioritas BACKGROUND hanya mengambil token jika masih tersisa lebih dari
+    `reserve`, sehingga selalu ada jatah untuk command pengguna.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None, reserve=0):
+        self.rate = max(rate_per_minute, 1) / 60.0
+        self.capacity = float(capacity or max(rate_per_minute, 1))
+        self.reserve = min(reserve, self.capacity - 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._condition = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority=INTERACTIVE, cost=1):
+        """Ambil `cost` token (menunggu jika perlu), kembalikan lama menunggu dalam detik"""
+        cost = min(cost, self.capacity)
+        floor = cost if priority == INTERACTIVE else cost + self.reserve
+        floor = min(floor, self.capacity)
+        started = time.monotonic()
+        with self._condition:
+            while True:
+                self._refill()
+                if self._tokens >= floor:
+                    self._tokens -= cost
+                    return time.monotonic() - started
+                self._condition.wait((floor - self._tokens) / self.rate)
+
+    def drain(self):
+        """Kosongkan bucket setelah 429 agar request berikutnya ikut menunggu"""
+        with self._condition:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0)
+
+    def available(self):
+        with self._condition:
+            self._refill()
+            return self._tokens
+
+
+class QuotaGovernor:
+    """Pengatur kuota bersama untuk semua request Google (Sheets, Drive, Classroom).
+
+    Setiap request mengambil token dari bucket API-nya, lalu dicoba ulang
+    dengan exponential backoff + jitter jika mendapat 429 / 5xx. Request yang
+    tidak idempoten (`idempotent=False`) hanya dicoba ulang saat kena rate limit.
+    """
+
+    def __init__(self, limits, reserve=QUOTA_INTERACTIVE_RESERVE, max_retries=QUOTA_MAX_RETRIES,
+                 backoff_base=QUOTA_BACKOFF_BASE, backoff_max=QUOTA_BACKOFF_MAX):
+        self.buckets = {api: TokenBucket(rate, reserve=reserve) for api, rate in limits.items()}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def backoff_delay(self, attempt):
+        """Exponential backoff dengan jitter (50-100% dari batas eksponensial)"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def call(self, api, func, *args, **kwargs):
+        """Jalankan satu request Google (idempoten) di bawah kuota `api`"""
+        return self.execute(api, func, args, kwargs)
+
+    def call_weighted(self, api, cost, func, *args, **kwargs):
+        """Seperti call, untuk request yang dihitung `cost` kali oleh Google (misal batch)"""
+        return self.execute(api, func, args, kwargs, cost=cost)
+
+    def execute(self, api, func, args=(), kwargs=None, cost=1, idempotent=True):
+        """Jalankan `func(*args, **kwargs)` di bawah kuota `api` dengan retry sesuai jenis request"""
+        kwargs = kwargs or {}
+        bucket = self.buckets[api]
+        priority = current_priority()
+        for attempt in range(self.max_retries + 1):
+            waited = bucket.acquire(priority, cost)
+            if waited > 0.05:
+                metrics.increment(f'quota.{api}.throttled')
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e, idempotent) or attempt == self.max_retries:
+                    raise
+                if error_status(e) == 429:
+                    bucket.drain()
+                delay = self.backoff_delay(attempt)
+                metrics.increment(f'quota.{api}.retry')
+                logger.warning(
+                    f"⏳ Google API '{api}' sibuk (status {error_status(e)}), "
+                    f"coba lagi dalam {delay:.1f}s (percobaan {attempt + 1}/{self.max_retries})"
+                )
+                time.sleep(delay)
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_quota_governor():
+    """Ambil QuotaGovernor bersama untuk seluruh proses"""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = QuotaGovernor({
+                'sheets_read': SHEETS_READ_PER_MINUTE,
+                'sheets_write': SHEETS_WRITE_PER_MINUTE,
+                'classroom': CLASSROOM_REQUESTS_PER_MINUTE,
+                'drive': DRIVE_REQUESTS_PER_MINUTE,
+            })
+        return _governor
@@ -0,0 +1,66 @@
+import csv
+import io
+
+# Alias header CSV (huruf kecil, tanpa spasi/underscore) -> kolom sheet
+HEADER_ALIASES = {
+    'nama': 'Nama', 'name': 'Nama', 'namalengkap': 'Nama',
+    'telegramid': 'Telegram ID', 'userid': 'Telegram ID', 'id': 'Telegram ID',
+    'email': 'Email',
+    'username': 'Username',
+}
+
+
+def _header_key(name):
+    return ''.join(ch for ch in str(name).lower() if ch.isalnum())
+
+
+def parse_registration_csv(data):
+    """Baca CSV pendaftaran massal (bytes atau str).
+
+    Kolom wajib: Nama dan Telegram ID; Email dan Username opsional. Kembalikan
+    (rows, errors): rows = [(nomor_baris_csv, record)] yang lolos validasi,
+    errors = [(nomor_baris_csv, alasan)]. Duplikat tidak dicek di sini.
+    """
+    if isinstance(data, bytes):
+        data = data.decode('utf-8-sig')
+    reader = csv.reader(io.StringIO(data))
+    header = next(reader, None)
+    if not header:
+        raise ValueError("File CSV kosong")
+
+    columns = [HEADER_ALIASES.get(_header_key(name)) for name in header]
+    missing = [column for column in ('Nama', 'Telegram ID') if column not in columns]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ada: {', '.join(missing)}")
+
+    rows, errors = [], []
+    for line, values in enumerate(reader, start=2):
+        if not any(value.strip() for value in values):
+            continue
+        raw = {}
+        for column, value in zip(columns, values):
+            if column is not None and column not in raw:
+                raw[column] = value.strip()
+
+        nama = raw.get('Nama', '')
+        telegram_id = raw.get('Telegram ID', '')
+        email = raw.get('Email', '')
+        username = raw.get('Username', '').lstrip('@')
+
+        if len(nama) < 2:
+            errors.append((line, "Nama terlalu pendek"))
+            continue
+        if not telegram_id.isdigit():
+            errors.append((line, f"Telegram ID tidak valid: {telegram_id or '-'}"))
+            continue
+        if email and '@' not in email:
+            errors.append((line, f"Email tidak valid: {email}"))
+            continue
+
+        rows.append((line, {
+            'Nama': nama,
+            'Telegram ID': int(telegram_id),
+            'Email': email,
+            'Username': f"@{username}" if username else "-",
+        }))
+    return rows, errors
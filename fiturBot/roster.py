@@ -0,0 +1,159 @@
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Kolom sheet -> atribut Student
+COLUMN_FIELDS = {
+    'Nama': 'nama',
+    'Telegram ID': 'telegram_id',
+    'Email': 'email',
+    'Username': 'username',
+    'Total Hadir': 'total_hadir',
+    'Total Alpha': 'total_alpha',
+    'Total Izin': 'total_izin',
+    'Status Terakhir': 'status_terakhir',
+}
+INT_FIELDS = ('telegram_id', 'total_hadir', 'total_alpha', 'total_izin')
+
+
+class Student:
+    """Satu baris roster: atribut bertipe (counter int) dengan __slots__.
+
+    Kolom sheet lain (misal Keterangan) disimpan di `extra` agar tetap ikut
+    saat export.
+    """
+
+    __slots__ = ('row_number', *COLUMN_FIELDS.values(), 'extra')
+
+    def __init__(self, row_number, nama='', telegram_id=0, email='', username='',
+                 total_hadir=0, total_alpha=0, total_izin=0, status_terakhir='', extra=None):
+        self.row_number = row_number
+        self.nama = nama
+        self.telegram_id = telegram_id
+        self.email = email
+        self.username = username
+        self.total_hadir = total_hadir
+        self.total_alpha = total_alpha
+        self.total_izin = total_izin
+        self.status_terakhir = status_terakhir
+        self.extra = extra
+
+    @classmethod
+    def from_record(cls, row_number, record):
+        """Buat Student dari {kolom_sheet: nilai}"""
+        values = {}
+        extra = {}
+        for column, value in record.items():
+            field = COLUMN_FIELDS.get(column)
+            if field is None:
+                extra[column] = value
+            elif field in INT_FIELDS:
+                values[field] = int(value or 0)
+            else:
+                values[field] = '' if value is None else value
+        return cls(row_number, extra=extra or None, **values)
+
+    def get(self, column, default=None):
+        """Ambil nilai berdasarkan nama kolom sheet"""
+        field = COLUMN_FIELDS.get(column)
+        if field is not None:
+            return getattr(self, field)
+        return (self.extra or {}).get(column, default)
+
+    def set(self, column, value):
+        """Ubah nilai berdasarkan nama kolom sheet"""
+        field = COLUMN_FIELDS.get(column)
+        if field is None:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[column] = value
+        else:
+            setattr(self, field, int(value) if field in INT_FIELDS else value)
+
+    def to_record(self):
+        """{kolom_sheet: nilai} termasuk kolom tambahan"""
+        record = {column: getattr(self, field) for column, field in COLUMN_FIELDS.items()}
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+    def copy(self):
+        return Student(
+            self.row_number, self.nama, self.telegram_id, self.email, self.username,
+            self.total_hadir, self.total_alpha, self.total_izin, self.status_terakhir,
+            dict(self.extra) if self.extra else None
+        )
+
+    def __repr__(self):
+        return f"Student(row={self.row_number}, nama={self.nama!r}, telegram_id={self.telegram_id})"
+
+
+class Roster:
+    """Daftar Student urut nomor baris sheet (baris data pertama = baris 2).
+
+    Nomor baris tidak harus berurutan (store lokal bisa berisi baris baru
+    sebelum baris tambahan admin ikut tersinkron), jadi pencarian per baris
+    memakai index nomor baris, bukan posisi di list.
+    """
+
+    __slots__ = ('students', 'columns', 'fetched_at', '_by_row')
+
+    def __init__(self, students=None, columns=None, fetched_at=None):
+        self.students = list(students or [])
+        self._by_row = {student.row_number: student for student in self.students}
+        # Urutan kolom sheet (untuk export)
+        self.columns = list(columns or COLUMN_FIELDS)
+        # Waktu (epoch) data terakhir dipastikan sama dengan Sheets, None jika belum pernah
+        self.fetched_at = fetched_at
+
+    def __len__(self):
+        return len(self.students)
+
+    def __iter__(self):
+        return iter(self.students)
+
+    @property
+    def empty(self):
+        return not self.students
+
+    def age(self, now=None):
+        """Umur data dalam detik sejak terakhir dibaca dari Sheets (inf jika tidak diketahui)"""
+        if self.fetched_at is None:
+            return float('inf')
+        return max(0.0, (now or time.time()) - self.fetched_at)
+
+    @property
+    def last_row(self):
+        """Nomor baris sheet murid terakhir (1 = hanya header)"""
+        return self.students[-1].row_number if self.students else 1
+
+    def at_row(self, row_number):
+        """Student pada nomor baris sheet, None jika di luar roster"""
+        return self._by_row.get(row_number)
+
+    def append(self, student):
+        self.students.append(student)
+        self._by_row[student.row_number] = student
+
+    def column(self, name):
+        """Semua nilai satu kolom sheet sebagai list"""
+        field = COLUMN_FIELDS.get(name)
+        if field is not None:
+            return [getattr(student, field) for student in self.students]
+        return [student.get(name, '') for student in self.students]
+
+    def totals(self):
+        """Jumlah (hadir, alpha, izin) seluruh murid"""
+        hadir = alpha = izin = 0
+        for student in self.students:
+            hadir += student.total_hadir
+            alpha += student.total_alpha
+            izin += student.total_izin
+        return hadir, alpha, izin
+
+    def with_status(self, status):
+        return [student for student in self.students if student.status_terakhir == status]
+
+    def to_records(self):
+        return [student.to_record() for student in self.students]
@@ -0,0 +1,70 @@
+import re
+import logging
+from .roster import COLUMN_FIELDS, INT_FIELDS, Roster, Student
+
+logger = logging.getLogger(__name__)
+
+# Kolom yang wajib ada di header worksheet absensi
+REQUIRED_COLUMNS = ('Nama', 'Telegram ID', 'Total Hadir', 'Total Alpha', 'Total Izin', 'Status Terakhir')
+NUMERIC_COLUMNS = ('Telegram ID', 'Total Hadir', 'Total Alpha', 'Total Izin')
+_NON_NUMERIC = r'[^0-9.\-]'
+
+
+def parse_int(value):
+    """Konversi satu nilai sel ke int dengan aturan pembersihan yang sama (gagal = 0)"""
+    if isinstance(value, int):
+        return value
+    try:
+        return int(float(re.sub(_NON_NUMERIC, '', str(value))))
+    except (TypeError, ValueError):
+        return 0
+
+
+def map_header(header):
+    """Petakan nama kolom header ke posisi kolom (1-based).
+
+    Header kosong diabaikan, nama duplikat memakai kolom pertama. Raise
+    ValueError jika ada kolom wajib yang tidak ditemukan.
+    """
+    positions = {}
+    for position, name in enumerate(header, start=1):
+        name = str(name).strip()
+        if name and name not in positions:
+            positions[name] = position
+
+    missing = [column for column in REQUIRED_COLUMNS if column not in positions]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ditemukan di header sheet: {', '.join(missing)}")
+    return positions
+
+
+def parse_roster(values):
+    """Ubah hasil worksheet.get_values() menjadi (Roster, posisi kolom).
+
+    Header dipetakan sekali, baris yang lebih pendek dari header dianggap
+    berisi string kosong, dan kolom numerik langsung dikonversi ke int saat
+    Student dibuat. Nomor baris sheet = posisi + 2.
+    """
+    if not values:
+        raise ValueError("Worksheet kosong (header tidak ditemukan)")
+
+    positions = map_header(values[0])
+    fields = [(COLUMN_FIELDS[name], position - 1) for name, position in positions.items() if name in COLUMN_FIELDS]
+    extras = [(name, position - 1) for name, position in positions.items() if name not in COLUMN_FIELDS]
+    int_fields = set(INT_FIELDS)
+
+    students = []
+    for row_number, row in enumerate(values[1:], start=2):
+        width = len(row)
+        attributes = {}
+        for field, index in fields:
+            value = row[index] if index < width else ''
+            if field in int_fields:
+                try:
+                    value = int(value)
+                except (TypeError, ValueError):
+                    value = parse_int(value)
+            attributes[field] = value
+        extra = {name: row[index] if index < width else '' for name, index in extras} or None
+        students.append(Student(row_number, extra=extra, **attributes))
+    return Roster(students, columns=list(positions)), positions
@@ -0,0 +1,57 @@
+import os
+import json
+import logging
+import tempfile
+from .roster import Roster, Student
+
+logger = logging.getLogger(__name__)
+
+
+class RosterSnapshot:
+    """Snapshot roster di disk (JSON) untuk start cepat dan saat Sheets tidak bisa diakses.
+
+    Berisi roster terakhir yang berhasil dibaca beserta posisi kolom header
+    dan versi spreadsheet, sehingga setelah restart probe perubahan bisa
+    langsung memastikan snapshot masih sama dengan sheet.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def save(self, roster, positions=None, revision=None):
+        """Tulis snapshot secara atomik (file sementara lalu rename)"""
+        data = {
+            'fetched_at': roster.fetched_at,
+            'revision': list(revision) if revision else None,
+            'columns': roster.columns,
+            'positions': positions,
+            'rows': [[student.row_number, student.to_record()] for student in roster],
+        }
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def load(self):
+        """Baca snapshot: (Roster, posisi kolom, versi sheet), None jika tidak ada / rusak"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            roster = Roster(
+                [Student.from_record(row_number, record) for row_number, record in data['rows']],
+                columns=data.get('columns'),
+                fetched_at=data.get('fetched_at'),
+            )
+            revision = tuple(data['revision']) if data.get('revision') else None
+            return roster, data.get('positions'), revision
+        except Exception as e:
+            logger.warning(f"⚠️ Snapshot roster {self.path} tidak bisa dibaca: {e}")
+            return None
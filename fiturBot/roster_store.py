@@ -0,0 +1,410 @@
+import os
+import json
+import logging
+import sqlite3
+import threading
+import time
+from .roster import COLUMN_FIELDS, Roster, Student
+from .roster_parser import NUMERIC_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Kolom sheet yang di-mirror -> nama kolom di SQLite (sama dengan atribut Student)
+STORE_COLUMNS = dict(COLUMN_FIELDS)
+# Counter absen disimpan juga sebagai delta yang belum terkirim ke sheet
+COUNTER_DELTAS = {
+    'Total Hadir': 'delta_hadir',
+    'Total Alpha': 'delta_alpha',
+    'Total Izin': 'delta_izin',
+}
+# Kolom event absensi (urutan sama dengan worksheet riwayat)
+EVENT_COLUMNS = ('created_at', 'meeting_date', 'telegram_id', 'nama', 'status', 'source')
+
+
+class RosterStore:
+    """Mirror lokal (SQLite) dari worksheet absensi.
+
+    Setiap murid disimpan dengan kunci Telegram ID (atau `row:N` untuk baris
+    tanpa ID) beserta nomor barisnya di sheet. Perubahan dari bot ditandai
+    `dirty_columns` dan `version`, sehingga sinkronisasi hanya mengirim kolom
+    yang benar-benar diubah bot dan tidak menimpa edit admin di kolom lain.
+
+    Penambahan counter (absen) dicatat sebagai delta: saat menarik data sheet,
+    nilai lokal = nilai sheet + delta yang belum terkirim, sehingga edit admin
+    pada counter tidak hilang dan increment dari bot juga tidak hilang.
+
+    Setiap absen juga dicatat di tabel `attendance_events` (append-only) dalam
+    transaksi yang sama dengan increment counter, sehingga total selalu sesuai
+    log dan riwayat per pertemuan bisa ditanyakan kapan saja.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._create_tables()
+
+    def _create_tables(self):
+        columns = ",\n".join(
+            f"{name} {'INTEGER NOT NULL DEFAULT 0' if header in NUMERIC_COLUMNS else 'TEXT'}"
+            for header, name in STORE_COLUMNS.items()
+        )
+        with self._lock, self._conn:
+            self._conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS students (
+                    student_key TEXT PRIMARY KEY,
+                    row_number INTEGER NOT NULL,
+                    {columns},
+                    dirty_columns TEXT NOT NULL DEFAULT '',
+                    version INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_students_row ON students (row_number)"
+            )
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS attendance_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at TEXT NOT NULL,
+                    meeting_date TEXT NOT NULL,
+                    telegram_id TEXT NOT NULL,
+                    nama TEXT,
+                    status TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    synced INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_events_meeting ON attendance_events (meeting_date, telegram_id)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_events_unsynced ON attendance_events (synced, id)"
+            )
+            # Database lama belum punya kolom delta / extra
+            existing = {row[1] for row in self._conn.execute("PRAGMA table_info(students)")}
+            for name in COUNTER_DELTAS.values():
+                if name not in existing:
+                    self._conn.execute(
+                        f"ALTER TABLE students ADD COLUMN {name} INTEGER NOT NULL DEFAULT 0"
+                    )
+            if 'extra' not in existing:
+                # Kolom sheet yang tidak di-mirror (misal Keterangan) sebagai JSON, hanya untuk dibaca
+                self._conn.execute("ALTER TABLE students ADD COLUMN extra TEXT")
+
+    @staticmethod
+    def _student_key(telegram_id, row_number):
+        telegram_id = str(telegram_id).strip() if telegram_id is not None else ''
+        if telegram_id and telegram_id != '0':
+            return telegram_id
+        return f"row:{row_number}"
+
+    def is_empty(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM students").fetchone()[0] == 0
+
+    def _set_meta(self, key, value):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)", (key, str(value))
+        )
+
+    def mark_pulled(self, fetched_at=None):
+        """Catat waktu data store terakhir dipastikan sama dengan sheet"""
+        with self._lock, self._conn:
+            self._set_meta('last_pulled_at', fetched_at or time.time())
+
+    def last_pulled_at(self):
+        """Waktu (epoch) tarik data sheet terakhir yang berhasil, None jika belum pernah"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM store_meta WHERE key = 'last_pulled_at'"
+            ).fetchone()
+        return float(row[0]) if row else None
+
+    def load_roster(self):
+        """Baca seluruh roster lokal sebagai Roster (urut nomor baris, termasuk kolom extra)"""
+        names = ", ".join(STORE_COLUMNS.values())
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT row_number, extra, {names} FROM students ORDER BY row_number"
+            ).fetchall()
+            columns = self._conn.execute(
+                "SELECT value FROM store_meta WHERE key = 'columns'"
+            ).fetchone()
+        fields = list(STORE_COLUMNS.values())
+        students = [
+            Student(
+                row_number, extra=json.loads(extra) if extra else None,
+                **{field: '' if value is None else value for field, value in zip(fields, values)}
+            )
+            for row_number, extra, *values in rows
+        ]
+        columns = json.loads(columns[0]) if columns else list(STORE_COLUMNS)
+        return Roster(students, columns=columns, fetched_at=self.last_pulled_at())
+
+    def save_changes(self, changes_by_row):
+        """Simpan perubahan bot {nomor_baris: {kolom: nilai}} dan tandai dirty"""
+        now = time.time()
+        with self._lock, self._conn:
+            for row_number, values in changes_by_row.items():
+                current = self._conn.execute(
+                    "SELECT dirty_columns FROM students WHERE row_number = ?", (row_number,)
+                ).fetchone()
+                if current is None:
+                    continue
+                dirty = set(filter(None, current[0].split(',')))
+                dirty.update(values)
+                # Nilai counter absolut menggantikan delta yang tertunda
+                assignments = ", ".join(
+                    [f"{STORE_COLUMNS[column]} = ?" for column in values]
+                    + [f"{COUNTER_DELTAS[column]} = 0" for column in values if column in COUNTER_DELTAS]
+                )
+                self._conn.execute(
+                    f"UPDATE students SET {assignments}, dirty_columns = ?, "
+                    f"version = version + 1, updated_at = ? WHERE row_number = ?",
+                    (*values.values(), ','.join(sorted(dirty)), now, row_number)
+                )
+
+    def increment(self, row_number, deltas, values=None, event=None):
+        """Tambah counter secara atomik lalu kembalikan {kolom: nilai_baru}.
+
+        `deltas` berisi {kolom_counter: tambahan}, `values` kolom lain yang ikut
+        di-set (misal Status Terakhir). Jika `event` diberikan ({kolom: nilai}
+        sesuai EVENT_COLUMNS), event ditambahkan ke log dalam transaksi yang
+        sama. Kembalikan None jika baris tidak ada.
+        """
+        values = values or {}
+        counters = ", ".join(COUNTER_DELTAS[column] for column in COUNTER_DELTAS)
+        totals = ", ".join(STORE_COLUMNS[column] for column in COUNTER_DELTAS)
+        with self._lock, self._conn:
+            current = self._conn.execute(
+                f"SELECT dirty_columns, {totals}, {counters} FROM students WHERE row_number = ?",
+                (row_number,)
+            ).fetchone()
+            if current is None:
+                return None
+            dirty = set(filter(None, current[0].split(',')))
+            count = len(COUNTER_DELTAS)
+            totals_now = dict(zip(COUNTER_DELTAS, current[1:1 + count]))
+            deltas_now = dict(zip(COUNTER_DELTAS, current[1 + count:]))
+
+            updated = dict(values)
+            assignments, params = [], []
+            for column, amount in deltas.items():
+                updated[column] = totals_now[column] + amount
+                assignments.append(f"{STORE_COLUMNS[column]} = ?")
+                params.append(updated[column])
+                # Kolom yang sudah dirty (nilai absolut) cukup diubah nilainya
+                if column not in dirty:
+                    assignments.append(f"{COUNTER_DELTAS[column]} = ?")
+                    params.append(deltas_now[column] + amount)
+            for column, value in values.items():
+                assignments.append(f"{STORE_COLUMNS[column]} = ?")
+                params.append(value)
+                dirty.add(column)
+
+            self._conn.execute(
+                f"UPDATE students SET {', '.join(assignments)}, dirty_columns = ?, "
+                f"version = version + 1, updated_at = ? WHERE row_number = ?",
+                (*params, ','.join(sorted(dirty)), time.time(), row_number)
+            )
+            if event is not None:
+                self._insert_event(event)
+        return updated
+
+    # ==================== EVENT LOG ====================
+    def _insert_event(self, event):
+        self._conn.execute(
+            f"INSERT INTO attendance_events ({', '.join(EVENT_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in EVENT_COLUMNS)})",
+            tuple(str(event[column]) for column in EVENT_COLUMNS)
+        )
+
+    def pending_events(self, limit=500):
+        """Event yang belum dikirim ke worksheet riwayat: [(id, {kolom: nilai})]"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, {', '.join(EVENT_COLUMNS)} FROM attendance_events "
+                f"WHERE synced = 0 ORDER BY id LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [(event_id, dict(zip(EVENT_COLUMNS, values))) for event_id, *values in rows]
+
+    def mark_events_synced(self, event_ids):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE attendance_events SET synced = 1 WHERE id = ?",
+                [(event_id,) for event_id in event_ids]
+            )
+
+    def meeting_attendance(self, meeting_date):
+        """Status terakhir tiap murid pada satu pertemuan: {telegram_id: {kolom: nilai}}"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(EVENT_COLUMNS)} FROM attendance_events "
+                f"WHERE id IN (SELECT MAX(id) FROM attendance_events "
+                f"WHERE meeting_date = ? GROUP BY telegram_id)",
+                (meeting_date,)
+            ).fetchall()
+        events = [dict(zip(EVENT_COLUMNS, values)) for values in rows]
+        return {event['telegram_id']: event for event in events}
+
+    def iter_events(self, start=None, end=None, chunk_size=1000):
+        """Iterasi event absen (urut waktu) dengan meeting_date di antara start..end (YYYY-MM-DD).
+
+        Dibaca per potongan `chunk_size` baris sehingga lock tidak ditahan
+        selama seluruh export dan event tidak dimuat ke memori sekaligus.
+        """
+        conditions, params = ["id > ?"], []
+        if start:
+            conditions.append("meeting_date >= ?")
+            params.append(start)
+        if end:
+            conditions.append("meeting_date <= ?")
+            params.append(end)
+        query = (
+            f"SELECT id, {', '.join(EVENT_COLUMNS)} FROM attendance_events "
+            f"WHERE {' AND '.join(conditions)} ORDER BY id LIMIT ?"
+        )
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(query, (last_id, *params, chunk_size)).fetchall()
+            for event_id, *values in rows:
+                yield dict(zip(EVENT_COLUMNS, values))
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1][0]
+
+    def insert_student(self, row_number, record):
+        """Tambahkan murid baru yang sudah tertulis di sheet"""
+        key = self._student_key(record.get('Telegram ID'), row_number)
+        names = ", ".join(STORE_COLUMNS.values())
+        placeholders = ", ".join("?" for _ in STORE_COLUMNS)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO students (student_key, row_number, {names}, updated_at) "
+                f"VALUES (?, ?, {placeholders}, ?)",
+                (key, row_number, *(record.get(column) for column in STORE_COLUMNS), time.time())
+            )
+
+    def dirty_changes(self):
+        """Ambil perubahan yang belum terkirim.
+
+        Kembalikan ({nomor_baris: {kolom: nilai}}, {key: (version, {kolom_delta: delta})}).
+        Counter dengan delta dikirim sebagai nilai sheet terakhir + delta.
+        """
+        names = ", ".join(STORE_COLUMNS.values())
+        delta_names = ", ".join(COUNTER_DELTAS.values())
+        delta_filter = " OR ".join(f"{name} != 0" for name in COUNTER_DELTAS.values())
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT student_key, row_number, version, dirty_columns, {delta_names}, {names} "
+                f"FROM students WHERE dirty_columns != '' OR {delta_filter}"
+            ).fetchall()
+        changes, pushed = {}, {}
+        count = len(COUNTER_DELTAS)
+        for key, row_number, version, dirty_columns, *rest in rows:
+            deltas = {
+                column: delta
+                for column, delta in zip(COUNTER_DELTAS, rest[:count]) if delta
+            }
+            record = dict(zip(STORE_COLUMNS, rest[count:]))
+            columns = set(filter(None, dirty_columns.split(','))) | set(deltas)
+            changes[row_number] = {column: record[column] for column in columns}
+            pushed[key] = (version, {COUNTER_DELTAS[column]: delta for column, delta in deltas.items()})
+        return changes, pushed
+
+    def mark_clean(self, pushed):
+        """Tandai perubahan sudah terkirim.
+
+        Delta yang terkirim dikurangkan (increment baru tetap tersimpan), tanda
+        dirty dibersihkan kecuali baris yang berubah lagi sejak diambil.
+        """
+        with self._lock, self._conn:
+            for key, (version, deltas) in pushed.items():
+                if deltas:
+                    assignments = ", ".join(f"{name} = {name} - ?" for name in deltas)
+                    self._conn.execute(
+                        f"UPDATE students SET {assignments} WHERE student_key = ?",
+                        (*deltas.values(), key)
+                    )
+                self._conn.execute(
+                    "UPDATE students SET dirty_columns = '' WHERE student_key = ? AND version = ?",
+                    (key, version)
+                )
+
+    def merge_from_sheet(self, roster):
+        """Gabungkan data sheet ke store lokal.
+
+        Baris dicocokkan lewat Telegram ID sehingga nomor baris ikut diperbarui
+        jika admin menyisipkan/menghapus baris. Kolom yang masih dirty (belum
+        terkirim) tetap memakai nilai lokal; baris yang hilang dari sheet dihapus.
+        Telegram ID yang muncul lebih dari sekali: baris pertama memakai ID,
+        baris berikutnya disimpan dengan kunci `row:N` (sama seperti index roster
+        yang memakai kecocokan pertama). Kolom extra selalu mengikuti sheet.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            delta_names = ", ".join(COUNTER_DELTAS.values())
+            local, pending = {}, {}
+            for key, dirty_columns, *deltas in self._conn.execute(
+                f"SELECT student_key, dirty_columns, {delta_names} FROM students"
+            ):
+                local[key] = dirty_columns
+                pending[key] = dict(zip(COUNTER_DELTAS, deltas))
+            seen = set()
+            # Nomor baris lama dilepas dulu agar tidak bentrok saat baris bergeser
+            self._conn.execute("UPDATE students SET row_number = -row_number")
+            for student in roster:
+                row_number = student.row_number
+                record = student.to_record()
+                key = self._student_key(record.get('Telegram ID'), row_number)
+                if key in seen:
+                    logger.warning(f"⚠️ Telegram ID {key} duplikat di baris {row_number}, disimpan per baris")
+                    key = self._student_key(None, row_number)
+                seen.add(key)
+                dirty = set(filter(None, local.get(key, '').split(',')))
+                values = {
+                    column: record.get(column, 0 if column in NUMERIC_COLUMNS else '')
+                    for column in STORE_COLUMNS
+                    if column not in dirty
+                }
+                # Increment yang belum terkirim ditambahkan di atas nilai sheet terbaru
+                for column, delta in pending.get(key, {}).items():
+                    if delta and column in values:
+                        values[column] = int(values[column] or 0) + delta
+                extra = json.dumps(student.extra, ensure_ascii=False) if student.extra else None
+                if key in local:
+                    assignments = ", ".join(f"{STORE_COLUMNS[column]} = ?" for column in values)
+                    self._conn.execute(
+                        f"UPDATE students SET row_number = ?, {assignments}, extra = ?, updated_at = ? "
+                        f"WHERE student_key = ?",
+                        (row_number, *values.values(), extra, now, key)
+                    )
+                else:
+                    names = ", ".join(STORE_COLUMNS[column] for column in values)
+                    placeholders = ", ".join("?" for _ in values)
+                    self._conn.execute(
+                        f"INSERT INTO students (student_key, row_number, {names}, extra, updated_at) "
+                        f"VALUES (?, ?, {placeholders}, ?, ?)",
+                        (key, row_number, *values.values(), extra, now)
+                    )
+            removed = set(local) - seen
+            self._conn.executemany(
+                "DELETE FROM students WHERE student_key = ?", [(key,) for key in removed]
+            )
+            self._set_meta('last_pulled_at', roster.fetched_at or now)
+            self._set_meta('columns', json.dumps(roster.columns, ensure_ascii=False))
+        logger.info(f"🔄 Store lokal disinkronkan dari sheet: {len(seen)} murid, {len(removed)} dihapus")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
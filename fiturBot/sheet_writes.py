@@ -0,0 +1,217 @@
+import logging
+import threading
+from gspread.utils import rowcol_to_a1
+from .quota import BACKGROUND, request_priority
+
+logger = logging.getLogger(__name__)
+
+
+class SheetWriteBatch:
+    """Kumpulkan perubahan sel lalu kirim sebagai satu panggilan batch_update.
+
+    Sel yang berurutan dalam satu kolom digabung menjadi satu range, sehingga
+    reset satu kolom status untuk seluruh kelas cukup satu range dan satu
+    request ke Google Sheets.
+    """
+
+    def __init__(self, worksheet, value_input_option='USER_ENTERED'):
+        self.worksheet = worksheet
+        self.value_input_option = value_input_option
+        self._cells = {}  # {(row, col): value}
+
+    def __len__(self):
+        return len(self._cells)
+
+    def set(self, row, col, value):
+        """Catat nilai baru untuk satu sel (nilai terakhir yang menang)"""
+        self._cells[(row, col)] = value
+        return self
+
+    def set_row(self, row, values_by_col):
+        """Catat beberapa sel pada satu baris: {kolom: nilai}"""
+        for col, value in values_by_col.items():
+            self.set(row, col, value)
+        return self
+
+    def build_ranges(self):
+        """Gabungkan sel menjadi daftar range untuk batch_update"""
+        by_col = {}
+        for (row, col), value in self._cells.items():
+            by_col.setdefault(col, []).append((row, value))
+
+        data = []
+        for col in sorted(by_col):
+            cells = sorted(by_col[col])
+            start_row, values = cells[0][0], [cells[0][1]]
+            prev_row = start_row
+            for row, value in cells[1:]:
+                if row == prev_row + 1:
+                    values.append(value)
+                else:
+                    data.append(self._range_entry(start_row, col, values))
+                    start_row, values = row, [value]
+                prev_row = row
+            data.append(self._range_entry(start_row, col, values))
+        return data
+
+    @staticmethod
+    def _range_entry(start_row, col, values):
+        end_row = start_row + len(values) - 1
+        return {
+            'range': f"{rowcol_to_a1(start_row, col)}:{rowcol_to_a1(end_row, col)}",
+            'values': [[value] for value in values],
+        }
+
+    def commit(self):
+        """Kirim semua perubahan dalam satu request, kembalikan jumlah sel"""
+        if not self._cells:
+            return 0
+        data = self.build_ranges()
+        self.worksheet.batch_update(data, value_input_option=self.value_input_option)
+        count = len(self._cells)
+        logger.info(f"📝 Batch update: {count} sel dalam {len(data)} range (1 request)")
+        self._cells.clear()
+        return count
+
+
+class WriteBehindBuffer:
+    """Antrian tulis tertunda: perubahan digabung per baris lalu di-flush berkala.
+
+    Flush dijalankan oleh thread latar setiap `flush_interval` detik atau segera
+    ketika jumlah sel tertunda mencapai `max_pending`. Jika flush gagal (misal
+    error dari Google Sheets), perubahan dikembalikan ke antrian tanpa menimpa
+    nilai yang lebih baru, lalu dicoba lagi pada flush berikutnya.
+    """
+
+    thread_name = "sheet-write-behind"
+
+    def __init__(self, flush_func, flush_interval=10, max_pending=50):
+        self.flush_func = flush_func
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}  # {row: {kolom: nilai}}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._running = False
+        self._thread = None
+        self.failed_flushes = 0
+
+    def pending_count(self):
+        with self._lock:
+            return sum(len(values) for values in self._pending.values())
+
+    def snapshot(self):
+        """Salinan perubahan yang belum terkirim: {row: {kolom: nilai}}"""
+        with self._lock:
+            return {row: dict(values) for row, values in self._pending.items()}
+
+    def add(self, changes_by_row):
+        """Masukkan perubahan ke antrian (nilai terbaru per sel yang dipakai)"""
+        with self._lock:
+            for row, values in changes_by_row.items():
+                self._pending.setdefault(row, {}).update(values)
+            pending = sum(len(values) for values in self._pending.values())
+        if pending >= self.max_pending:
+            self._wakeup.set()
+
+    def flush(self, raise_errors=False):
+        """Kirim semua perubahan tertunda, kembalikan jumlah baris yang di-flush"""
+        with self._flush_lock:
+            batch = self._take()
+            if not batch:
+                return 0
+            try:
+                self.flush_func(batch)
+                self.failed_flushes = 0
+                return len(batch)
+            except Exception as e:
+                self.failed_flushes += 1
+                self._requeue(batch)
+                logger.error(f"❌ Flush write-behind gagal (percobaan {self.failed_flushes}), akan dicoba lagi: {e}")
+                if raise_errors:
+                    raise
+                return 0
+
+    def _take(self):
+        """Ambil seluruh isi antrian dan kosongkan"""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            return batch
+
+    def _requeue(self, batch):
+        """Kembalikan batch gagal ke antrian tanpa menimpa perubahan yang lebih baru"""
+        with self._lock:
+            for row, values in batch.items():
+                newer = self._pending.setdefault(row, {})
+                for column, value in values.items():
+                    newer.setdefault(column, value)
+
+    def start(self):
+        """Jalankan thread flusher di latar belakang"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+        self._thread.start()
+        logger.info(f"✅ {self.thread_name} aktif (flush tiap {self.flush_interval}s atau {self.max_pending} item)")
+
+    def stop(self):
+        """Hentikan flusher dan kirim sisa antrian"""
+        self._running = False
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def _run(self):
+        while self._running:
+            self._wakeup.wait(timeout=self.flush_interval)
+            self._wakeup.clear()
+            try:
+                # Flush berkala tidak boleh menghabiskan jatah kuota command pengguna
+                with request_priority(BACKGROUND):
+                    self.flush()
+            except Exception as e:
+                logger.error(f"Error in write-behind flusher: {e}")
+
+
+class AppendBehindBuffer(WriteBehindBuffer):
+    """Antrian baris append-only (misal riwayat absen) yang dikirim per batch.
+
+    Sama seperti WriteBehindBuffer, tetapi isinya daftar baris berurutan:
+    satu flush = satu panggilan `flush_func(rows)`. Batch yang gagal
+    dikembalikan ke depan antrian agar urutan tetap terjaga.
+    """
+
+    thread_name = "sheet-append-behind"
+
+    def __init__(self, flush_func, flush_interval=10, max_pending=500):
+        super().__init__(flush_func, flush_interval=flush_interval, max_pending=max_pending)
+        self._pending = []
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def snapshot(self):
+        """Salinan baris yang belum terkirim"""
+        with self._lock:
+            return list(self._pending)
+
+    def add(self, rows):
+        """Tambahkan baris ke akhir antrian"""
+        with self._lock:
+            self._pending.extend(rows)
+            pending = len(self._pending)
+        if pending >= self.max_pending:
+            self._wakeup.set()
+
+    def _take(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+            return batch
+
+    def _requeue(self, batch):
+        with self._lock:
+            self._pending[:0] = batch
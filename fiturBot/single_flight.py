@@ -0,0 +1,56 @@
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Gabungkan panggilan bersamaan dengan kunci yang sama menjadi satu eksekusi.
+
+    Thread pertama menjalankan fungsi; thread lain dengan kunci sama yang
+    datang selama fungsi masih berjalan menunggu lalu menerima hasil (atau
+    exception) yang sama. Setelah selesai, panggilan berikutnya dijalankan ulang.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """Jalankan `func` sekali per kunci, kembalikan (hasil, shared).
+
+        `shared` bernilai True jika hasil diambil dari panggilan lain yang
+        sedang berjalan.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
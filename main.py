@@ -73,6 +73,19 @@ async def setup_bot_commands(application):
     except Exception as e:
         logger.error(f"❌ Error setting bot commands: {e}")
     
+async def on_shutdown(application):
+    """Kirim absen yang masih tertunda (semua kelas) lalu matikan thread pool Google"""
+    registry = application.bot_data.get('class_registry')
+    for class_config, bot in (registry.loaded_bots() if registry is not None else []):
+        try:
+            bot.flush_pending_writes()
+            logger.info(f"✅ Pending attendance writes flushed ({class_config.name})")
+        except Exception as e:
+            logger.error(f"❌ Error flushing pending writes ({class_config.name}): {e}")
+    
+    from fiturBot.executors import shutdown_executors
+    shutdown_executors(wait=False)
+
 def main():
     """Main function - synchronous version"""
     try:
@@ -82,28 +95,33 @@ def main():
             logger.error("❌ Config validation failed")
             return
         
-        # Test connections
+        # Registry kelas: satu AttendanceBot per grup (koneksi Google di-pool & dipakai bersama)
+        from fiturBot.class_registry import get_class_registry
+        registry = get_class_registry()
+        
+        # Test connections (sekaligus memuat roster tiap kelas untuk routing chat pribadi)
         logger.info("🔧 Testing connections...")
-        try:
-            from fiturBot.attendance_bot import AttendanceBot
-            bot = AttendanceBot()
-            df = bot.get_student_data()
-            logger.info(f"✅ Connected to Google Sheets - {len(df)} records")
-        except Exception as e:
-            logger.error(f"❌ Error testing connections: {e}")
-            # Continue anyway, as some features might still work
+        for class_config in registry.classes:
+            try:
+                roster = registry.attendance_bot(class_config).get_student_data()
+                logger.info(f"✅ Connected to Google Sheets ({class_config.name}) - {len(roster)} records")
+            except Exception as e:
+                logger.error(f"❌ Error testing connections ({class_config.name}): {e}")
+                # Continue anyway, as some features might still work
         
         # Create application
         application = Application.builder().token(BOT_TOKEN).build()
+        application.bot_data['class_registry'] = registry
         
         # Setup bot commands menu
         application.post_init = setup_bot_commands
+        application.post_shutdown = on_shutdown
         
         # Import handlers
         try:
             from fiturBot.handlers import (
                 start, status, test_connection, get_my_info, register, absen, test_classroom, get_all_member_ids, get_simple_member_ids,
-                admin_help, admin_stats, reset_attendance, force_attendance_check, export_data,
+                admin_help, admin_stats, refresh_data, bot_metrics, reset_attendance, force_attendance_check, export_data, bulk_register,
                 manual_kick, list_warnings, list_kehadiran, classroom_reminder_now, class_reminder_now, check_topics, 
                 materi, materi1, materi2, start_auto_reminder, stop_auto_reminder, test_auto_reminder, materi3
             )
@@ -122,9 +140,12 @@ def main():
                 ("materi3", materi3),
                 ("admin_help", admin_help),
                 ("admin_stats", admin_stats),
+                ("refresh_data", refresh_data),
+                ("bot_metrics", bot_metrics),
                 ("reset_attendance", reset_attendance),
                 ("force_check", force_attendance_check),
                 ("export_data", export_data),
+                ("import_murid", bulk_register),
                 ("manual_kick", manual_kick),
                 ("list_warnings", list_warnings),
                 ("list_kehadiran", list_kehadiran),
@@ -142,6 +163,12 @@ def main():
             for command, handler in commands:
                 application.add_handler(CommandHandler(command, handler))
                 logger.info(f"✅ Added handler: /{command}")
+            
+            # File CSV yang dikirim dengan caption /import_murid
+            application.add_handler(MessageHandler(
+                filters.Document.FileExtension("csv") & filters.CaptionRegex(r'^/import_murid'),
+                bulk_register
+            ))
                 
         except ImportError as e:
             logger.error(f"❌ Error importing handlers: {e}")
@@ -196,14 +223,20 @@ def main():
         # Setup job queue for scheduled tasks
         if application.job_queue:
             try:
-                from auto_functions import periodic_check, send_classroom_reminder, send_class_reminder
+                from auto_functions import periodic_check, send_classroom_reminder, send_class_reminder, sync_roster
+                from config import ENABLE_LOCAL_STORE, ROSTER_SYNC_INTERVAL
+                from fiturBot.quota import background_job
                 
-                # Schedule tasks
-                application.job_queue.run_daily(periodic_check, time=time(hour=8, minute=0))
-                application.job_queue.run_daily(periodic_check, time=time(hour=18, minute=0))
-                application.job_queue.run_daily(send_classroom_reminder, time=time(hour=10, minute=0))
-                application.job_queue.run_daily(send_class_reminder, time=time(hour=18, minute=0), days=(6,))
-                application.job_queue.run_daily(send_class_reminder, time=time(hour=10, minute=0), days=(0,))
+                # Schedule tasks per kelas (job.data = ClassConfig), prioritas kuota Google di bawah command pengguna
+                job_queue = application.job_queue
+                for class_config in registry.classes:
+                    job_queue.run_daily(background_job(periodic_check), time=time(hour=8, minute=0), data=class_config)
+                    job_queue.run_daily(background_job(periodic_check), time=time(hour=18, minute=0), data=class_config)
+                    job_queue.run_daily(background_job(send_classroom_reminder), time=time(hour=10, minute=0), data=class_config)
+                    job_queue.run_daily(background_job(send_class_reminder), time=time(hour=18, minute=0), days=(6,), data=class_config)
+                    job_queue.run_daily(background_job(send_class_reminder), time=time(hour=10, minute=0), days=(0,), data=class_config)
+                    if ENABLE_LOCAL_STORE:
+                        job_queue.run_repeating(background_job(sync_roster), interval=ROSTER_SYNC_INTERVAL, first=ROSTER_SYNC_INTERVAL, data=class_config)
                 
                 logger.info("✅ Scheduled tasks configured")
             except Exception as e:
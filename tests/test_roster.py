@@ -0,0 +1,21 @@
+from fiturBot.roster import Roster, Student
+
+
+def student(row_number, nama):
+    return Student.from_record(row_number, {'Nama': nama, 'Telegram ID': row_number * 100})
+
+
+def test_at_row_uses_row_number_when_rows_have_gaps():
+    roster = Roster([student(2, 'Andi'), student(3, 'Budi'), student(5, 'Cici')])
+
+    assert roster.at_row(5).nama == 'Cici'
+    assert roster.at_row(4) is None
+    assert roster.last_row == 5
+
+
+def test_append_is_visible_to_at_row():
+    roster = Roster([student(2, 'Andi')])
+    roster.append(student(3, 'Budi'))
+
+    assert roster.at_row(3).nama == 'Budi'
+    assert roster.last_row == 3
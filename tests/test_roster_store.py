@@ -0,0 +1,43 @@
+from fiturBot.roster import Roster, Student
+from fiturBot.roster_store import RosterStore
+
+COLUMNS = ['Nama', 'Telegram ID', 'Email', 'Username', 'Total Hadir', 'Total Alpha',
+           'Total Izin', 'Status Terakhir', 'Keterangan']
+
+
+def make_roster(records):
+    return Roster(
+        [Student.from_record(row_number, record) for row_number, record in enumerate(records, start=2)],
+        columns=COLUMNS,
+    )
+
+
+def record(nama, telegram_id, keterangan=''):
+    return {
+        'Nama': nama, 'Telegram ID': telegram_id, 'Email': f'{nama.lower()}@example.com', 'Username': '-',
+        'Total Hadir': 1, 'Total Alpha': 0, 'Total Izin': 0, 'Status Terakhir': 'Hadir',
+        'Keterangan': keterangan,
+    }
+
+
+def test_merge_from_sheet_keeps_rows_with_duplicate_telegram_id(tmp_path):
+    store = RosterStore(str(tmp_path / 'roster.db'))
+    store.merge_from_sheet(make_roster([record('Andi', 111), record('Budi', 111), record('Cici', 222)]))
+
+    roster = store.load_roster()
+    assert [student.nama for student in roster] == ['Andi', 'Budi', 'Cici']
+    assert [student.row_number for student in roster] == [2, 3, 4]
+
+    # Pull berikutnya dengan data yang sama juga tidak gagal
+    store.merge_from_sheet(make_roster([record('Andi', 111), record('Budi', 111), record('Cici', 222)]))
+    assert len(store.load_roster()) == 3
+
+
+def test_load_roster_keeps_unmirrored_columns(tmp_path):
+    store = RosterStore(str(tmp_path / 'roster.db'))
+    store.merge_from_sheet(make_roster([record('Andi', 111, 'Auto-registered'), record('Budi', 222)]))
+
+    roster = store.load_roster()
+    assert roster.columns == COLUMNS
+    assert roster.at_row(2).get('Keterangan') == 'Auto-registered'
+    assert roster.at_row(2).to_record()['Keterangan'] == 'Auto-registered'
@@ -0,0 +1,28 @@
+import pytest
+
+from fiturBot.sheet_writes import AppendBehindBuffer
+
+
+def test_append_behind_buffer_sends_queued_rows_in_one_call():
+    sent = []
+    buffer = AppendBehindBuffer(sent.append, max_pending=10)
+    buffer.add([1, 2])
+    buffer.add([3])
+
+    assert sent == []
+    assert buffer.flush() == 3
+    assert sent == [[1, 2, 3]]
+    assert buffer.pending_count() == 0
+
+
+def test_append_behind_buffer_requeues_failed_batch_in_order():
+    def fail(rows):
+        raise RuntimeError("sheet down")
+
+    buffer = AppendBehindBuffer(fail)
+    buffer.add([1, 2])
+    with pytest.raises(RuntimeError):
+        buffer.flush(raise_errors=True)
+    buffer.add([3])
+
+    assert buffer.snapshot() == [1, 2, 3]